@@ -0,0 +1,129 @@
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from profiling import profiled
+
+# ----------------------------
+# Single-pass ABC classification
+# ----------------------------
+# One argsort over the cost array, a cumulative sum and two cutoffs. The
+# result is a compact int8 class vector aligned with the input rows
+# (0 = A, 1 = B, 2 = C); the frame itself is never sorted or copied.
+
+ABC_A, ABC_B, ABC_C = 0, 1, 2
+ABC_LABELS = np.array(['A', 'B', 'C'])
+DEFAULT_CUTOFFS = (80, 95)  # cumulative cost % upper bounds for A and B
+
+_CACHE = {}
+_CACHE_SIZE = 32
+
+
+def abc_codes(costs, cutoffs=DEFAULT_CUTOFFS, groups=None):
+    """
+    ABC class codes for a cost vector.
+
+    An item is A while the cumulative cost share (descending cost order) is
+    <= cutoffs[0] percent, B while <= cutoffs[1], C otherwise. ``groups`` is
+    an optional integer code per item; classification then runs within each
+    group. NaN costs and items of zero-cost groups are C.
+    """
+    costs = np.asarray(costs, dtype=np.float64)
+    n = costs.shape[0]
+    codes = np.full(n, ABC_C, dtype=np.int8)
+    if n == 0:
+        return codes
+
+    filled = np.where(np.isnan(costs), 0.0, costs)
+    if groups is None:
+        order = np.argsort(-filled, kind='stable')
+        cum = np.cumsum(filled[order])
+        total = cum[-1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pct = cum / total * 100
+    else:
+        groups = np.asarray(groups)
+        # One lexsort: by group, then descending cost inside the group
+        order = np.lexsort((-filled, groups))
+        sorted_costs = filled[order]
+        sorted_groups = groups[order]
+        starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+        cum = np.cumsum(sorted_costs)
+        group_totals = np.add.reduceat(sorted_costs, starts)
+        offsets = np.r_[0.0, cum[starts[1:] - 1]]
+        sizes = np.diff(np.r_[starts, n])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pct = (cum - np.repeat(offsets, sizes)) / np.repeat(group_totals, sizes) * 100
+
+    # NaN share (zero total) falls through to C
+    sorted_codes = np.where(pct <= cutoffs[0], ABC_A,
+                            np.where(pct <= cutoffs[1], ABC_B, ABC_C)).astype(np.int8)
+    codes[order] = sorted_codes
+    codes[np.isnan(costs)] = ABC_C
+    return codes
+
+
+def abc_labels(codes):
+    """int8 class codes -> categorical 'A'/'B'/'C' labels."""
+    return pd.Categorical.from_codes(codes, categories=list(ABC_LABELS))
+
+
+def _group_codes(df, keys):
+    return df.groupby(keys, observed=True, sort=False).ngroup().to_numpy()
+
+
+@profiled('abc_classify')
+def classify(df, cost_col='Total_Cost', cutoffs=DEFAULT_CUTOFFS, by=None, item=None):
+    """
+    ABC class code per row of ``df``.
+
+    by   -- column(s) to classify within (e.g. 'Warehouse'); None = global
+    item -- column whose total cost is classified (e.g. 'Material_ID'); every
+            row then carries the class of its item. None = each row is an item
+
+    Results are memoized per input snapshot (``df.attrs['snapshot']`` as set
+    by inventory_loader) and frame, so every analysis on the same loaded data
+    reuses them. pandas copies ``attrs`` onto filtered frames, hence the frame
+    identity in the key. The returned array is read-only.
+    """
+    by = [by] if isinstance(by, str) else list(by or [])
+    snapshot = df.attrs.get('snapshot')
+    key = None
+    if snapshot is not None:
+        key = (snapshot, id(df), cost_col, tuple(cutoffs), tuple(by), item)
+        if key in _CACHE:
+            return _CACHE[key]
+
+    costs = df[cost_col].to_numpy(dtype=np.float64, na_value=np.nan)
+    groups = _group_codes(df, by) if by else None
+
+    if item is None:
+        codes = abc_codes(costs, cutoffs, groups)
+    else:
+        item_ids = _group_codes(df, by + [item])
+        valid = item_ids >= 0
+        n_items = item_ids.max() + 1 if valid.any() else 0
+        item_costs = np.bincount(item_ids[valid], weights=np.nan_to_num(costs[valid]),
+                                 minlength=n_items)
+        item_groups = None
+        if groups is not None:
+            item_groups = np.zeros(n_items, dtype=groups.dtype)
+            item_groups[item_ids[valid]] = groups[valid]
+        item_codes = abc_codes(item_costs, cutoffs, item_groups)
+        codes = np.full(len(df), ABC_C, dtype=np.int8)
+        codes[valid] = item_codes[item_ids[valid]]
+
+    codes.setflags(write=False)
+    if key is not None:
+        if len(_CACHE) >= _CACHE_SIZE:
+            _CACHE.pop(next(iter(_CACHE)))
+        _CACHE[key] = codes
+        # id() values are reused after garbage collection
+        weakref.finalize(df, _forget, id(df))
+    return codes
+
+
+def _forget(frame_id):
+    for key in [k for k in _CACHE if k[1] == frame_id]:
+        del _CACHE[key]
@@ -0,0 +1,117 @@
+import argparse
+import importlib
+import os
+import sys
+import time
+
+import pandas as pd
+
+from batch_report import ANALYSES, MOVEMENTS_FILE, compute_all
+from demand_cube import update_cube
+from inventory_loader import INVENTORY_FILE, load_inventory
+from result_cache import tag_snapshot
+
+# ----------------------------
+# Analytics command line
+# ----------------------------
+# One entry point for the day analyses. Only the inputs the selected analyses
+# need are loaded, and the plotting stack (matplotlib / seaborn) is imported
+# only when figures are rendered: with --no-plot a run is load + compute +
+# text report and never imports it.
+#
+#   python analytics.py gun1 gun4 --no-plot
+#   python analytics.py --output reports        (all analyses, PNGs in reports/)
+
+PREVIEW_ROWS = 5
+
+
+def load_selected(analyses, inventory_file=INVENTORY_FILE, movements_file=MOVEMENTS_FILE):
+    """The inputs needed by ``analyses`` (missing movement files load as None)."""
+    needs = {name for analysis in analyses for name in ANALYSES[analysis]}
+    inputs = {}
+    if 'inventory' in needs:
+        inputs['inventory'] = load_inventory(inventory_file)
+    try:
+        if 'movements' in needs:
+            movements = pd.read_csv(movements_file, parse_dates=['Document_Date'])
+            inputs['movements'] = tag_snapshot(movements, movements_file)
+        if 'demand_cube' in needs:
+            inputs['demand_cube'] = update_cube(movements_file)
+    except FileNotFoundError:
+        inputs.update({name: None for name in ('movements', 'demand_cube') if name in needs})
+    return inputs
+
+
+def print_summary(results):
+    """Text report for analyses without a report(): scalars, then the head of each table."""
+    for key, value in results.items():
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            print(f"{key}: {len(value):,} rows")
+            print(value.head(PREVIEW_ROWS).to_string())
+        elif value is not None:
+            print(f"{key}: {value}")
+
+
+def render_figures(module, results, output_dir='.', show=False):
+    """Draw and save the module's FIGURES; returns the written paths."""
+    import matplotlib
+    if not show:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    paths = []
+    for name, (render, options) in getattr(module, 'FIGURES', {}).items():
+        fig = render(results)
+        if fig is None:
+            continue
+        path = os.path.join(output_dir, name)
+        fig.savefig(path, **options)
+        paths.append(path)
+        if not show:
+            plt.close(fig)
+    if show:
+        plt.show()
+    return paths
+
+
+def run(analyses, plot=True, show=False, output_dir='.', inventory_file=INVENTORY_FILE,
+        movements_file=MOVEMENTS_FILE):
+    """Load, compute, report and (optionally) render ``analyses``; returns the errors."""
+    inputs = load_selected(analyses, inventory_file, movements_file)
+    results, errors = compute_all(inputs, {analysis: ANALYSES[analysis] for analysis in analyses})
+    if plot:
+        os.makedirs(output_dir, exist_ok=True)
+    for analysis, (analysis_results, seconds) in results.items():
+        module = importlib.import_module(analysis)
+        print("=" * 50)
+        print(f"📊 {analysis.upper()} ({seconds:.3f} s)")
+        print("=" * 50)
+        getattr(module, 'report', print_summary)(analysis_results)
+        if plot:
+            for path in render_figures(module, analysis_results, output_dir, show):
+                print(f"🖼️ '{path}'")
+    return errors
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run day analyses from one entry point')
+    parser.add_argument('analyses', nargs='*', metavar='ANALYSIS',
+                        help=f"Analyses to run: {', '.join(ANALYSES)} (default: all)")
+    parser.add_argument('--no-plot', action='store_true', help='Text report only; matplotlib is never imported')
+    parser.add_argument('--show', action='store_true', help='Open the figures in a window')
+    parser.add_argument('--output', default='.', help='Folder for the PNGs')
+    parser.add_argument('--inventory', default=INVENTORY_FILE)
+    parser.add_argument('--movements', default=MOVEMENTS_FILE)
+    args = parser.parse_args()
+    unknown = sorted(set(args.analyses) - set(ANALYSES))
+    if unknown:
+        parser.error(f"unknown analyses: {', '.join(unknown)}")
+
+    start = time.perf_counter()
+    errors = run(args.analyses or list(ANALYSES), not args.no_plot, args.show, args.output,
+                 args.inventory, args.movements)
+    for error in errors:
+        print(f"⚠️ {error['analysis']}: {error['error']}")
+    print("-" * 50)
+    print(f"⏱️ {time.perf_counter() - start:.2f} s (plotting stack loaded: {'matplotlib' in sys.modules})")
+    sys.exit(1 if errors else 0)
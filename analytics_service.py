@@ -0,0 +1,344 @@
+import argparse
+import io
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+import gun1
+import gun2
+import gun3
+import gun7
+import gun8
+from demand_cube import DemandCube
+from inventory_loader import INVENTORY_FILE, load_inventory
+from movement_stream import MOVEMENTS_FILE
+from time_buckets import TimeBuckets
+
+# ----------------------------
+# Warm analytics service
+# ----------------------------
+# Loads inventory and movements once and answers KPI queries over HTTP (JSON)
+# from memory: the inventory stays a typed, columnar frame split per
+# warehouse, and the movements are kept as their aggregates (a demand cube and
+# 15-minute time buckets per warehouse). A watcher thread polls the files:
+# rows appended to the movements file are read from the last offset and added
+# to the aggregates; a rewritten movements file or a changed inventory file is
+# reloaded (the inventory through its Parquet snapshot). Query results are
+# memoized per data version, so repeated dashboard refreshes cost a dict lookup.
+#
+#   python analytics_service.py --port 8765
+#   curl 'localhost:8765/kpi?warehouse=WH01'
+#   curl 'localhost:8765/cv?top=20'
+
+HOST = '127.0.0.1'
+PORT = 8765
+POLL_SECONDS = 2.0
+BUCKET_MINUTES = 15
+TAIL_BYTES = 256          # bytes before the read offset that must be unchanged for an append
+ALL = 'ALL'
+
+# endpoint -> WarmDataset query
+ROUTES = {
+    'kpi': 'kpi',
+    'abc': 'abc_split',
+    'cv': 'cv_ranking',
+    'peak-hours': 'peak_hours',
+    'days-in-stock': 'days_in_stock',
+}
+PARAMS = {'top': int}
+
+
+def _stat(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _read_tail(path, offset):
+    with open(path, 'rb') as f:
+        f.seek(max(offset - TAIL_BYTES, 0))
+        return f.read(min(offset, TAIL_BYTES))
+
+
+def _plain(value):
+    """Query results -> JSON-ready values (frames in pandas 'split' layout, NaN -> null)."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return json.loads(value.to_json(orient='split', date_format='iso'))
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+class WarmDataset:
+    """In-memory inventory and movement aggregates with incremental reloads."""
+
+    def __init__(self, inventory_file=INVENTORY_FILE, movements_file=MOVEMENTS_FILE):
+        self.inventory_file = inventory_file
+        self.movements_file = movements_file
+        self.lock = threading.RLock()
+        self.version = 0
+        self.loaded_at = None
+        self.inventory = None
+        self.parts = {}               # warehouse (and ALL) -> inventory rows
+        self.cubes = {}               # warehouse (and ALL) -> DemandCube
+        self.buckets = None           # TimeBuckets grouped by warehouse
+        self.movement_rows = 0
+        self._inventory_stat = None
+        self._movements = None        # {'stat', 'offset', 'tail', 'columns'}
+        self._results = {}
+        self.refresh()
+
+    # ----------------------------
+    # Loading
+    # ----------------------------
+    def refresh(self):
+        """Pick up changes on disk; returns what was (re)loaded."""
+        with self.lock:
+            changed = []
+            stat = _stat(self.inventory_file)
+            if self._inventory_stat is None and stat is None:
+                raise FileNotFoundError(self.inventory_file)
+            if stat is not None and stat != self._inventory_stat:
+                self._load_inventory()
+                self._inventory_stat = stat
+                changed.append('inventory')
+            movements = self._refresh_movements()
+            if movements:
+                changed.append(movements)
+            if changed:
+                self.version += 1
+                self.loaded_at = datetime.now().isoformat(timespec='seconds')
+                self._results.clear()
+            return changed
+
+    def _load_inventory(self):
+        df = load_inventory(self.inventory_file)
+        parts = {ALL: df}
+        for warehouse, part in df.groupby('Warehouse', observed=True):
+            # Own snapshot key, so abc_engine memoizes per warehouse frame
+            part.attrs['snapshot'] = f"{df.attrs['snapshot']}:{warehouse}"
+            parts[str(warehouse)] = part
+        self.inventory, self.parts = df, parts
+
+    def _refresh_movements(self):
+        stat = _stat(self.movements_file)
+        state = self._movements
+        if stat is None or (state is not None and stat == state['stat']):
+            return None
+        appended = (state is not None and stat[0] >= state['offset']
+                    and _read_tail(self.movements_file, state['offset']) == state['tail'])
+        offset = state['offset'] if appended else 0
+        with open(self.movements_file, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        # A writer may be mid-line: only complete lines are read
+        end = data.rfind(b'\n') + 1
+        if appended:
+            frame = (pd.read_csv(io.BytesIO(data[:end]), header=None, names=state['columns'],
+                                 parse_dates=['Document_Date']) if end else None)
+        else:
+            frame = pd.read_csv(io.BytesIO(data[:end] if end else data), parse_dates=['Document_Date'])
+            end = end or len(data)
+            self.cubes, self.buckets, self.movement_rows = {}, TimeBuckets(BUCKET_MINUTES), 0
+        self._movements = {
+            'stat': stat,
+            'offset': offset + end,
+            'tail': _read_tail(self.movements_file, offset + end),
+            'columns': list(frame.columns) if frame is not None else state['columns'],
+        }
+        if frame is None or not len(frame):
+            return None
+        self._add_movements(frame)
+        return f'movements +{len(frame):,}' if appended else 'movements'
+
+    def _add_movements(self, frame):
+        by_warehouse = 'Warehouse' in frame.columns
+        counted = frame['Movement_ID'].notna() if 'Movement_ID' in frame.columns else None
+        self.buckets.add(frame['Document_Date'], frame['Warehouse'].astype(str) if by_warehouse else None, counted)
+        parts = [(ALL, frame)]
+        if by_warehouse:
+            parts += [(str(warehouse), part) for warehouse, part in frame.groupby('Warehouse', sort=False)]
+        for warehouse, part in parts:
+            self.cubes.setdefault(warehouse, DemandCube()).append(part, source=warehouse)
+        self.movement_rows += len(frame)
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+    def query(self, name, warehouse=ALL, **params):
+        """Memoized query result (JSON-ready) and the data version it belongs to."""
+        key = (name, warehouse, tuple(sorted(params.items())))
+        with self.lock:
+            if key not in self._results:
+                self._results[key] = _plain(getattr(self, name)(warehouse, **params))
+            return self._results[key], self.version
+
+    def _part(self, warehouse):
+        if warehouse not in self.parts:
+            raise LookupError(f'unknown warehouse {warehouse!r}')
+        return self.parts[warehouse]
+
+    def _cube(self, warehouse):
+        if warehouse not in self.cubes:
+            raise LookupError(f'no movements for warehouse {warehouse!r}')
+        return self.cubes[warehouse]
+
+    def kpi(self, warehouse):
+        """gun1 panel: stock cost, safety stock violations, slow movers, 63% concentration."""
+        return gun1.compute(self._part(warehouse))
+
+    def abc_split(self, warehouse):
+        """gun2 Pareto / ABC split (classified within the warehouse)."""
+        results = gun2.compute(self._part(warehouse))
+        return dict({key: value for key, value in results.items() if key != 'sku_cost'},
+                    classes=['A', 'B', 'C'])
+
+    def cv_ranking(self, warehouse, top=10):
+        """gun3 demand variability: SKUs by coefficient of variation, highest first."""
+        stats = self._cube(warehouse).movement_stats()[['mean', 'std']].reset_index()
+        summary = gun3.summarize(stats)['summary']
+        ranking = summary.sort_values('cv', ascending=False).head(top)
+        return {'sku_count': len(summary), 'ranking': json.loads(ranking.to_json(orient='records'))}
+
+    def peak_hours(self, warehouse):
+        """gun7 Hour x Day movement matrix and 3-sigma peak slots."""
+        if self.buckets is None:
+            raise LookupError('no movements loaded')
+        group = None if warehouse == ALL else warehouse
+        if group is not None and group not in self.buckets.labels:
+            raise LookupError(f'no movements for warehouse {warehouse!r}')
+        series = self.buckets.time_series(group)
+        results = gun7.detect_anomalies(series, self.buckets.heatmap(group))
+        return {'heatmap': results['heatmap_data'], 'anomalies': results['anomalies'], 'slots': len(series)}
+
+    def days_in_stock(self, warehouse):
+        """gun8 Warehouse x ABC average days in stock (global ABC classes)."""
+        heatmap = gun8.compute(self.inventory)['heatmap_data']['Avg_Days']
+        if warehouse == ALL:
+            return heatmap
+        self._part(warehouse)
+        return heatmap.loc[[warehouse]]
+
+    def status(self):
+        return {
+            'version': self.version,
+            'loaded_at': self.loaded_at,
+            'inventory_rows': len(self.inventory),
+            'movement_rows': self.movement_rows,
+            'warehouses': [name for name in self.parts if name != ALL],
+            'endpoints': ['health', 'reload'] + list(ROUTES),
+        }
+
+
+# ----------------------------
+# HTTP
+# ----------------------------
+class ServiceHandler(BaseHTTPRequestHandler):
+    dataset = None
+    verbose = False
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        route = url.path.strip('/') or 'health'
+        start = time.perf_counter()
+        try:
+            if route == 'health':
+                body = self.dataset.status()
+            elif route == 'reload':
+                body = dict(reloaded=self.dataset.refresh(), **self.dataset.status())
+            elif route in ROUTES:
+                warehouse = params.pop('warehouse', ALL)
+                typed = {key: PARAMS[key](value) for key, value in params.items() if key in PARAMS}
+                result, version = self.dataset.query(ROUTES[route], warehouse, **typed)
+                body = {'warehouse': warehouse, 'version': version, 'result': result}
+            else:
+                return self._send(404, {'error': f'unknown endpoint /{route}',
+                                        'endpoints': self.dataset.status()['endpoints']})
+        except LookupError as exc:
+            return self._send(404, {'error': str(exc.args[0] if exc.args else exc)})
+        except (TypeError, ValueError) as exc:
+            return self._send(400, {'error': str(exc)})
+        body['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        self._send(200, body)
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+
+def watch(dataset, interval=POLL_SECONDS, stop=None):
+    """Poll the source files every ``interval`` seconds until ``stop`` is set."""
+    stop = stop or threading.Event()
+    while not stop.wait(interval):
+        try:
+            changed = dataset.refresh()
+        except (OSError, ValueError, pd.errors.ParserError) as exc:  # file mid-rewrite: retry next poll
+            print(f"⚠️ Reload failed: {type(exc).__name__}: {exc}")
+            continue
+        if changed:
+            print(f"🔄 Reloaded {', '.join(changed)} (version {dataset.version})")
+
+
+def make_server(dataset, host=HOST, port=PORT, verbose=False):
+    handler = type('Handler', (ServiceHandler,), {'dataset': dataset, 'verbose': verbose})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve KPI queries from an in-memory dataset')
+    parser.add_argument('--inventory', default=INVENTORY_FILE)
+    parser.add_argument('--movements', default=MOVEMENTS_FILE)
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--poll', type=float, default=POLL_SECONDS, help='Seconds between file change checks')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    dataset = WarmDataset(args.inventory, args.movements)
+    server = make_server(dataset, args.host, args.port, args.verbose)
+    stop = threading.Event()
+    threading.Thread(target=watch, args=(dataset, args.poll, stop), daemon=True).start()
+
+    status = dataset.status()
+    print("=" * 50)
+    print(f"🚀 Analytics service on http://{args.host}:{args.port}/")
+    print("=" * 50)
+    print(f"Inventory rows : {status['inventory_rows']:,}")
+    print(f"Movement rows  : {status['movement_rows']:,}")
+    print(f"Warehouses     : {', '.join(status['warehouses'])}")
+    print(f"Loaded in      : {time.perf_counter() - start:.2f} s")
+    print(f"Endpoints      : {', '.join('/' + name for name in status['endpoints'])}")
+    print("=" * 50)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
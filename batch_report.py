@@ -0,0 +1,172 @@
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from demand_cube import DemandCube, update_cube
+from inventory_loader import INVENTORY_FILE, load_inventory
+from profiling import profiled_run, span
+from result_cache import tag_snapshot
+
+# ----------------------------
+# Nightly batch report
+# ----------------------------
+# Loads inventory / movements once, runs every day analysis on that data,
+# renders each figure in a worker process (Agg backend, no plt.show()) and
+# writes the PNGs plus a manifest.json describing the run.
+
+MOVEMENTS_FILE = 'outbound_movements.csv'
+OUTPUT_DIR = 'reports'
+MANIFEST_FILE = 'manifest.json'
+
+# Day module -> inputs passed to its compute() (gun6 is the browser simulator)
+ANALYSES = {
+    'gun1': ('inventory',),
+    'gun2': ('inventory',),
+    'gun3': ('demand_cube',),
+    'gun4': ('inventory', 'demand_cube'),
+    'gun5': ('inventory',),
+    'gun7': ('movements',),
+    'gun8': ('inventory',),
+}
+
+
+def _init_worker():
+    # The plotting stack is only imported by the render workers (headless Agg backend)
+    import matplotlib
+    matplotlib.use('Agg')
+    # Currency formatting in gun1; the fallback format is used if this fails
+    with contextlib.redirect_stdout(io.StringIO()):
+        importlib.import_module('gun1').set_turkish_locale()
+
+
+def render_figure(task):
+    """Worker: build one figure and save it. Returns its manifest entry."""
+    import matplotlib.pyplot as plt
+    analysis, name, results, path = task
+    module = importlib.import_module(analysis)
+    render, options = module.FIGURES[name]
+    start = time.perf_counter()
+    fig = render(results)
+    if fig is None:
+        return {'analysis': analysis, 'figure': name, 'file': None, 'status': 'skipped'}
+    fig.savefig(path, **options)
+    plt.close(fig)
+    return {'analysis': analysis, 'figure': name, 'file': path, 'status': 'ok',
+            'render_seconds': round(time.perf_counter() - start, 3)}
+
+
+def load_inputs(inventory_file=INVENTORY_FILE, movements_file=MOVEMENTS_FILE):
+    inputs = {'inventory': load_inventory(inventory_file)}
+    try:
+        movements = pd.read_csv(movements_file, parse_dates=['Document_Date'])
+        inputs['movements'] = tag_snapshot(movements, movements_file)
+        inputs['demand_cube'] = update_cube(movements_file)
+    except FileNotFoundError:
+        inputs['movements'] = inputs['demand_cube'] = None
+    return inputs
+
+
+def split_by_warehouse(inputs):
+    """
+    [(warehouse, inputs)] with inventory filtered. Movements (and an in-memory
+    demand cube of them) are filtered too when they carry a Warehouse column.
+    """
+    inventory, movements = inputs['inventory'], inputs['movements']
+    parts = []
+    for warehouse, inv_part in inventory.groupby('Warehouse', observed=True):
+        mov_part, cube = movements, inputs['demand_cube']
+        if movements is not None and 'Warehouse' in movements.columns:
+            mov_part = movements[movements['Warehouse'] == warehouse]
+            cube = DemandCube.from_movements(mov_part)
+        parts.append((str(warehouse), {'inventory': inv_part, 'movements': mov_part, 'demand_cube': cube}))
+    return parts
+
+
+def compute_all(inputs, analyses=ANALYSES):
+    """Run compute() of every analysis; returns ({analysis: results}, [errors])."""
+    results, errors = {}, []
+    for analysis, needs in analyses.items():
+        args = [inputs[name] for name in needs]
+        # Only the first input is required (gun4 runs without a demand cube)
+        if args[0] is None:
+            errors.append({'analysis': analysis, 'error': f'{needs[0]} file missing'})
+            continue
+        module = importlib.import_module(analysis)
+        start = time.perf_counter()
+        try:
+            with span(analysis):
+                results[analysis] = (module.compute(*args), round(time.perf_counter() - start, 3))
+        except Exception as exc:  # one broken analysis must not stop the nightly run
+            errors.append({'analysis': analysis, 'error': f'{type(exc).__name__}: {exc}'})
+    return results, errors
+
+
+@profiled_run('batch_report')
+def run_batch(output_dir=OUTPUT_DIR, by_warehouse=False, workers=None,
+              inventory_file=INVENTORY_FILE, movements_file=MOVEMENTS_FILE):
+    started = datetime.now()
+    with span('load_inputs'):
+        inputs = load_inputs(inventory_file, movements_file)
+    scopes = split_by_warehouse(inputs) if by_warehouse else [('ALL', inputs)]
+
+    tasks, computed, errors = [], [], []
+    for scope, scope_inputs in scopes:
+        scope_dir = os.path.join(output_dir, scope)
+        os.makedirs(scope_dir, exist_ok=True)
+        results, scope_errors = compute_all(scope_inputs)
+        errors += [dict(e, scope=scope) for e in scope_errors]
+        for analysis, (analysis_results, seconds) in results.items():
+            computed.append({'scope': scope, 'analysis': analysis, 'compute_seconds': seconds})
+            module = importlib.import_module(analysis)
+            for name in module.FIGURES:
+                tasks.append((analysis, name, analysis_results, os.path.join(scope_dir, name)))
+
+    figures = []
+    # Figures render in worker processes; their own timings go to the manifest
+    with span('render_pool', rows=len(tasks)), ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(render_figure, task) for task in tasks]
+        for task, future in zip(tasks, futures):
+            try:
+                figures.append(future.result())
+            except Exception as exc:
+                errors.append({'analysis': task[0], 'figure': task[1], 'error': f'{type(exc).__name__}: {exc}'})
+
+    manifest = {
+        'started_at': started.isoformat(timespec='seconds'),
+        'finished_at': datetime.now().isoformat(timespec='seconds'),
+        'inventory_file': os.path.abspath(inventory_file),
+        'inventory_snapshot': inputs['inventory'].attrs.get('snapshot'),
+        'movements_file': os.path.abspath(movements_file) if inputs['movements'] is not None else None,
+        'scopes': [scope for scope, _ in scopes],
+        'analyses': computed,
+        'figures': figures,
+        'errors': errors,
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Render all day charts headless, in parallel')
+    parser.add_argument('--output', default=OUTPUT_DIR)
+    parser.add_argument('--by-warehouse', action='store_true', help='One report folder per warehouse')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--inventory', default=INVENTORY_FILE)
+    parser.add_argument('--movements', default=MOVEMENTS_FILE)
+    args = parser.parse_args()
+
+    manifest = run_batch(args.output, args.by_warehouse, args.workers, args.inventory, args.movements)
+    ok = sum(f['status'] == 'ok' for f in manifest['figures'])
+    print(f"✅ {ok} charts written to '{args.output}' ({len(manifest['errors'])} errors).")
+    for error in manifest['errors']:
+        print(f"   ⚠️ {error}")
@@ -0,0 +1,174 @@
+import argparse
+import importlib
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from batch_report import ANALYSES
+from result_cache import CACHE_ENV
+from synthetic_data import SIZES, parse_size, write_dataset
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, peak RSS is not recorded
+    resource = None
+
+# ----------------------------
+# Benchmark harness
+# ----------------------------
+# Times the import, load, compute and render stages of every day analysis (and the
+# vna_sim port of gun6) on synthetic data of each requested size. Every
+# (size, analysis) pair runs in a fresh worker process, so the peak RSS
+# recorded after each stage belongs to that analysis alone. Rows are
+# appended to a CSV so runs of different commits can be compared.
+
+RESULTS_FILE = 'benchmark_results.csv'
+DATA_DIR = 'bench_data'
+DEFAULT_SIZES = ('10k', '1m')
+
+# Day analyses (batch_report inputs) plus the headless simulator
+BENCHMARKS = dict(ANALYSES, vna_sim=('layout', 'inventory_table', 'demand'))
+# vna_sim reads the raw tables (read_table), not the typed inventory snapshot
+TABLE_INPUTS = {'layout': 'layout', 'inventory_table': 'inventory', 'demand': 'demand'}
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024   # bytes on macOS, KB on Linux
+
+
+def load_input(name, paths, cold=False):
+    """One analysis input from the dataset files, the way the scripts load it."""
+    if name == 'inventory':
+        from inventory_loader import load_inventory
+        return load_inventory(paths['inventory'], use_cache=not cold)
+    if name == 'movements':
+        return pd.read_csv(paths['outbound_movements'], parse_dates=['Document_Date'])
+    if name == 'demand_cube':
+        from demand_cube import DemandCube, update_cube
+        if cold:
+            return DemandCube.from_movements(pd.read_csv(paths['outbound_movements']))
+        return update_cube(paths['outbound_movements'])
+    from vna_sim import read_table
+    return read_table(paths[TABLE_INPUTS[name]])
+
+
+def _compute(module, args):
+    if module.__name__ == 'vna_sim':
+        return module.run_simulation(*args)
+    return module.compute(*args)
+
+
+def run_stages(job):
+    """Worker: import / load / compute / render one analysis; one result row per stage."""
+    analysis, paths, output_dir, render, cold = job
+    rows = []
+    os.environ[CACHE_ENV] = '0'   # time the computation, not a result cache hit
+
+    def stage(name, fn):
+        start = time.perf_counter()
+        value = fn()
+        rows.append({'analysis': analysis, 'stage': name, 'seconds': time.perf_counter() - start,
+                     'peak_rss_mb': peak_rss_mb()})
+        return value
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    module = stage('import', lambda: importlib.import_module(analysis))
+    args = stage('load', lambda: [load_input(name, paths, cold) for name in BENCHMARKS[analysis]])
+    results = stage('compute', lambda: _compute(module, args))
+    figures = getattr(module, 'FIGURES', {})
+    if render and figures:
+        def draw():
+            for name, (render_fn, options) in figures.items():
+                fig = render_fn(results)
+                if fig is not None:
+                    fig.savefig(os.path.join(output_dir, name), **options)
+                    plt.close(fig)
+        stage('render', draw)
+    return rows
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def prepare_dataset(size, data_dir=DATA_DIR, seed=0, regenerate=False):
+    """Dataset paths for a size label, generating the files when missing."""
+    folder = os.path.join(data_dir, size.lower())
+    names = ('inventory', 'outbound_movements', 'layout', 'demand')
+    paths = {name: os.path.join(folder, f'{name}.csv') for name in names}
+    if regenerate or not all(os.path.exists(p) for p in paths.values()):
+        paths = write_dataset(folder, parse_size(size), seed)
+    return paths
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, analyses=None, data_dir=DATA_DIR, render=True, cold=False,
+                   results_file=RESULTS_FILE, regenerate=False):
+    """Benchmark every analysis on every size; appends to ``results_file`` and returns the new rows."""
+    analyses = analyses or list(BENCHMARKS)
+    run = {'run_id': datetime.now().isoformat(timespec='seconds'), 'commit': git_revision(),
+           'python': sys.version.split()[0], 'cache': 'cold' if cold else 'warm'}
+    rows = []
+    for size in sizes:
+        paths = prepare_dataset(size, data_dir, regenerate=regenerate)
+        output_dir = os.path.join(data_dir, size.lower(), 'figures')
+        os.makedirs(output_dir, exist_ok=True)
+        if not cold:
+            # Build the inventory snapshot / demand cube once, outside the timings
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                pool.submit(load_input, 'inventory', paths).result()
+                pool.submit(load_input, 'demand_cube', paths).result()
+        for analysis in analyses:
+            base = dict(run, size=size, rows=parse_size(size))
+            # A fresh process per analysis keeps ru_maxrss per analysis
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                try:
+                    stages = pool.submit(run_stages, (analysis, paths, output_dir, render, cold)).result()
+                    rows += [dict(base, **row, status='ok') for row in stages]
+                except Exception as exc:  # one failing analysis must not stop the suite
+                    rows.append(dict(base, analysis=analysis, stage='error', seconds=None, peak_rss_mb=None,
+                                     status=f'{type(exc).__name__}: {exc}'))
+    results = pd.DataFrame(rows)
+    results.to_csv(results_file, mode='a', index=False, header=not os.path.exists(results_file))
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time import / load / compute / render of every analysis on synthetic data')
+    parser.add_argument('--sizes', nargs='+', default=list(DEFAULT_SIZES),
+                        help=f"Dataset sizes: {', '.join(SIZES)} or row counts")
+    parser.add_argument('--analyses', nargs='+', choices=list(BENCHMARKS), default=None)
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--results', default=RESULTS_FILE)
+    parser.add_argument('--no-render', action='store_true', help='Skip the render stage')
+    parser.add_argument('--cold', action='store_true', help='Bypass the inventory snapshot and demand cube caches')
+    parser.add_argument('--regenerate', action='store_true', help='Rewrite the synthetic data files')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.analyses, args.data_dir, not args.no_render, args.cold,
+                             args.results, args.regenerate)
+    ok = results[results['status'] == 'ok']
+    table = ok.pivot_table(index=['size', 'analysis'], columns='stage', values='seconds', sort=False)
+    table['peak_rss_mb'] = ok.groupby(['size', 'analysis'], sort=False)['peak_rss_mb'].max()
+    print("=" * 70)
+    print(f"⏱️ BENCHMARK {results['run_id'].iloc[0]} ({results['commit'].iloc[0] or 'no git'})")
+    print("=" * 70)
+    print(table.round(3).to_string())
+    for _, row in results[results['status'] != 'ok'].iterrows():
+        print(f"⚠️ {row['size']} {row['analysis']}: {row['status']}")
+    print(f"Results appended to '{args.results}'.")
+    print("=" * 70)
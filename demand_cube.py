@@ -0,0 +1,258 @@
+import argparse
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from inventory_loader import file_digest
+from movement_stream import CHUNK_SIZE, MOVEMENTS_FILE, iter_movements
+
+# ----------------------------
+# Materialized per-SKU demand cube
+# ----------------------------
+# One row per (source file, SKU, day) with the movement count, the quantity
+# sum and sum of squares, and the last movement time. Demand statistics
+# (gun3's mean / std / CV, gun4's daily sigma and lead-time demand) are derived
+# from these rows without rescanning the movement history. New movement files
+# are ingested incrementally; a file whose content changed replaces its own
+# rows, so nothing is counted twice. By default the cube is saved next to the
+# movement files, and update_cube returns only the rows of the files it was
+# asked for, never those of other files ingested into the same cube earlier.
+
+CUBE_FILE = 'demand_cube.parquet'
+MANIFEST_SUFFIX = '.manifest.json'
+CUBE_VERSION = 1
+
+KEY = 'Material_ID'
+QUANTITY = 'Quantity'
+DATE = 'Document_Date'
+CUBE_COLUMNS = ['Source', KEY, 'Day', 'count', 'sum', 'sum_sq', 'last_movement']
+
+
+def manifest_path(cube_file):
+    return cube_file + MANIFEST_SUFFIX
+
+
+def default_cube_file(movements_file):
+    """The cube kept next to a movement file."""
+    return os.path.join(os.path.dirname(movements_file), CUBE_FILE)
+
+
+def aggregate_movements(movements, source=''):
+    """Movement rows -> cube rows (count / sum / sum_sq / last movement per SKU and day)."""
+    dates = pd.to_datetime(movements[DATE])
+    quantity = pd.to_numeric(movements[QUANTITY], errors='coerce')
+    frame = pd.DataFrame({
+        KEY: movements[KEY].to_numpy(),
+        'Day': dates.dt.normalize().to_numpy(),
+        # NaN quantities are not counted (like groupby().mean()) but still move the last date
+        'count': quantity.notna().to_numpy(dtype=np.int64),
+        'sum': quantity.fillna(0).to_numpy(dtype=np.float64),
+        'last_movement': dates.to_numpy(),
+    })
+    frame['sum_sq'] = frame['sum'] ** 2
+    cube = frame.groupby([KEY, 'Day'], sort=False).agg(
+        count=('count', 'sum'), sum=('sum', 'sum'), sum_sq=('sum_sq', 'sum'),
+        last_movement=('last_movement', 'max'),
+    ).reset_index()
+    cube.insert(0, 'Source', source)
+    return cube[CUBE_COLUMNS]
+
+
+def _combine(parts):
+    """Merge cube rows of the same source (chunk partials)."""
+    if len(parts) == 1:
+        return parts[0]
+    merged = pd.concat(parts, ignore_index=True)
+    return merged.groupby(['Source', KEY, 'Day'], sort=False).agg(
+        count=('count', 'sum'), sum=('sum', 'sum'), sum_sq=('sum_sq', 'sum'),
+        last_movement=('last_movement', 'max'),
+    ).reset_index()[CUBE_COLUMNS]
+
+
+class DemandCube:
+    """Per SKU x day demand aggregates with incremental ingestion."""
+
+    def __init__(self, table=None, sources=None):
+        self.table = table if table is not None else pd.DataFrame(columns=CUBE_COLUMNS)
+        self.sources = sources or {}   # source path -> {'digest', 'rows', 'ingested_at'}
+
+    # ----------------------------
+    # Building
+    # ----------------------------
+    @classmethod
+    def from_movements(cls, movements, source='<memory>'):
+        """In-memory cube of a movements frame (nothing is written)."""
+        cube = cls()
+        cube._replace_source(source, aggregate_movements(movements, source), None, len(movements))
+        return cube
+
+    def _replace_source(self, source, rows, digest, rows_read):
+        kept = self.table[self.table['Source'] != source] if len(self.table) else self.table
+        self.table = pd.concat([kept, rows], ignore_index=True) if len(kept) else rows.reset_index(drop=True)
+        self.sources[source] = {
+            'digest': digest,
+            'rows': int(rows_read),
+            'ingested_at': datetime.now().isoformat(timespec='seconds'),
+        }
+
+    def select(self, sources):
+        """Cube of only the rows of ``sources`` (source paths as in ``self.sources``)."""
+        sources = [source for source in sources if source in self.sources]
+        if set(sources) == set(self.sources):
+            return self
+        table = self.table[self.table['Source'].isin(sources)].reset_index(drop=True)
+        return DemandCube(table, {source: self.sources[source] for source in sources})
+
+    def append(self, movements, source='<memory>'):
+        """
+        Add newly appended movement rows to a source. The rows are added, not
+        replaced: per SKU-day aggregates are summed by the statistics below.
+        """
+        rows = aggregate_movements(movements, source)
+        self.table = pd.concat([self.table, rows], ignore_index=True) if len(self.table) else rows
+        entry = self.sources.setdefault(source, {'digest': None, 'rows': 0})
+        entry['rows'] += len(movements)
+        entry['ingested_at'] = datetime.now().isoformat(timespec='seconds')
+
+    def ingest(self, path, chunk_size=CHUNK_SIZE):
+        """
+        Add a movement file. Unchanged files are skipped; a changed file
+        replaces its earlier rows. Returns True when the cube changed.
+        """
+        source = os.path.abspath(path)
+        digest = file_digest(path)
+        if self.sources.get(source, {}).get('digest') == digest:
+            return False
+        parts, rows_read = [], 0
+        for chunk in iter_movements(path, chunk_size, usecols=[KEY, QUANTITY, DATE]):
+            parts.append(aggregate_movements(chunk, source))
+            rows_read += len(chunk)
+        rows = _combine(parts) if parts else pd.DataFrame(columns=CUBE_COLUMNS)
+        self._replace_source(source, rows, digest, rows_read)
+        return True
+
+    # ----------------------------
+    # Persistence
+    # ----------------------------
+    @classmethod
+    def load(cls, cube_file=CUBE_FILE):
+        """Load a saved cube; a missing or outdated cube loads empty."""
+        try:
+            with open(manifest_path(cube_file), encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') != CUBE_VERSION:
+                return cls()
+            table = pd.read_parquet(cube_file)
+        except (FileNotFoundError, ValueError, OSError):
+            return cls()
+        table['Source'] = table['Source'].astype(str)
+        table[KEY] = table[KEY].astype(str)
+        return cls(table, manifest['sources'])
+
+    def save(self, cube_file=CUBE_FILE):
+        table = self.table.astype({'Source': 'category', KEY: 'category', 'count': 'int32'})
+        tmp = cube_file + '.tmp'
+        table.to_parquet(tmp, index=False)
+        os.replace(tmp, cube_file)
+        with open(manifest_path(cube_file), 'w', encoding='utf-8') as f:
+            json.dump({'version': CUBE_VERSION, 'sources': self.sources}, f, indent=2)
+
+    # ----------------------------
+    # Derived statistics
+    # ----------------------------
+    def _window(self, start=None, end=None):
+        table = self.table
+        if start is not None:
+            table = table[table['Day'] >= pd.Timestamp(start).normalize()]
+        if end is not None:
+            table = table[table['Day'] <= pd.Timestamp(end).normalize()]
+        return table
+
+    def day_range(self, start=None, end=None):
+        """(first day, last day) of the window; defaults to the observed range."""
+        days = self._window(start, end)['Day']
+        first = pd.Timestamp(start).normalize() if start is not None else days.min()
+        last = pd.Timestamp(end).normalize() if end is not None else days.max()
+        return first, last
+
+    def movement_stats(self, start=None, end=None):
+        """
+        count / mean / std (ddof=1) of movement quantities per SKU, the same
+        values as ``groupby(Material_ID)['Quantity'].agg(['mean', 'std'])``.
+        """
+        per_sku = self._window(start, end).groupby(KEY, sort=True)[['count', 'sum', 'sum_sq']].sum()
+        count = per_sku['count']
+        mean = (per_sku['sum'] / count).where(count > 0)
+        var = ((per_sku['sum_sq'] - per_sku['sum'] ** 2 / count) / (count - 1)).where(count > 1)
+        return pd.DataFrame({'count': count, 'mean': mean, 'std': np.sqrt(var.clip(lower=0))})
+
+    def daily_sigma(self, start=None, end=None):
+        """
+        Std (ddof=1) of daily demand per SKU over the window, days without
+        movements counting as zero demand (safety_stock.daily_demand_sigma).
+        """
+        window = self._window(start, end)
+        first, last = self.day_range(start, end)
+        n_days = (last - first).days + 1 if len(window) else 0
+        daily = window.groupby([KEY, 'Day'], sort=False)['sum'].sum()
+        per_sku = pd.DataFrame({
+            'sum': daily.groupby(level=0).sum(),
+            'sum_sq': (daily ** 2).groupby(level=0).sum(),
+        })
+        if n_days < 2:
+            return pd.Series(np.nan, index=per_sku.index, name='sigma_daily')
+        var = (per_sku['sum_sq'] - per_sku['sum'] ** 2 / n_days) / (n_days - 1)
+        return np.sqrt(var.clip(lower=0)).rename('sigma_daily')
+
+    def lead_time_demand(self, lead_time_days, start=None, end=None):
+        """Mean / sigma of daily demand and of demand over the lead time per SKU."""
+        window = self._window(start, end)
+        first, last = self.day_range(start, end)
+        n_days = max((last - first).days + 1, 1) if len(window) else 1
+        mean_daily = window.groupby(KEY)['sum'].sum() / n_days
+        sigma_daily = self.daily_sigma(start, end).reindex(mean_daily.index)
+        return pd.DataFrame({
+            'mean_daily': mean_daily,
+            'sigma_daily': sigma_daily,
+            'lead_time_demand': mean_daily * lead_time_days,
+            'lead_time_sigma': sigma_daily * np.sqrt(lead_time_days),
+        })
+
+    def last_movement(self):
+        return self.table.groupby(KEY)['last_movement'].max()
+
+
+def update_cube(paths=(MOVEMENTS_FILE,), cube_file=None, chunk_size=CHUNK_SIZE):
+    """
+    Load the cube (default: next to the first movement file), ingest new /
+    changed movement files and save it if anything changed. Returns the cube
+    of ``paths`` only.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    cube_file = cube_file or default_cube_file(paths[0])
+    cube = DemandCube.load(cube_file)
+    changed = [cube.ingest(path, chunk_size) for path in paths]
+    if any(changed):
+        cube.save(cube_file)
+    return cube.select([os.path.abspath(path) for path in paths])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Ingest movement files into the demand cube')
+    parser.add_argument('movements', nargs='*', default=[MOVEMENTS_FILE])
+    parser.add_argument('--cube', default=None, help=f'Cube file (default: {CUBE_FILE} next to the first movement file)')
+    parser.add_argument('--rebuild', action='store_true', help='Drop the cube and ingest from scratch')
+    args = parser.parse_args()
+
+    args.cube = args.cube or default_cube_file(args.movements[0])
+    if args.rebuild:
+        for path in (args.cube, manifest_path(args.cube)):
+            if os.path.exists(path):
+                os.remove(path)
+    cube = update_cube(args.movements, args.cube)
+    print(f"✅ Demand cube '{args.cube}': {len(cube.table):,} SKU-day rows "
+          f"from {len(cube.sources)} file(s), {cube.table[KEY].nunique():,} SKUs.")
@@ -0,0 +1,199 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# ----------------------------
+# Simulator event log and replay
+# ----------------------------
+# Every state transition of a vna_sim / pick_waves run is one row of a
+# columnar log: simulated time (float64), kind (int8), VNA (int16), order
+# (int32) and location (int32 code into a string table). The log is saved as
+# an uncompressed .npz, so reading it back is a handful of array loads, and
+# the replay functions rebuild the metric panel and per-VNA utilization
+# timelines with vectorized numpy instead of re-running the simulation.
+
+CREATED, ASSIGNED, ARRIVED, LIFTED, RETURNED, LOWERED, SKIPPED = range(7)
+KIND_NAMES = ('created', 'assigned', 'arrived', 'lifted', 'returned', 'lowered', 'skipped')
+
+COLUMNS = {
+    'time': np.float64,
+    'kind': np.int8,
+    'vna': np.int16,
+    'order': np.int32,
+    'location': np.int32,
+}
+
+
+class EventLog:
+    """Append-only event recorder; pass it to a simulator as ``log``."""
+
+    def __init__(self):
+        self._columns = {name: [] for name in COLUMNS}
+        self._locations = {}
+        self.sim_time = 0.0
+        self.vna_count = 0
+
+    def __len__(self):
+        return len(self._columns['time'])
+
+    def record(self, t, kind, vna=-1, order=-1, location=None):
+        columns = self._columns
+        columns['time'].append(t)
+        columns['kind'].append(kind)
+        columns['vna'].append(vna)
+        columns['order'].append(order)
+        columns['location'].append(-1 if location is None
+                                   else self._locations.setdefault(location, len(self._locations)))
+
+    def finish(self, sim_time, vna_count):
+        """End of the run: simulated end time and fleet size (utilization denominator)."""
+        self.sim_time = sim_time
+        self.vna_count = vna_count
+
+    def arrays(self):
+        data = {name: np.asarray(values, dtype=COLUMNS[name]) for name, values in self._columns.items()}
+        data['locations'] = np.array(list(self._locations), dtype=str)
+        data['sim_time'] = np.float64(self.sim_time)
+        data['vna_count'] = np.int32(self.vna_count)
+        return data
+
+    def save(self, path):
+        np.savez(path, **self.arrays())
+
+
+def read_log(path):
+    """Arrays of a saved log (column name -> numpy array)."""
+    with np.load(path) as npz:
+        return {name: npz[name] for name in npz.files}
+
+
+def events_frame(log):
+    """Log arrays as a readable DataFrame (kind and location decoded)."""
+    locations = np.r_[log['locations'], '']
+    return pd.DataFrame({
+        'time': log['time'],
+        'kind': pd.Categorical.from_codes(log['kind'], KIND_NAMES),
+        'vna': log['vna'],
+        'order': log['order'],
+        'location': locations[log['location']],
+    })
+
+
+# ----------------------------
+# Replay
+# ----------------------------
+def busy_transitions(log):
+    """
+    Per-VNA busy steps: (vna, time, busy) sorted by VNA then time, where a
+    VNA is busy while it holds assigned, not yet lowered orders (a wave
+    holds several at once).
+    """
+    kind = log['kind']
+    mask = (kind == ASSIGNED) | (kind == LOWERED)
+    vna, t = log['vna'][mask], log['time'][mask]
+    delta = np.where(kind[mask] == ASSIGNED, 1, -1)
+    order = np.lexsort((-delta, t, vna))             # assignments before deliveries at equal times
+    vna, t, delta = vna[order], t[order], delta[order]
+    held = np.cumsum(delta)
+    starts = np.r_[0, np.flatnonzero(np.diff(vna)) + 1]
+    held -= np.repeat(np.r_[0, held[starts[1:] - 1]], np.diff(np.r_[starts, len(vna)]))
+    return vna, t, held > 0
+
+
+def _cumulative_busy(t, busy, at):
+    """Busy seconds up to each time in ``at`` for one VNA's step function."""
+    spent = np.r_[0.0, np.cumsum(np.diff(t) * busy[:-1])]
+    idx = np.searchsorted(t, at, side='right') - 1
+    before = idx < 0
+    idx = np.maximum(idx, 0)
+    result = spent[idx] + np.where(busy[idx], at - t[idx], 0.0)
+    return np.where(before, 0.0, result)
+
+
+def replay_metrics(log):
+    """The simulator's metric panel, rebuilt from the log."""
+    kind = log['kind']
+    sim_time = float(log['sim_time'])
+    vna_count = int(log['vna_count'])
+    processed = int(np.count_nonzero(kind == LOWERED))
+    vna, t, busy = busy_transitions(log)
+    bounds = np.r_[0, np.flatnonzero(np.diff(vna)) + 1, len(vna)]
+    busy_time = sum(float(_cumulative_busy(t[a:b], busy[a:b], np.array([sim_time]))[0])
+                    for a, b in zip(bounds[:-1], bounds[1:]))
+    capacity = sim_time * vna_count
+    return {
+        'ordersProcessed': processed,
+        'avgPickTime': busy_time / processed if processed else 0.0,
+        'totalTime': busy_time,
+        'palletsMoved': processed,
+        'utilization': 100 * busy_time / capacity if capacity else 0.0,
+        'ordersSkipped': int(np.count_nonzero(kind == SKIPPED)),
+        'simTime': sim_time,
+    }
+
+
+def utilization_timeline(log, bucket_seconds=900):
+    """Busy share (%) per VNA per time bucket; rows are bucket start seconds."""
+    sim_time = float(log['sim_time'])
+    edges = np.arange(0.0, sim_time + bucket_seconds, bucket_seconds)
+    edges[-1] = min(edges[-1], sim_time)
+    widths = np.diff(edges)
+    vna, t, busy = busy_transitions(log)
+    bounds = np.r_[0, np.flatnonzero(np.diff(vna)) + 1, len(vna)]
+    timeline = {}
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        spent = np.diff(_cumulative_busy(t[a:b], busy[a:b], edges))
+        timeline[int(vna[a])] = 100 * spent / np.where(widths > 0, widths, 1)
+    for idle in range(int(log['vna_count'])):
+        timeline.setdefault(idle, np.zeros(len(widths)))
+    frame = pd.DataFrame(timeline, index=pd.Index(edges[:-1], name='bucket_start_s'))
+    return frame[sorted(frame.columns)].add_prefix('VNA_')
+
+
+# Legs between consecutive events of one VNA; lifted->arrived is the drive
+# between two stops of a pick wave
+LEGS = ((ASSIGNED, ARRIVED), (ARRIVED, LIFTED), (LIFTED, ARRIVED), (LIFTED, RETURNED), (RETURNED, LOWERED))
+
+
+def state_durations(log):
+    """
+    Seconds spent per leg (assigned->arrived->lifted->returned->lowered),
+    summed per VNA. Legs are the gaps between consecutive events of a VNA, so
+    a wave's shared drives are counted once, not once per order, and the legs
+    add up to the VNA's busy time.
+    """
+    events = pd.DataFrame({'vna': log['vna'], 'kind': log['kind'], 'time': log['time']})
+    events = events[(events['vna'] >= 0) & events['kind'].between(ASSIGNED, LOWERED)]
+    events = events.sort_values(['vna', 'time'], kind='stable')
+    previous = events.shift()
+    same_vna = events['vna'] == previous['vna']
+    seconds = events['time'] - previous['time']
+    legs = {}
+    for start, end in LEGS:
+        mask = same_vna & (previous['kind'] == start) & (events['kind'] == end)
+        if mask.any():
+            legs[f'{KIND_NAMES[start]}->{KIND_NAMES[end]}'] = seconds[mask].groupby(events['vna'][mask]).sum()
+    return pd.DataFrame(legs).fillna(0.0).rename_axis('vna')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replay a saved simulator event log')
+    parser.add_argument('log', help='.npz event log (vna_sim.py --event-log)')
+    parser.add_argument('--bucket', type=float, default=900, help='Utilization timeline bucket (s)')
+    parser.add_argument('--timeline', default=None, help='Optional CSV output of the utilization timeline')
+    args = parser.parse_args()
+
+    log = read_log(args.log)
+    metrics = replay_metrics(log)
+    timeline = utilization_timeline(log, args.bucket)
+    if args.timeline:
+        timeline.to_csv(args.timeline)
+
+    print("=" * 50)
+    print(f"🔁 REPLAY: {len(log['time']):,} events")
+    print("=" * 50)
+    for name, value in metrics.items():
+        print(f"{name:<16}: {value:,.1f}" if isinstance(value, float) else f"{name:<16}: {value:,}")
+    print("-" * 50)
+    print(timeline.head(12).round(1).to_string())
+    print("=" * 50)
@@ -1,94 +1,171 @@
-import pandas as pd
-import matplotlib.pyplot as plt
 from datetime import datetime
+import functools
 import locale
-import numpy as np
 
-# Türkçe yerel ayarı
-try:
-    locale.setlocale(locale.LC_ALL, 'tr_TR.UTF-8')
-except locale.Error:
+from inventory_loader import load_inventory
+from profiling import profiled, profiled_run, span
+from result_cache import cached_result
+from warehouse_partitions import ensure_partitions, partitioned_kpis
+
+CURRENT_DATE = datetime(2025, 11, 19)
+SLOW_MOVING_DAYS = 180
+CONCENTRATION_SHARE = 0.63
+OUTPUT_FILE = 'gun1_stok_analizi_grafigi.png'
+
+# Çok depolu kurulumlar için True: metrikler depo bölümleri (partition) üzerinde
+# ayrı işlemlerde hesaplanır ve birleştirilir
+PARTITIONED = False
+
+
+# Türkçe yerel ayarı: bir kez ayarlanır, format_tl ilk kullanımda çağırır
+@functools.lru_cache(maxsize=None)
+def set_turkish_locale():
     try:
-        locale.setlocale(locale.LC_ALL, 'Turkish_Turkey.1254')
+        locale.setlocale(locale.LC_ALL, 'tr_TR.UTF-8')
     except locale.Error:
-        print("Uyarı: Türkçe yerel ayar ayarlanamadı. Para birimi formatı varsayılan kalacak.")
-
-# CSV yükleme
-try:
-    df = pd.read_csv('inventory.csv')
-except FileNotFoundError:
-    print("inventory.csv dosyası bulunamadı.")
-    exit()
-
-df['Last_Movement_Date'] = pd.to_datetime(df['Last_Movement_Date'])
-current_date = datetime(2025, 11, 19)
-
-# --- 0. Toplam Stok Maliyeti ---
-total_stock_cost = df['Total_Cost'].sum()
-formatted_total_cost = locale.currency(total_stock_cost, grouping=True, symbol='₺')
-
-# --- 1. Güvenlik Stoğu İhlalleri ---
-safety_stock_violations = df[df['Stock_Qty'] < df['Safety_Stock']].shape[0]
-total_sku_count = df.shape[0]
-violation_percentage = (safety_stock_violations / total_sku_count) * 100
-
-# --- 2. Yavaş Hareket Eden Stok (180+ Gün) ---
-days_since_last_movement = (current_date - df['Last_Movement_Date']).dt.days
-slow_moving_stock_count = df[days_since_last_movement > 180].shape[0]
-slow_moving_percentage = (slow_moving_stock_count / total_sku_count) * 100
-
-# --- 3. SKU Yoğunlaşması (63% Maliyet) ---
-df_sorted = df.sort_values(by='Total_Cost', ascending=False)
-df_sorted['Cumulative_Cost'] = df_sorted['Total_Cost'].cumsum()
-target_cost = df_sorted['Total_Cost'].sum() * 0.63
-sku_concentration = df_sorted[df_sorted['Cumulative_Cost'] <= target_cost].shape[0]
-concentration_percentage = (sku_concentration / total_sku_count) * 100
-
-# --- 4. Warehouse Bazında Stok Değeri (TL) ---
-warehouse_stock_cost = df.groupby('Warehouse')['Total_Cost'].sum()
-warehouse_names = warehouse_stock_cost.index
-warehouse_values = warehouse_stock_cost.values
+        try:
+            locale.setlocale(locale.LC_ALL, 'Turkish_Turkey.1254')
+        except locale.Error:
+            print("Uyarı: Türkçe yerel ayar ayarlanamadı. Para birimi formatı varsayılan kalacak.")
+
+
+def format_tl(value):
+    set_turkish_locale()
+    try:
+        return locale.currency(value, grouping=True, symbol='₺')
+    except ValueError:
+        # 'C' yerel ayarında locale.currency çalışmaz: varsayılan format
+        return f"{value:,.2f} ₺"
+
+
+@profiled()
+@cached_result('gun1')
+def compute(df, current_date=CURRENT_DATE, slow_moving_days=SLOW_MOVING_DAYS,
+            concentration_share=CONCENTRATION_SHARE):
+    # --- 0. Toplam Stok Maliyeti ---
+    total_stock_cost = df['Total_Cost'].sum()
+
+    # --- 1. Güvenlik Stoğu İhlalleri ---
+    safety_stock_violations = df[df['Stock_Qty'] < df['Safety_Stock']].shape[0]
+    total_sku_count = df.shape[0]
+    violation_percentage = (safety_stock_violations / total_sku_count) * 100
+
+    # --- 2. Yavaş Hareket Eden Stok (180+ Gün) ---
+    days_since_last_movement = (current_date - df['Last_Movement_Date']).dt.days
+    slow_moving_stock_count = df[days_since_last_movement > slow_moving_days].shape[0]
+    slow_moving_percentage = (slow_moving_stock_count / total_sku_count) * 100
+
+    # --- 3. SKU Yoğunlaşması (63% Maliyet) ---
+    with span('concentration_sort'):
+        df_sorted = df.sort_values(by='Total_Cost', ascending=False)
+        cumulative_cost = df_sorted['Total_Cost'].cumsum()
+    target_cost = df_sorted['Total_Cost'].sum() * concentration_share
+    sku_concentration = df_sorted[cumulative_cost <= target_cost].shape[0]
+    concentration_percentage = (sku_concentration / total_sku_count) * 100
+
+    # --- 4. Warehouse Bazında Stok Değeri (TL) ---
+    warehouse_stock_cost = df.groupby('Warehouse', observed=True)['Total_Cost'].sum()
+
+    return {
+        'total_stock_cost': total_stock_cost,
+        'safety_stock_violations': safety_stock_violations,
+        'violation_percentage': violation_percentage,
+        'slow_moving_stock_count': slow_moving_stock_count,
+        'slow_moving_percentage': slow_moving_percentage,
+        'sku_concentration': sku_concentration,
+        'concentration_percentage': concentration_percentage,
+        'warehouse_stock_cost': warehouse_stock_cost,
+    }
+
+
+def report(results):
+    print(f"Toplam Stok Maliyeti: {format_tl(results['total_stock_cost'])}")
+    print(f"Güvenlik Stoğu İhlali: {results['safety_stock_violations']} SKU (%{results['violation_percentage']:.1f})")
+    print(f"Yavaş Hareket (180+ gün): {results['slow_moving_stock_count']} SKU (%{results['slow_moving_percentage']:.1f})")
+    print(f"Maliyetin %63'ü: {results['sku_concentration']} SKU (%{results['concentration_percentage']:.1f})")
+    for warehouse, cost in results['warehouse_stock_cost'].items():
+        print(f"   • {warehouse}: {format_tl(cost)}")
+
 
 # --- Grafik Oluşturma ---
-fig, axs = plt.subplots(2, 2, figsize=(16, 12))
-
-# 1. Güvenlik Stoğu İhlalleri
-axs[0,0].bar(['Güvenlik Stoğu İhlali'], [violation_percentage], color='#1f77b4')
-axs[0,0].set_ylim(0,100)
-axs[0,0].set_ylabel('Oran (%)')
-for i, v in enumerate([violation_percentage]):
-    axs[0,0].text(i, v+1, f'{v:.2f}%', ha='center', fontweight='bold')
-
-# 2. Yavaş Hareket Eden Stok
-axs[0,1].bar(['180+ Gün Hareketsiz Stok'], [slow_moving_percentage], color='#ff7f0e')
-axs[0,1].set_ylim(0,100)
-axs[0,1].set_ylabel('Oran (%)')
-for i, v in enumerate([slow_moving_percentage]):
-    axs[0,1].text(i, v+1, f'{v:.2f}%', ha='center', fontweight='bold')
-
-# 3. SKU Yoğunlaşması
-axs[1,0].bar(['%63 Maliyeti Oluşturan SKU'], [concentration_percentage], color='#2ca02c')
-axs[1,0].set_ylim(0,100)
-axs[1,0].set_ylabel('Oran (%)')
-for i, v in enumerate([concentration_percentage]):
-    axs[1,0].text(i, v+1, f'{v:.2f}%', ha='center', fontweight='bold')
-
-# 4. Warehouse Bazında Stok Değeri (TL)
-axs[1,1].bar(warehouse_names, warehouse_values, color='#38b6ff')
-axs[1,1].set_ylabel('Stok Değeri (₺)')
-for i, v in enumerate(warehouse_values):
-    axs[1,1].text(i, v + max(warehouse_values)*0.01, f"{locale.currency(v, grouping=True, symbol='₺')}", 
-                   ha='center', fontweight='bold', fontsize=10)
-
-# Genel başlık ve toplam maliyet alt başlığı
-plt.suptitle(f'Gün 1: Operasyonel Risk ve Maliyet Metrikleri\nToplam Stok Maliyeti: {formatted_total_cost}', fontsize=16, fontweight='bold')
-plt.tight_layout(rect=[0,0,1,0.95])
-
-plt.savefig('gun1_stok_analizi_grafigi.png')
-plt.show()
-
-print("-"*50)
-print(f"✅ Analiz Başarılı.")
-print(f"Toplam Stok Maliyeti: {formatted_total_cost}")
-print(f"Grafik 'gun1_stok_analizi_grafigi.png' olarak kaydedildi.")
-print("-"*50)
\ No newline at end of file
+@profiled()
+def render(results):
+    import matplotlib.pyplot as plt
+    violation_percentage = results['violation_percentage']
+    slow_moving_percentage = results['slow_moving_percentage']
+    concentration_percentage = results['concentration_percentage']
+    warehouse_names = results['warehouse_stock_cost'].index.astype(str)
+    warehouse_values = results['warehouse_stock_cost'].values
+    formatted_total_cost = format_tl(results['total_stock_cost'])
+
+    fig, axs = plt.subplots(2, 2, figsize=(16, 12))
+
+    # 1. Güvenlik Stoğu İhlalleri
+    axs[0,0].bar(['Güvenlik Stoğu İhlali'], [violation_percentage], color='#1f77b4')
+    axs[0,0].set_ylim(0,100)
+    axs[0,0].set_ylabel('Oran (%)')
+    for i, v in enumerate([violation_percentage]):
+        axs[0,0].text(i, v+1, f'{v:.2f}%', ha='center', fontweight='bold')
+
+    # 2. Yavaş Hareket Eden Stok
+    axs[0,1].bar(['180+ Gün Hareketsiz Stok'], [slow_moving_percentage], color='#ff7f0e')
+    axs[0,1].set_ylim(0,100)
+    axs[0,1].set_ylabel('Oran (%)')
+    for i, v in enumerate([slow_moving_percentage]):
+        axs[0,1].text(i, v+1, f'{v:.2f}%', ha='center', fontweight='bold')
+
+    # 3. SKU Yoğunlaşması
+    axs[1,0].bar(['%63 Maliyeti Oluşturan SKU'], [concentration_percentage], color='#2ca02c')
+    axs[1,0].set_ylim(0,100)
+    axs[1,0].set_ylabel('Oran (%)')
+    for i, v in enumerate([concentration_percentage]):
+        axs[1,0].text(i, v+1, f'{v:.2f}%', ha='center', fontweight='bold')
+
+    # 4. Warehouse Bazında Stok Değeri (TL)
+    axs[1,1].bar(warehouse_names, warehouse_values, color='#38b6ff')
+    axs[1,1].set_ylabel('Stok Değeri (₺)')
+    for i, v in enumerate(warehouse_values):
+        axs[1,1].text(i, v + max(warehouse_values)*0.01, f"{format_tl(v)}",
+                       ha='center', fontweight='bold', fontsize=10)
+
+    # Genel başlık ve toplam maliyet alt başlığı
+    fig.suptitle(f'Gün 1: Operasyonel Risk ve Maliyet Metrikleri\nToplam Stok Maliyeti: {formatted_total_cost}', fontsize=16, fontweight='bold')
+    fig.tight_layout(rect=[0,0,1,0.95])
+    return fig
+
+
+# Toplu rapor (batch_report.py) için: dosya adı -> (çizim fonksiyonu, savefig ayarları)
+FIGURES = {OUTPUT_FILE: (render, {})}
+
+
+@profiled_run('gun1')
+def main():
+    import matplotlib.pyplot as plt
+
+    # CSV yükleme
+    try:
+        if PARTITIONED:
+            results = partitioned_kpis(ensure_partitions('inventory.csv'), current_date=CURRENT_DATE)
+        else:
+            with span('load') as load:
+                df = load_inventory('inventory.csv')
+                load.rows = len(df)
+            results = compute(df)
+    except FileNotFoundError:
+        print("inventory.csv dosyası bulunamadı.")
+        exit()
+
+    fig = render(results)
+    with span('savefig'):
+        fig.savefig(OUTPUT_FILE)
+    plt.show()
+
+    print("-"*50)
+    print(f"✅ Analiz Başarılı.")
+    print(f"Toplam Stok Maliyeti: {format_tl(results['total_stock_cost'])}")
+    print(f"Grafik '{OUTPUT_FILE}' olarak kaydedildi.")
+    print("-"*50)
+
+
+if __name__ == '__main__':
+    main()
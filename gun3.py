@@ -1,55 +1,99 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+from demand_cube import update_cube
+from movement_stream import stream_demand_stats
+from profiling import profiled, profiled_run, span
+from result_cache import cached_result
 
-# -----------------------------------------
-# 1) Veri Yükleme
-# -----------------------------------------
-df = pd.read_csv("outbound_movements.csv")
+# Büyük hareket geçmişi için True: dosya parça parça okunur,
+# bellek kullanımı satır sayısıyla değil SKU sayısıyla sınırlı kalır
+STREAMING = False
 
-# -----------------------------------------
-# 2) Kolonları doğru tipe çevirme
-# -----------------------------------------
-df["Document_Date"] = pd.to_datetime(df["Document_Date"])
-df["Quantity"] = pd.to_numeric(df["Quantity"], errors="coerce")
 
-# -----------------------------------------
-# 3) SKU (Material_ID) bazında talep istatistikleri
-# -----------------------------------------
-summary = df.groupby("Material_ID")["Quantity"].agg(["mean", "std"]).reset_index()
-summary["cv"] = summary["std"] / summary["mean"]
+def summarize(summary):
+    summary["cv"] = summary["std"] / summary["mean"]
 
-# 0'a bölme ve NaN temizliği
-summary = summary.dropna()
-summary = summary[summary["mean"] > 0]
+    # 0'a bölme ve NaN temizliği
+    summary = summary.dropna()
+    summary = summary[summary["mean"] > 0]
+
+    # -----------------------------------------
+    # 4) Top 10 riskli SKU (CV yüksek)
+    # -----------------------------------------
+    top10_risk = summary.sort_values("cv", ascending=False).head(10)
+    return {'summary': summary, 'top10_risk': top10_risk}
+
+
+@profiled()
+@cached_result('gun3')
+def compute(cube, start=None, end=None):
+    # -----------------------------------------
+    # 3) SKU (Material_ID) bazında talep istatistikleri
+    # Talep küpünden (SKU x gün: adet, toplam, kareler toplamı) türetilir,
+    # hareket geçmişi yeniden taranmaz; start/end ile pencere seçilebilir
+    # -----------------------------------------
+    summary = cube.movement_stats(start, end)[["mean", "std"]].reset_index()
+    return summarize(summary)
 
-# -----------------------------------------
-# 4) Top 10 riskli SKU (CV yüksek)
-# -----------------------------------------
-top10_risk = summary.sort_values("cv", ascending=False).head(10)
 
 # -----------------------------------------
 # 5) Scatter Plot
 # -----------------------------------------
-plt.figure(figsize=(12, 7))
+@profiled()
+def render(results):
+    import matplotlib.pyplot as plt
+    summary = results['summary']
+    top10_risk = results['top10_risk']
+
+    fig = plt.figure(figsize=(12, 7))
+
+    # Risk ve stabil bölgeleri renklendir
+    colors = summary["cv"].apply(lambda x: 'red' if x > 1 else 'green')
+    plt.scatter(summary["mean"], summary["cv"], c=colors, s=45, alpha=0.7)
+
+    # CV = 1 eşik çizgisi
+    plt.axhline(y=1, linestyle="--", color='black', linewidth=1)
+    plt.text(summary["mean"].max()*0.7, 1.05, "CV = 1 Eşiği", fontsize=10, color='black')
+
+    # Top 10 riskli SKU isimlerini grafikte göster
+    for _, row in top10_risk.iterrows():
+        plt.text(row["mean"], row["cv"] + 0.03, row["Material_ID"], fontsize=9, ha='center')
+
+    # Axes ve log scale
+    plt.xscale('log')
+    plt.xlabel("Average Demand (Mean)")
+    plt.ylabel("Demand Variability (CV)")
+    plt.title("SKU-Based Demand Variability (Mean vs CV)")
+
+    plt.grid(True, linestyle='--', alpha=0.5)
+    plt.tight_layout()
+    return fig
+
+
+# Toplu rapor (batch_report.py) için: dosya adı -> (çizim fonksiyonu, savefig ayarları)
+FIGURES = {'gun3_talep_degiskenligi.png': (render, {})}
 
-# Risk ve stabil bölgeleri renklendir
-colors = summary["cv"].apply(lambda x: 'red' if x > 1 else 'green')
-plt.scatter(summary["mean"], summary["cv"], c=colors, s=45, alpha=0.7)
 
-# CV = 1 eşik çizgisi
-plt.axhline(y=1, linestyle="--", color='black', linewidth=1)
-plt.text(summary["mean"].max()*0.7, 1.05, "CV = 1 Eşiği", fontsize=10, color='black')
+@profiled_run('gun3')
+def main():
+    import matplotlib.pyplot as plt
+    if STREAMING:
+        # -----------------------------------------
+        # 1-3) Parçalı okuma + SKU bazında Welford istatistikleri
+        # -----------------------------------------
+        with span('stream_demand_stats'):
+            stats = stream_demand_stats("outbound_movements.csv").reset_index()
+        results = summarize(stats)
+    else:
+        # -----------------------------------------
+        # 1-2) Talep küpünü güncelleme (yalnızca yeni / değişen hareket dosyaları okunur)
+        # -----------------------------------------
+        with span('update_cube') as load:
+            cube = update_cube("outbound_movements.csv")
+            load.rows = len(cube.table)
+        results = compute(cube)
 
-# Top 10 riskli SKU isimlerini grafikte göster
-for _, row in top10_risk.iterrows():
-    plt.text(row["mean"], row["cv"] + 0.03, row["Material_ID"], fontsize=9, ha='center')
+    render(results)
+    plt.show()
 
-# Axes ve log scale
-plt.xscale('log')
-plt.xlabel("Average Demand (Mean)")
-plt.ylabel("Demand Variability (CV)")
-plt.title("SKU-Based Demand Variability (Mean vs CV)")
 
-plt.grid(True, linestyle='--', alpha=0.5)
-plt.tight_layout()
-plt.show()
+if __name__ == '__main__':
+    main()
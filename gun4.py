@@ -1,41 +1,20 @@
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
-from scipy.stats import norm
-
-# Dosyanızı okuyun
-try:
-    df = pd.read_csv('inventory.csv')
-except FileNotFoundError:
-    print("inventory.csv dosyası bulunamadı. Lütfen dosya adını kontrol edin.")
-    exit()
-
-# 1. ABC Sınıflandırması (Gün 2 Tekrarı - A ve C sınıfı ürünleri bulmak için)
-df_abc = df.sort_values(by='Total_Cost', ascending=False).copy()
-Total_Cost = df_abc['Total_Cost'].sum()
-df_abc['Cum_Cost_Pct'] = (df_abc['Total_Cost'].cumsum() / Total_Cost) * 100
-
-# 2. Örnek SKU'ları Seçme
-# En yüksek maliyetli A Sınıfı ürün
-sku_a = df_abc.iloc[0] 
-# En düşük maliyetli C Sınıfı ürün
-sku_c = df_abc.iloc[-1] 
-
-# 3. Güvenlik Stoğu Parametrelerini Simüle Etme (Gerçek veriye dayalı olmadığı için varsayımsal)
-# Amaç: İki ürünün de talebi biraz değişken olsun, A ürünü daha az değişken (daha profesyonel yönetiliyor)
-# Bu analiz için kritik parametre: Unit_Cost (Birim Maliyet)
- 
+
+from abc_engine import ABC_A, ABC_C, classify
+from demand_cube import update_cube
+from inventory_loader import load_inventory
+from profiling import profiled, profiled_run, span
+from result_cache import cached_result
+from safety_stock import LEAD_TIME_DAYS, MOVEMENTS_FILE, portfolio_cost_curve, sku_demand_table, z_value
+
 # Z-skorları (Service Level - Hizmet Seviyesi)
 sl_low = 0.90  # Düşük Öncelik (C Sınıfı için ideal)
 sl_high = 0.98 # Yüksek Öncelik (A Sınıfı için ideal)
-z_low = norm.ppf(sl_low)  # Örn: 1.28
-z_high = norm.ppf(sl_high) # Örn: 2.05
 
-# Talep Değişkenliği (Std Dev x Köklü Lead Time) Simülasyonu
-# A Sınıfı: Düşük değişkenlik (CV düşük)
-demand_dev_a = 50 
-# C Sınıfı: Yüksek değişkenlik (CV yüksek)
-demand_dev_c = 85 
+COMPARISON_FILE = 'gun4_ss_maliyet_etkisi.png'
+PORTFOLIO_FILE = 'gun4_ss_portfoy_egrisi.png'
+
 
 # 4. Güvenlik Stoğu (SS) ve Kilitlenen Sermayeyi Hesaplama
 def calculate_ss_cost(sku, z_score, demand_dev):
@@ -43,66 +22,195 @@ def calculate_ss_cost(sku, z_score, demand_dev):
     ss_cost = ss * sku['Unit_Cost']
     return ss, ss_cost
 
-# A Sınıfı Hesaplamalar
-ss_a_low, cost_a_low = calculate_ss_cost(sku_a, z_low, demand_dev_a)
-ss_a_high, cost_a_high = calculate_ss_cost(sku_a, z_high, demand_dev_a)
 
-# C Sınıfı Hesaplamalar
-ss_c_low, cost_c_low = calculate_ss_cost(sku_c, z_low, demand_dev_c)
-ss_c_high, cost_c_high = calculate_ss_cost(sku_c, z_high, demand_dev_c)
+@profiled()
+@cached_result('gun4')
+def compute(df, cube=None):
+    # 1. ABC Sınıflandırması (ortak ABC motoru - A ve C sınıfı ürünleri bulmak için)
+    abc = classify(df)
+
+    # 2. Örnek SKU'ları Seçme
+    # Sınıf boşsa (örn. tek ürün maliyetin %80'inden fazlası) en yüksek / en düşük maliyetli ürün
+    costs = df['Total_Cost']
+    a_costs = costs.where(abc == ABC_A)
+    c_costs = costs.where(abc == ABC_C)
+    # En yüksek maliyetli A Sınıfı ürün
+    sku_a = df.loc[(a_costs if a_costs.notna().any() else costs).idxmax()]
+    # En düşük maliyetli C Sınıfı ürün
+    sku_c = df.loc[(c_costs if c_costs.notna().any() else costs).idxmin()]
+
+    # 3. Güvenlik Stoğu Parametrelerini Simüle Etme (Gerçek veriye dayalı olmadığı için varsayımsal)
+    # Amaç: İki ürünün de talebi biraz değişken olsun, A ürünü daha az değişken (daha profesyonel yönetiliyor)
+    # Bu analiz için kritik parametre: Unit_Cost (Birim Maliyet)
+    z_low = z_value(sl_low)  # Örn: 1.28
+    z_high = z_value(sl_high) # Örn: 2.05
+
+    # Talep Değişkenliği (Std Dev x Köklü Lead Time)
+    # Talep küpü varsa SKU bazında günlük talep sapmasından türetilir
+    curve = None
+    portfolio = None
+    if cube is not None:
+        sku_demand = sku_demand_table(df, sigma_daily=cube.daily_sigma())
+        demand_dev_a = sku_demand.loc[sku_a['Material_ID'], 'sigma_daily'] * np.sqrt(LEAD_TIME_DAYS)
+        demand_dev_c = sku_demand.loc[sku_c['Material_ID'], 'sigma_daily'] * np.sqrt(LEAD_TIME_DAYS)
+
+        # 7. Portföy Geneli Maliyet Eğrisi (tüm SKU'lar x hizmet seviyeleri)
+        curve = portfolio_cost_curve(sku_demand['sigma_daily'], sku_demand['Unit_Cost'])
+        portfolio = portfolio_cost_curve(sku_demand['sigma_daily'], sku_demand['Unit_Cost'],
+                                         service_levels=[sl_low, sl_high])['Capital_Locked'].tolist()
+    else:
+        # Simülasyon - A Sınıfı: Düşük değişkenlik (CV düşük)
+        demand_dev_a = 50
+        # Simülasyon - C Sınıfı: Yüksek değişkenlik (CV yüksek)
+        demand_dev_c = 85
+
+    # A Sınıfı Hesaplamalar
+    ss_a_low, cost_a_low = calculate_ss_cost(sku_a, z_low, demand_dev_a)
+    ss_a_high, cost_a_high = calculate_ss_cost(sku_a, z_high, demand_dev_a)
+
+    # C Sınıfı Hesaplamalar
+    ss_c_low, cost_c_low = calculate_ss_cost(sku_c, z_low, demand_dev_c)
+    ss_c_high, cost_c_high = calculate_ss_cost(sku_c, z_high, demand_dev_c)
+
+    # 5. Grafik için Veri Yapılandırma
+    data = {
+        'SKU': [sku_a['Material_ID'] + ' (A-Class)', sku_c['Material_ID'] + ' (C-Class)'], # Burada İngilizce
+        'Unit_Cost': [sku_a['Unit_Cost'], sku_c['Unit_Cost']],
+        'SS_Cost_90': [cost_a_low, cost_c_low],
+        'SS_Cost_98': [cost_a_high, cost_c_high]
+    }
+    return {
+        'sku_a': sku_a,
+        'sku_c': sku_c,
+        'df_plot': pd.DataFrame(data),
+        'curve': curve,
+        'portfolio': portfolio,
+        'n_skus': len(sku_demand) if cube is not None else 0,
+    }
 
 
-# 5. Grafik için Veri Yapılandırma
-data = {
-    'SKU': [sku_a['Material_ID'] + ' (A-Class)', sku_c['Material_ID'] + ' (C-Class)'], # Burada İngilizce
-    'Unit_Cost': [sku_a['Unit_Cost'], sku_c['Unit_Cost']],
-    'SS_Cost_90': [cost_a_low, cost_c_low],
-    'SS_Cost_98': [cost_a_high, cost_c_high]
+# 6. Görselleştirme (Kilitlenen Sermaye Karşılaştırması)
+@profiled()
+def render_comparison(results):
+    import matplotlib.pyplot as plt
+    df_plot = results['df_plot']
+    x = np.arange(len(df_plot))
+    width = 0.35
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    rects1 = ax.bar(x - width/2, df_plot['SS_Cost_90'], width, label='SL 90% (Lower Risk)', color='#1f77b4') # Burada İngilizce
+    rects2 = ax.bar(x + width/2, df_plot['SS_Cost_98'], width, label='SL 98% (Higher Risk)', color='#ff7f0e') # Burada İngilizce
+
+    # Başlık ve Etiketler
+    ax.set_ylabel('Capital Locked Value (TL)', fontsize=12) # Burada İngilizce
+    ax.set_title('Safety Stock Capital Locked by Service Level', fontsize=14, fontweight='bold') # Burada İngilizce
+    ax.set_xticks(x)
+    ax.set_xticklabels(df_plot['SKU'])
+    ax.legend()
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+
+    # Bar üzerine değerleri yazma
+    def autolabel(rects):
+        for rect in rects:
+            height = rect.get_height()
+            ax.annotate(f'{height:,.0f} ₺',
+                        xy=(rect.get_x() + rect.get_width() / 2, height),
+                        xytext=(0, 3),  # 3 points vertical offset
+                        textcoords="offset points",
+                        ha='center', va='bottom')
+
+    autolabel(rects1)
+    autolabel(rects2)
+
+    fig.tight_layout()
+    return fig
+
+
+@profiled()
+def render_portfolio(results):
+    import matplotlib.pyplot as plt
+    curve = results['curve']
+    if curve is None:
+        return None
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.plot(curve['Service_Level'] * 100, curve['Capital_Locked'], color='#1f77b4', linewidth=2.5)
+    for sl, color in [(sl_low, '#1f77b4'), (sl_high, '#ff7f0e')]:
+        ax.axvline(sl * 100, linestyle='--', color=color, alpha=0.8)
+    ax.set_xlabel('Service Level (%)', fontsize=12) # Burada İngilizce
+    ax.set_ylabel('Capital Locked Value (TL)', fontsize=12) # Burada İngilizce
+    ax.set_title(f"Portfolio Safety Stock Cost Curve ({results['n_skus']:,} SKUs, LT={LEAD_TIME_DAYS} days)",
+                 fontsize=14, fontweight='bold') # Burada İngilizce
+    ax.grid(linestyle='--', alpha=0.7)
+
+    fig.tight_layout()
+    return fig
+
+
+# Toplu rapor (batch_report.py) için: dosya adı -> (çizim fonksiyonu, savefig ayarları)
+FIGURES = {
+    COMPARISON_FILE: (render_comparison, {}),
+    PORTFOLIO_FILE: (render_portfolio, {}),
 }
-df_plot = pd.DataFrame(data)
 
-# 6. Görselleştirme (Kilitlenen Sermaye Karşılaştırması)
-x = np.arange(len(df_plot)) 
-width = 0.35
-
-fig, ax = plt.subplots(figsize=(10, 6))
-
-rects1 = ax.bar(x - width/2, df_plot['SS_Cost_90'], width, label='SL 90% (Lower Risk)', color='#1f77b4') # Burada İngilizce
-rects2 = ax.bar(x + width/2, df_plot['SS_Cost_98'], width, label='SL 98% (Higher Risk)', color='#ff7f0e') # Burada İngilizce
-
-# Başlık ve Etiketler
-ax.set_ylabel('Capital Locked Value (TL)', fontsize=12) # Burada İngilizce
-ax.set_title('Safety Stock Capital Locked by Service Level', fontsize=14, fontweight='bold') # Burada İngilizce
-ax.set_xticks(x)
-ax.set_xticklabels(df_plot['SKU'])
-ax.legend()
-ax.grid(axis='y', linestyle='--', alpha=0.7)
-
-# Bar üzerine değerleri yazma
-def autolabel(rects):
-    for rect in rects:
-        height = rect.get_height()
-        ax.annotate(f'{height:,.0f} ₺',
-                    xy=(rect.get_x() + rect.get_width() / 2, height),
-                    xytext=(0, 3),  # 3 points vertical offset
-                    textcoords="offset points",
-                    ha='center', va='bottom')
-
-autolabel(rects1)
-autolabel(rects2)
-
-plt.tight_layout()
-plt.savefig('gun4_ss_maliyet_etkisi.png')
-plt.show()
-
-print("\n" + "="*50)
-print("✅ ANALYSIS SUMMARY (Safety Stock Cost Impact):")
-print(f"A-Class Item ({sku_a['Material_ID']} Unit Cost: {sku_a['Unit_Cost']:.2f} ₺)")
-print(f" - Capital Locked for SL 90%: {cost_a_low:,.0f} ₺")
-print(f" - Capital Locked for SL 98%: {cost_a_high:,.0f} ₺ (Increase: {cost_a_high - cost_a_low:,.0f} ₺)")
-print("-" * 25)
-print(f"C-Class Item ({sku_c['Material_ID']} Unit Cost: {sku_c['Unit_Cost']:.2f} ₺)")
-print(f" - Capital Locked for SL 90%: {cost_c_low:,.0f} ₺")
-print(f" - Capital Locked for SL 98%: {cost_c_high:,.0f} ₺ (Increase: {cost_c_high - cost_c_low:,.0f} ₺)")
-print("Chart saved as 'gun4_ss_maliyet_etkisi.png'.")
-print("="*50)
\ No newline at end of file
+
+def report(results):
+    sku_a, sku_c = results['sku_a'], results['sku_c']
+    cost_a_low, cost_c_low = results['df_plot']['SS_Cost_90']
+    cost_a_high, cost_c_high = results['df_plot']['SS_Cost_98']
+
+    print("\n" + "="*50)
+    print("✅ ANALYSIS SUMMARY (Safety Stock Cost Impact):")
+    print(f"A-Class Item ({sku_a['Material_ID']} Unit Cost: {sku_a['Unit_Cost']:.2f} ₺)")
+    print(f" - Capital Locked for SL 90%: {cost_a_low:,.0f} ₺")
+    print(f" - Capital Locked for SL 98%: {cost_a_high:,.0f} ₺ (Increase: {cost_a_high - cost_a_low:,.0f} ₺)")
+    print("-" * 25)
+    print(f"C-Class Item ({sku_c['Material_ID']} Unit Cost: {sku_c['Unit_Cost']:.2f} ₺)")
+    print(f" - Capital Locked for SL 90%: {cost_c_low:,.0f} ₺")
+    print(f" - Capital Locked for SL 98%: {cost_c_high:,.0f} ₺ (Increase: {cost_c_high - cost_c_low:,.0f} ₺)")
+    print("="*50)
+
+    if results['portfolio'] is not None:
+        cost_low, cost_high = results['portfolio']
+        print("✅ PORTFOLIO SUMMARY (all SKUs):")
+        print(f" - Capital Locked for SL 90%: {cost_low:,.0f} ₺")
+        print(f" - Capital Locked for SL 98%: {cost_high:,.0f} ₺ (Increase: {cost_high - cost_low:,.0f} ₺)")
+        print("="*50)
+
+
+@profiled_run('gun4')
+def main():
+    import matplotlib.pyplot as plt
+
+    # Dosyanızı okuyun
+    try:
+        with span('load') as load:
+            df = load_inventory('inventory.csv')
+            load.rows = len(df)
+    except FileNotFoundError:
+        print("inventory.csv dosyası bulunamadı. Lütfen dosya adını kontrol edin.")
+        exit()
+
+    # Talep küpü: yalnızca yeni / değişen hareket dosyaları okunur
+    try:
+        with span('update_cube'):
+            cube = update_cube(MOVEMENTS_FILE)
+    except FileNotFoundError:
+        cube = None
+
+    results = compute(df, cube)
+
+    for name, (render, options) in FIGURES.items():
+        fig = render(results)
+        if fig is not None:
+            with span(f'savefig {name}'):
+                fig.savefig(name, **options)
+            print(f"Chart saved as '{name}'.")
+            plt.show()
+
+    report(results)
+
+
+if __name__ == '__main__':
+    main()
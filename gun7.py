@@ -1,40 +1,84 @@
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 
-# CSV'den veri okuma
-df = pd.read_csv("outbound_movements.csv", parse_dates=["Document_Date"])
+from movement_stream import stream_peak_counts
+from profiling import profiled, profiled_run, span
+from result_cache import cached_result, tag_snapshot
+from time_buckets import bucket_movements
 
-# 15 dakikalık slot ile zaman serisi oluştur
-df['TimeSlot'] = df['Document_Date'].dt.floor('15T')
-time_series = df.groupby('TimeSlot').size()
+# Büyük hareket geçmişi için True: dosya parça parça okunur,
+# bellek kullanımı satır sayısıyla değil slot sayısıyla sınırlı kalır
+STREAMING = False
 
-# Basit anomaly detection (3 sigma method)
-mean_val = time_series.mean()
-std_val = time_series.std()
-anomalies = time_series[time_series > mean_val + 3*std_val]
+ANOMALY_SIGMA = 3
+
+
+def detect_anomalies(time_series, heatmap_data, sigma=ANOMALY_SIGMA):
+    # Basit anomaly detection (3 sigma method)
+    mean_val = time_series.mean()
+    std_val = time_series.std()
+    anomalies = time_series[time_series > mean_val + sigma*std_val]
+    return {'time_series': time_series, 'anomalies': anomalies, 'heatmap_data': heatmap_data}
+
+
+@profiled()
+@cached_result('gun7')
+def compute(df, width_minutes=15, sigma=ANOMALY_SIGMA):
+    # 15 dakikalık slot ile zaman serisi + heatmap (day vs hour):
+    # tarih bir kez int64'e çevrilir, sayımlar np.bincount ile yapılır
+    buckets = bucket_movements(df, width_minutes)
+
+    return detect_anomalies(buckets.time_series(), buckets.heatmap(), sigma)
 
-# Heatmap için pivot table (day vs hour)
-df['Day'] = df['Document_Date'].dt.day_name()
-df['Hour'] = df['Document_Date'].dt.hour
-heatmap_data = df.pivot_table(index='Hour', columns='Day', values='Movement_ID', aggfunc='count').fillna(0)
 
 # Tek figure içinde iki grafiği çiz
-fig, axes = plt.subplots(2, 1, figsize=(16, 10), constrained_layout=True)
-
-# Zaman serisi + anomaly
-axes[0].plot(time_series.index, time_series.values, color='blue', label='Outbound Movements')
-axes[0].scatter(anomalies.index, anomalies.values, color='red', label='Anomalies')
-axes[0].set_title('DAY7: Peak Hour Bottleneck Analysis\nOutbound Movements with Anomalies')
-axes[0].set_ylabel('Movements per 15-min slot')
-axes[0].legend()
-axes[0].grid(True)
-
-# Heatmap
-sns.heatmap(heatmap_data, ax=axes[1], cmap='Reds', cbar_kws={'label': 'Number of Movements'})
-axes[1].set_title('DAY7: Hourly Heatmap with Anomalies')
-axes[1].set_xlabel('Day of Week')
-axes[1].set_ylabel('Hour of Day')
-
-plt.show()
+@profiled()
+def render(results):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    time_series = results['time_series']
+    anomalies = results['anomalies']
+    heatmap_data = results['heatmap_data']
+
+    fig, axes = plt.subplots(2, 1, figsize=(16, 10), constrained_layout=True)
+
+    # Zaman serisi + anomaly
+    axes[0].plot(time_series.index, time_series.values, color='blue', label='Outbound Movements')
+    axes[0].scatter(anomalies.index, anomalies.values, color='red', label='Anomalies')
+    axes[0].set_title('DAY7: Peak Hour Bottleneck Analysis\nOutbound Movements with Anomalies')
+    axes[0].set_ylabel('Movements per 15-min slot')
+    axes[0].legend()
+    axes[0].grid(True)
+
+    # Heatmap
+    sns.heatmap(heatmap_data, ax=axes[1], cmap='Reds', cbar_kws={'label': 'Number of Movements'})
+    axes[1].set_title('DAY7: Hourly Heatmap with Anomalies')
+    axes[1].set_xlabel('Day of Week')
+    axes[1].set_ylabel('Hour of Day')
+    return fig
+
+
+# Toplu rapor (batch_report.py) için: dosya adı -> (çizim fonksiyonu, savefig ayarları)
+FIGURES = {'gun7_peak_hour.png': (render, {})}
+
+
+@profiled_run('gun7')
+def main():
+    import matplotlib.pyplot as plt
+    if STREAMING:
+        with span('stream_peak_counts'):
+            counts = stream_peak_counts("outbound_movements.csv", freq='15min')
+        results = detect_anomalies(*counts)
+    else:
+        # CSV'den veri okuma
+        with span('read_csv') as load:
+            df = tag_snapshot(pd.read_csv("outbound_movements.csv", parse_dates=["Document_Date"]),
+                              "outbound_movements.csv")
+            load.rows = len(df)
+        results = compute(df)
+
+    render(results)
+    plt.show()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,20 +1,68 @@
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
 from datetime import datetime
 
-# CSV yükle
-df = pd.read_csv("inventory.csv", parse_dates=["Goods_Receipt_Date", "Last_Movement_Date"])
-
-# Stokta geçen gün sayısı
-df["Days_in_Stock"] = (datetime.now() - df["Goods_Receipt_Date"]).dt.days
-
-# Heatmap için veri hazırlığı
-heatmap_data = df.groupby(["Warehouse","ABC_Class"]).agg(Avg_Days=("Days_in_Stock","mean")).unstack()
-plt.figure(figsize=(10,6))
-sns.heatmap(heatmap_data["Avg_Days"], annot=True, fmt=".1f", cmap="YlOrRd")
-plt.title("DAY8: Warehouse vs ABC Class - Average Days in Stock")
-plt.ylabel("Warehouse")
-plt.xlabel("ABC Class")
-plt.tight_layout()
-plt.show()
+from abc_engine import abc_labels, classify
+from inventory_loader import load_inventory
+from profiling import profiled, profiled_run, span
+from result_cache import cached_result
+from warehouse_partitions import ensure_partitions, partitioned_days_in_stock
+
+# Çok depolu kurulumlar için True: her depo bölümü (partition) ayrı işlemde okunur,
+# ABC eşikleri depolardan gelen sıralı maliyet dizilerinden hesaplanır
+PARTITIONED = False
+
+
+@profiled()
+@cached_result('gun8')
+def compute(df, current_date=None):
+    current_date = current_date or datetime.now()
+
+    # ABC sınıfı (ortak ABC motoru; diğer günlerle aynı sınıflandırma)
+    abc_class = pd.Series(abc_labels(classify(df)), index=df.index, name="ABC_Class")
+
+    # Stokta geçen gün sayısı
+    days_in_stock = (current_date - df["Goods_Receipt_Date"]).dt.days.rename("Days_in_Stock")
+
+    # Heatmap için veri hazırlığı
+    with span('heatmap_pivot'):
+        heatmap_data = days_in_stock.groupby([df["Warehouse"], abc_class], observed=True).agg(Avg_Days="mean").unstack()
+    return {'heatmap_data': heatmap_data}
+
+
+@profiled()
+def render(results):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    heatmap_data = results['heatmap_data']
+
+    fig = plt.figure(figsize=(10,6))
+    sns.heatmap(heatmap_data["Avg_Days"], annot=True, fmt=".1f", cmap="YlOrRd")
+    plt.title("DAY8: Warehouse vs ABC Class - Average Days in Stock")
+    plt.ylabel("Warehouse")
+    plt.xlabel("ABC Class")
+    plt.tight_layout()
+    return fig
+
+
+# Toplu rapor (batch_report.py) için: dosya adı -> (çizim fonksiyonu, savefig ayarları)
+FIGURES = {'gun8_days_in_stock.png': (render, {})}
+
+
+@profiled_run('gun8')
+def main():
+    import matplotlib.pyplot as plt
+    if PARTITIONED:
+        results = partitioned_days_in_stock(ensure_partitions("inventory.csv"))
+    else:
+        # CSV yükle
+        with span('load') as load:
+            df = load_inventory("inventory.csv")
+            load.rows = len(df)
+        results = compute(df)
+
+    render(results)
+    plt.show()
+
+
+if __name__ == '__main__':
+    main()
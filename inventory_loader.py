@@ -0,0 +1,110 @@
+import glob
+import hashlib
+import os
+
+import pandas as pd
+
+from profiling import span
+
+# ----------------------------
+# Shared inventory loader
+# ----------------------------
+# inventory.csv is parsed once with explicit dtypes and written next to the
+# CSV as a content-hashed Parquet snapshot. Later runs on the same CSV version
+# read the snapshot instead of parsing the CSV again.
+
+INVENTORY_FILE = 'inventory.csv'
+
+CATEGORY_COLUMNS = ['Warehouse', 'Location', 'ABC_Class']
+# Costs stay float64: float32 sums of a million rows are off by tens of TL
+COST_COLUMNS = ['Unit_Cost', 'Total_Cost']
+DATE_COLUMNS = ['Goods_Receipt_Date', 'Last_Movement_Date']
+
+# Bump when dtype/schema decisions change; old snapshots become invalid
+CACHE_VERSION = 2
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Short (32 hex chars) blake2b digest of the file contents."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'v{CACHE_VERSION}'.encode())
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_path(path, digest):
+    """inventory.csv -> .inventory.<digest>.parquet (same folder)."""
+    folder, name = os.path.split(os.path.abspath(path))
+    stem = os.path.splitext(name)[0]
+    return os.path.join(folder, f'.{stem}.{digest}.parquet')
+
+
+def read_inventory_csv(path=INVENTORY_FILE):
+    """Read the CSV with explicit dtypes (categorical, float64 costs, datetime64)."""
+    header = pd.read_csv(path, nrows=0).columns
+    dtype = {col: 'category' for col in CATEGORY_COLUMNS if col in header}
+    dtype.update({col: 'float64' for col in COST_COLUMNS if col in header})
+    dates = [col for col in DATE_COLUMNS if col in header]
+    return pd.read_csv(path, dtype=dtype, parse_dates=dates)
+
+
+def _read_cache(cached):
+    try:
+        return pd.read_parquet(cached)
+    except (ImportError, OSError, ValueError):
+        # No parquet engine or a broken file: fall back to the CSV
+        return None
+
+
+def _write_cache(df, cached):
+    # Per-process temp file: concurrent runs (batch workers, the service, cron) never share one
+    tmp = f'{cached}.{os.getpid()}.tmp'
+    try:
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, cached)
+    except (ImportError, OSError, ValueError):
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return
+    # Drop snapshots of older versions of the same CSV; a snapshot written
+    # after ours (a newer CSV another process loaded) is kept
+    prefix = cached.rsplit('.', 2)[0]
+    written = os.stat(cached).st_mtime_ns
+    for old in glob.glob(glob.escape(prefix) + '.' + '?' * 32 + '.parquet'):
+        if old == cached:
+            continue
+        try:
+            if os.stat(old).st_mtime_ns < written:
+                os.remove(old)
+        except FileNotFoundError:  # removed by another process
+            pass
+
+
+def load_inventory(path=INVENTORY_FILE, use_cache=True):
+    """
+    Load inventory.csv through the Parquet snapshot cache.
+
+    ``df.attrs['snapshot']`` holds the CSV content digest, so results derived
+    from the same data version can be keyed on it. Raises FileNotFoundError
+    when the CSV does not exist.
+    """
+    with span('digest'):
+        digest = file_digest(path)
+    cached = cache_path(path, digest)
+
+    df = None
+    if use_cache and os.path.exists(cached):
+        with span('read_snapshot'):
+            df = _read_cache(cached)
+    if df is None:
+        with span('read_csv') as read:
+            df = read_inventory_csv(path)
+            read.rows = len(df)
+        if use_cache:
+            with span('write_snapshot'):
+                _write_cache(df, cached)
+
+    df.attrs['snapshot'] = digest
+    return df
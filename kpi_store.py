@@ -0,0 +1,262 @@
+import argparse
+import bisect
+import os
+import pickle
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from inventory_loader import INVENTORY_FILE, load_inventory
+
+# ----------------------------
+# Incremental KPI store for the gun1 metrics
+# ----------------------------
+# Keeps running totals for total cost, safety stock violations, warehouse
+# totals, slow movers and the cost concentration metric. A daily delta file
+# (changed / added / removed rows) is applied in O(delta) instead of
+# recomputing everything; the cost ordering lives in a blocked sorted list so
+# the concentration count needs no full re-sort.
+
+STATE_FILE = 'kpi_state.pkl'
+CURRENT_DATE = datetime(2025, 11, 19)
+SLOW_MOVING_DAYS = 180
+CONCENTRATION_SHARE = 0.63
+
+# Row identity: a Material_ID can sit in several warehouses / locations
+KEY_COLUMNS = ['Material_ID', 'Warehouse', 'Location']
+# Delta files: Action == 'D' removes the row, anything else (or no column) upserts
+ACTION_COLUMN = 'Action'
+DELETE_ACTIONS = {'D', 'DELETE', 'REMOVE', 'REMOVED'}
+
+_NS_PER_DAY = 86_400 * 10**9
+
+
+class SortedBlocks:
+    """
+    Ascending multiset of floats stored as sorted blocks with per-block sums.
+
+    add/remove are O(log n + block size); ``top_prefix_count`` walks blocks
+    from the largest value down, so it is O(n / block size + block size).
+    """
+
+    def __init__(self, values=(), block_size=1024):
+        self.block_size = block_size
+        values = sorted(values)
+        self.blocks = [values[i:i + block_size] for i in range(0, len(values), block_size)]
+        self.sums = [float(np.sum(b)) for b in self.blocks]
+        self.size = len(values)
+
+    def __len__(self):
+        return self.size
+
+    def _block_for(self, value):
+        lo, hi = 0, len(self.blocks)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.blocks[mid][-1] < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def add(self, value):
+        if not self.blocks:
+            self.blocks, self.sums = [[value]], [value]
+            self.size = 1
+            return
+        i = min(self._block_for(value), len(self.blocks) - 1)
+        block = self.blocks[i]
+        bisect.insort(block, value)
+        self.sums[i] += value
+        self.size += 1
+        if len(block) > 2 * self.block_size:
+            half = len(block) // 2
+            self.blocks[i:i + 1] = [block[:half], block[half:]]
+            self.sums[i:i + 1] = [float(np.sum(block[:half])), float(np.sum(block[half:]))]
+
+    def remove(self, value):
+        i = self._block_for(value)
+        block = self.blocks[i]
+        j = bisect.bisect_left(block, value)
+        if j == len(block) or block[j] != value:
+            raise KeyError(value)
+        del block[j]
+        self.size -= 1
+        if block:
+            self.sums[i] -= value
+        else:
+            del self.blocks[i], self.sums[i]
+
+    def count_le(self, value):
+        """Number of stored values <= value."""
+        count = 0
+        for block in self.blocks:
+            if block[-1] <= value:
+                count += len(block)
+            else:
+                return count + bisect.bisect_right(block, value)
+        return count
+
+    def top_prefix_count(self, target):
+        """How many of the largest values fit (cumulatively, descending) within ``target``."""
+        count, acc = 0, 0.0
+        for i in range(len(self.blocks) - 1, -1, -1):
+            if acc + self.sums[i] <= target:
+                acc += self.sums[i]
+                count += len(self.blocks[i])
+                continue
+            for value in reversed(self.blocks[i]):
+                acc += value
+                if acc > target:
+                    return count
+                count += 1
+        return count
+
+
+class KpiStore:
+    """Running gun1 KPIs over the inventory rows, updated by deltas."""
+
+    def __init__(self, key_columns=KEY_COLUMNS):
+        self.key_columns = list(key_columns)
+        self.rows = {}  # key -> (cost, violation, last_movement_ns, warehouse)
+        self.total_cost = 0.0
+        self.violations = 0
+        self.warehouse_cost = {}
+        self.costs = SortedBlocks()
+        self.last_movements = SortedBlocks()
+
+    # --- building ---
+    @classmethod
+    def from_frame(cls, df, key_columns=KEY_COLUMNS):
+        key_columns = [c for c in key_columns if c in df.columns]
+        duplicated = df.duplicated(key_columns)
+        if duplicated.any():
+            raise ValueError(f"{int(duplicated.sum())} rows share a key on {key_columns}; "
+                             "choose key columns that identify a row uniquely")
+        store = cls(key_columns)
+        store.rows = {key: tuple(rec) for key, *rec in store._records(df)}
+        values = list(store.rows.values())
+        costs = [r[0] for r in values if not np.isnan(r[0])]
+        store.total_cost = float(np.sum(costs))
+        store.violations = sum(r[1] for r in values)
+        store.costs = SortedBlocks(costs)
+        store.last_movements = SortedBlocks([r[2] for r in values if r[2] is not None])
+        for cost, _, _, warehouse in values:
+            if not np.isnan(cost):
+                store.warehouse_cost[warehouse] = store.warehouse_cost.get(warehouse, 0.0) + cost
+        return store
+
+    def _records(self, df):
+        keys = zip(*(df[c].astype(str) for c in self.key_columns))
+        cost = df['Total_Cost'].to_numpy(dtype=np.float64, na_value=np.nan)
+        violation = (df['Stock_Qty'] < df['Safety_Stock']).to_numpy()
+        last = pd.to_datetime(df['Last_Movement_Date'])
+        last_ns = [None if pd.isna(t) else t.value for t in last]
+        warehouse = df['Warehouse'].astype(str) if 'Warehouse' in df.columns else [''] * len(df)
+        return zip(keys, cost.tolist(), violation.tolist(), last_ns, warehouse)
+
+    # --- incremental updates ---
+    def _remove(self, key):
+        cost, violation, last_ns, warehouse = self.rows.pop(key)
+        if not np.isnan(cost):
+            self.total_cost -= cost
+            self.warehouse_cost[warehouse] -= cost
+            self.costs.remove(cost)
+        self.violations -= violation
+        if last_ns is not None:
+            self.last_movements.remove(last_ns)
+
+    def _insert(self, key, cost, violation, last_ns, warehouse):
+        self.rows[key] = (cost, violation, last_ns, warehouse)
+        if not np.isnan(cost):
+            self.total_cost += cost
+            self.warehouse_cost[warehouse] = self.warehouse_cost.get(warehouse, 0.0) + cost
+            self.costs.add(cost)
+        self.violations += violation
+        if last_ns is not None:
+            self.last_movements.add(last_ns)
+
+    def apply_delta(self, delta):
+        """Apply changed / added / removed rows. Returns (upserted, removed) counts."""
+        if ACTION_COLUMN in delta.columns:
+            deletes = delta[ACTION_COLUMN].astype(str).str.upper().isin(DELETE_ACTIONS)
+        else:
+            deletes = pd.Series(False, index=delta.index)
+
+        removed = 0
+        for key in zip(*(delta.loc[deletes, c].astype(str) for c in self.key_columns)):
+            if key in self.rows:
+                self._remove(key)
+                removed += 1
+
+        upserts = delta[~deletes]
+        for key, *record in self._records(upserts):
+            if key in self.rows:
+                self._remove(key)
+            self._insert(key, *record)
+        return len(upserts), removed
+
+    # --- metrics ---
+    def kpis(self, current_date=CURRENT_DATE, slow_days=SLOW_MOVING_DAYS,
+             concentration_share=CONCENTRATION_SHARE):
+        """Same metrics as gun1.py."""
+        n = len(self.rows)
+        # (current - last).days > slow_days  <=>  last <= current - (slow_days + 1) days
+        cutoff = pd.Timestamp(current_date).value - (slow_days + 1) * _NS_PER_DAY
+        slow = self.last_movements.count_le(cutoff)
+        concentration = self.costs.top_prefix_count(self.total_cost * concentration_share)
+        pct = (lambda v: v / n * 100) if n else (lambda v: 0.0)
+        return {
+            'total_stock_cost': self.total_cost,
+            'total_sku_count': n,
+            'safety_stock_violations': self.violations,
+            'violation_percentage': pct(self.violations),
+            'slow_moving_stock_count': slow,
+            'slow_moving_percentage': pct(slow),
+            'sku_concentration': concentration,
+            'concentration_percentage': pct(concentration),
+            'warehouse_stock_cost': pd.Series(self.warehouse_cost).sort_index(),
+        }
+
+    # --- persistence ---
+    def save(self, path=STATE_FILE):
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def load(path=STATE_FILE):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Incremental gun1 KPI refresh')
+    parser.add_argument('deltas', nargs='*', help='Delta CSV files (inventory columns + optional Action)')
+    parser.add_argument('--state', default=STATE_FILE)
+    parser.add_argument('--inventory', default=INVENTORY_FILE, help='Used to build the state on first run')
+    parser.add_argument('--key', default=','.join(KEY_COLUMNS), help='Row key columns for the first run')
+    args = parser.parse_args()
+
+    if os.path.exists(args.state):
+        store = KpiStore.load(args.state)
+    else:
+        store = KpiStore.from_frame(load_inventory(args.inventory), key_columns=args.key.split(','))
+        print(f"State built from '{args.inventory}' ({len(store.rows):,} rows).")
+
+    for path in args.deltas:
+        upserted, removed = store.apply_delta(pd.read_csv(path))
+        print(f"{path}: {upserted:,} upserted, {removed:,} removed")
+    store.save(args.state)
+
+    kpis = store.kpis()
+    print("-" * 50)
+    print(f"Total stock cost          : {kpis['total_stock_cost']:,.2f} ₺")
+    print(f"Safety stock violations   : {kpis['safety_stock_violations']:,} ({kpis['violation_percentage']:.2f}%)")
+    print(f"{SLOW_MOVING_DAYS}+ day slow movers      : {kpis['slow_moving_stock_count']:,} ({kpis['slow_moving_percentage']:.2f}%)")
+    print(f"{CONCENTRATION_SHARE:.0%} cost concentration   : {kpis['sku_concentration']:,} ({kpis['concentration_percentage']:.2f}%)")
+    for warehouse, value in kpis['warehouse_stock_cost'].items():
+        print(f"  {warehouse}: {value:,.2f} ₺")
+    print("-" * 50)
@@ -0,0 +1,166 @@
+import argparse
+import json
+import re
+
+import numpy as np
+import pandas as pd
+
+from inventory_loader import INVENTORY_FILE, load_inventory
+
+# ----------------------------
+# Location index and fast-access rules
+# ----------------------------
+# Every distinct Location string is parsed once into structured fields
+# (zone, corridor, side, bay, level; the CC-S-XXX-YY key of gun6 / vna_sim,
+# optionally prefixed by a zone such as PZ-01-A-003-02). Fast-access rules are
+# evaluated over the distinct locations only and mapped back to the rows
+# through the category codes, so the cost scales with distinct locations, not
+# rows. Rules live in a JSON file; the defaults reproduce gun5's
+# 'ZONEA' / 'PZ' / '01$' string tests.
+
+LOCATION_RULES_FILE = 'location_rules.json'
+
+LOCATION_PATTERN = re.compile(
+    r'^(?:(?P<zone>[A-Za-z]\w*)-)?(?P<corridor>\d{1,3})-(?P<side>[A-Za-z])-(?P<bay>\d{1,4})-(?P<level>\d{1,3})$'
+)
+INT_FIELDS = ['corridor', 'bay', 'level']
+
+# Any rule matching makes a location fast access. All conditions inside one
+# rule must hold. Conditions: contains (+ case), regex, equals, in, min, max.
+DEFAULT_RULES = {
+    'fast_access': [
+        {'field': 'location', 'contains': 'ZONEA', 'case': False},
+        {'field': 'location', 'contains': 'PZ', 'case': False},
+        {'field': 'location', 'regex': '01$'},
+    ]
+}
+
+_CACHE = {}
+_CACHE_SIZE = 8
+
+
+def parse_locations(locations):
+    """
+    Distinct location strings -> one row of fields per location.
+
+    Unparseable locations keep their text in ``location`` and get an empty
+    zone / side and -1 for the numeric fields.
+    """
+    locations = pd.Index(locations, dtype=object).astype(str)
+    parts = locations.str.extract(LOCATION_PATTERN)
+    fields = pd.DataFrame({'location': locations})
+    for name in ['zone', 'side']:
+        fields[name] = parts[name].fillna('').str.upper().astype('category').to_numpy()
+    for name in INT_FIELDS:
+        fields[name] = pd.to_numeric(parts[name]).fillna(-1).astype(np.int16).to_numpy()
+    return fields
+
+
+class LocationIndex:
+    """Parsed fields for the distinct values of a Location column, plus row codes."""
+
+    def __init__(self, codes, fields):
+        self.codes = codes     # int per row into ``fields`` (-1 = missing location)
+        self.fields = fields   # one row per distinct location
+
+    @classmethod
+    def from_series(cls, locations):
+        if isinstance(locations.dtype, pd.CategoricalDtype):
+            codes = locations.cat.codes.to_numpy()
+            uniques = locations.cat.categories
+        else:
+            codes, uniques = pd.factorize(locations)
+        return cls(np.asarray(codes), parse_locations(uniques))
+
+    def evaluate(self, rules):
+        """Boolean per distinct location: does any rule match."""
+        result = np.zeros(len(self.fields), dtype=bool)
+        for rule in rules:
+            result |= _rule_mask(self.fields, rule)
+        return result
+
+    def row_mask(self, rules):
+        """Boolean per row, looked up through the location codes."""
+        per_location = np.r_[self.evaluate(rules), False]  # code -1 -> last slot -> False
+        return per_location[self.codes]
+
+    def row_field(self, name):
+        """One parsed field per row (missing locations get -1 / '')."""
+        values = self.fields[name].to_numpy()
+        missing = -1 if name in INT_FIELDS else ''
+        return np.where(self.codes >= 0, values[self.codes], missing)
+
+
+def _rule_mask(fields, rule):
+    values = fields[rule['field']]
+    mask = np.ones(len(fields), dtype=bool)
+    if 'contains' in rule:
+        mask &= values.astype(str).str.contains(rule['contains'], case=rule.get('case', True),
+                                                regex=False, na=False).to_numpy()
+    if 'regex' in rule:
+        mask &= values.astype(str).str.contains(rule['regex'], case=rule.get('case', True),
+                                                regex=True, na=False).to_numpy()
+    if 'equals' in rule:
+        mask &= (values == rule['equals']).to_numpy()
+    if 'in' in rule:
+        mask &= values.isin(rule['in']).to_numpy()
+    if 'min' in rule:
+        mask &= (values >= rule['min']).to_numpy()
+    if 'max' in rule:
+        mask &= (values <= rule['max']).to_numpy()
+    return mask
+
+
+def load_rules(path=LOCATION_RULES_FILE):
+    """Rules from the JSON file, or the gun5 defaults when there is none."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return DEFAULT_RULES
+
+
+def location_index(df, column='Location'):
+    """
+    LocationIndex of ``df[column]``.
+
+    Memoized per input snapshot (``df.attrs['snapshot']``) for categorical
+    columns: filtered frames share the categories, so the parsed fields are
+    reused and only the row codes are taken from ``df``.
+    """
+    locations = df[column]
+    snapshot = df.attrs.get('snapshot')
+    if snapshot is None or not isinstance(locations.dtype, pd.CategoricalDtype):
+        return LocationIndex.from_series(locations)
+    key = (snapshot, column)
+    if key not in _CACHE:
+        if len(_CACHE) >= _CACHE_SIZE:
+            _CACHE.pop(next(iter(_CACHE)))
+        _CACHE[key] = parse_locations(locations.cat.categories)
+    return LocationIndex(locations.cat.codes.to_numpy(), _CACHE[key])
+
+
+def fast_access_mask(df, rules=None, column='Location'):
+    """Boolean per row of ``df``: is the location fast access."""
+    rules = rules or load_rules()
+    return location_index(df, column).row_mask(rules['fast_access'])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Parse locations and evaluate the fast-access rules')
+    parser.add_argument('inventory', nargs='?', default=INVENTORY_FILE)
+    parser.add_argument('--rules', default=LOCATION_RULES_FILE)
+    parser.add_argument('--dump-rules', action='store_true', help='Write the default rules to --rules and exit')
+    args = parser.parse_args()
+
+    if args.dump_rules:
+        with open(args.rules, 'w', encoding='utf-8') as f:
+            json.dump(DEFAULT_RULES, f, indent=2)
+        print(f"Default rules written to '{args.rules}'.")
+    else:
+        rules = load_rules(args.rules)['fast_access']
+        index = location_index(load_inventory(args.inventory))
+        fast = index.evaluate(rules)
+        print(f"{len(index.fields):,} distinct locations, {fast.sum():,} fast access "
+              f"({index.row_mask(rules).mean() * 100:.1f}% of rows).")
+        print(index.fields.assign(fast_access=fast).head(10).to_string(index=False))
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+from time_buckets import TimeBuckets
+
+# ----------------------------
+# Chunked streaming over outbound_movements.csv
+# ----------------------------
+# The movement history is read in chunks and folded into mergeable partial
+# aggregates, so peak memory is bounded by the number of SKUs / time slots
+# rather than the number of rows:
+#   * per-SKU Welford state (count, mean, M2) for the demand statistics (gun3)
+#   * per-slot and per Hour x Weekday counters for gun7 (time_buckets)
+
+MOVEMENTS_FILE = 'outbound_movements.csv'
+CHUNK_SIZE = 500_000
+
+
+def iter_movements(path=MOVEMENTS_FILE, chunk_size=CHUNK_SIZE, usecols=None):
+    """Yield the movement file chunk by chunk with Document_Date parsed."""
+    for chunk in pd.read_csv(path, chunksize=chunk_size, usecols=usecols):
+        if 'Document_Date' in chunk.columns:
+            chunk['Document_Date'] = pd.to_datetime(chunk['Document_Date'])
+        yield chunk
+
+
+# ----------------------------
+# Per-SKU demand statistics (Welford / Chan merge)
+# ----------------------------
+def welford_partial(chunk, key='Material_ID', value='Quantity'):
+    """count / mean / M2 per key for one chunk (NaN values are skipped)."""
+    values = pd.to_numeric(chunk[value], errors='coerce')
+    grouped = values.groupby(chunk[key])
+    count = grouped.count()
+    mean = grouped.mean()
+    m2 = grouped.var(ddof=0) * count
+    # Keys whose values are all NaN still appear (count 0), like groupby().agg
+    return pd.DataFrame({'count': count, 'mean': mean, 'M2': m2.fillna(0.0)})
+
+
+def merge_welford(a, b):
+    """Combine two partial states (Chan et al. parallel variance)."""
+    if a is None:
+        return b
+    keys = a.index.union(b.index)
+    a = a.reindex(keys)
+    b = b.reindex(keys)
+    na = a['count'].fillna(0)
+    nb = b['count'].fillna(0)
+    n = na + nb
+    mean_a = a['mean'].fillna(0.0)
+    mean_b = b['mean'].fillna(0.0)
+    delta = mean_b - mean_a
+    safe_n = n.where(n > 0, 1)
+    mean = mean_a + delta * nb / safe_n
+    m2 = a['M2'].fillna(0.0) + b['M2'].fillna(0.0) + delta ** 2 * na * nb / safe_n
+    return pd.DataFrame({'count': n, 'mean': mean.where(n > 0), 'M2': m2})
+
+
+def finalize_welford(state):
+    """mean / std (ddof=1) per key, same layout as groupby().agg(['mean', 'std'])."""
+    count = state['count']
+    std = np.sqrt(state['M2'] / (count - 1)).where(count > 1)
+    summary = pd.DataFrame({'mean': state['mean'], 'std': std})
+    summary.index.name = state.index.name
+    return summary.sort_index()
+
+
+def stream_demand_stats(path=MOVEMENTS_FILE, chunk_size=CHUNK_SIZE,
+                        key='Material_ID', value='Quantity'):
+    """Per-SKU mean/std of movement quantities without loading the whole file."""
+    state = None
+    for chunk in iter_movements(path, chunk_size, usecols=[key, value]):
+        state = merge_welford(state, welford_partial(chunk, key, value))
+    if state is None:
+        return pd.DataFrame(columns=['mean', 'std'])
+    return finalize_welford(state)
+
+
+# ----------------------------
+# Time-slot and Hour x Day counters
+# ----------------------------
+def stream_time_buckets(path=MOVEMENTS_FILE, chunk_size=CHUNK_SIZE, width_minutes=15, by=None):
+    """TimeBuckets filled chunk by chunk (``by`` = optional group column, e.g. Warehouse)."""
+    buckets = TimeBuckets(width_minutes)
+    usecols = ['Movement_ID', 'Document_Date'] + ([by] if by else [])
+    for chunk in iter_movements(path, chunk_size, usecols=usecols):
+        # pivot_table counts non-null Movement_IDs only
+        buckets.add(chunk['Document_Date'], chunk[by] if by else None, chunk['Movement_ID'].notna())
+    return buckets
+
+
+def stream_peak_counts(path=MOVEMENTS_FILE, chunk_size=CHUNK_SIZE, freq='15min'):
+    """
+    Movements per time slot and the Hour x Day count matrix.
+
+    Returns (time_series, heatmap_data) laid out like gun7's
+    ``groupby('TimeSlot').size()`` and ``pivot_table(..., aggfunc='count')``.
+    """
+    width_minutes = pd.Timedelta(freq) // pd.Timedelta(minutes=1)
+    buckets = stream_time_buckets(path, chunk_size, width_minutes)
+    return buckets.time_series(), buckets.heatmap()
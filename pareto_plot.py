@@ -0,0 +1,72 @@
+import numpy as np
+
+# ----------------------------
+# Downsampled Pareto rendering
+# ----------------------------
+# One matplotlib Rectangle per SKU gets slow and memory hungry past a few
+# thousand SKUs. Above MAX_BARS the sorted cost curve is binned into a fixed
+# number of pixel-width buckets and drawn as filled `stairs` artists: solid up
+# to the per-bucket min (every bar in the bucket reaches it) and a lighter band
+# from the min to the max envelope. The cumulative line is reduced with LTTB.
+# Chart time then no longer depends on the SKU count.
+
+MAX_BARS = 2000
+
+
+def bin_envelope(values, n_bins):
+    """Split ``values`` into ``n_bins`` contiguous buckets -> (edges, mins, maxs)."""
+    values = np.asarray(values, dtype=np.float64)
+    edges = np.linspace(0, values.size, n_bins + 1).round().astype(np.int64)
+    starts = edges[:-1]
+    maxs = np.maximum.reduceat(values, starts)
+    mins = np.minimum.reduceat(values, starts)
+    # x positions match ax.bar(range(n)), where bar i is centred on i
+    return edges - 0.5, mins, maxs
+
+
+def lttb(x, y, n_out):
+    """Largest-Triangle-Three-Buckets downsampling; returns indices of kept points."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    bounds = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = bounds[i], bounds[i + 1]
+        # Average of the next bucket (or the last point)
+        nxt_lo, nxt_hi = hi, bounds[i + 2] if i + 2 < len(bounds) else n
+        cx = x[nxt_lo:nxt_hi].mean()
+        cy = y[nxt_lo:nxt_hi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def plot_cost_bars(ax, costs, max_bars=MAX_BARS, color=None, alpha=None, label=None,
+                   edgecolor=None, linewidth=None):
+    """Per-SKU bars for small inputs, binned min / max envelopes for large ones."""
+    costs = np.asarray(costs, dtype=np.float64)
+    if costs.size <= max_bars:
+        return ax.bar(range(costs.size), costs, color=color, alpha=alpha, label=label,
+                      edgecolor=edgecolor, linewidth=linewidth)
+    edges, mins, maxs = bin_envelope(costs, max_bars)
+    artist = ax.stairs(mins, edges, fill=True, color=color, alpha=alpha, label=label)
+    ax.stairs(maxs, edges, baseline=mins, fill=True, color=color, alpha=(alpha or 1.0) * 0.5)
+    if edgecolor is not None:
+        ax.stairs(maxs, edges, color=edgecolor, linewidth=linewidth or 0.5)
+    return artist
+
+
+def plot_cumulative_line(ax, cumulative, max_points=MAX_BARS, marker_count=None, **kwargs):
+    """Cumulative % line, LTTB-downsampled above ``max_points`` points."""
+    cumulative = np.asarray(cumulative, dtype=np.float64)
+    x = np.arange(cumulative.size)
+    keep = lttb(x, cumulative, max_points)
+    if marker_count:
+        kwargs['markevery'] = max(1, keep.size // marker_count)
+    return ax.plot(x[keep], cumulative[keep], **kwargs)
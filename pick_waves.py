@@ -0,0 +1,359 @@
+import argparse
+import itertools
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from event_log import ARRIVED, ASSIGNED, LIFTED, LOWERED, RETURNED
+from vna_sim import (DEFAULT_SPEED_KMH, IDLE, LIFT_RATE, MAX_ORDERS_PER_VNA, ORDER_INTERVAL_S,
+                     WarehouseSimulator, read_table)
+from warehouse_layout import WarehouseLayout, drive_seconds
+
+# ----------------------------
+# Batched pick waves for the headless VNA simulator
+# ----------------------------
+# gun6.py / vna_sim send a VNA out for one order and back home with one
+# pallet. Here an idle VNA collects a wave of up to ``batch_size`` released
+# orders -- the oldest ones, or the oldest one plus orders in its corridor and
+# the nearest corridors -- waiting at most ``wave_window`` seconds for the
+# wave to fill, and drives one multi-stop tour home -> stops -> home. Stops
+# are sequenced by an S-shape, largest-gap or 2-opt heuristic on the
+# warehouse_layout travel times (drive plus fork travel between levels).
+# Every leg is logged like a vna_sim trip: ARRIVED when the drive to a stop
+# ends, LIFTED once the forks reached its level, and for the whole wave
+# RETURNED when the truck is back home and LOWERED when the forks are down,
+# so event_log.state_durations splits a tour into its drive / lift legs
+# (drives between stops are its lifted->arrived leg).
+# With batch_size=1 the run matches vna_sim.
+
+OUTPUT_FILE = 'wave_policies.csv'
+
+GROUPINGS = ('fifo', 'corridor')
+DEFAULT_BATCH_SIZES = (1, 2, 4, 8)
+DEFAULT_WINDOWS = (30.0,)
+MAX_2OPT_ROUNDS = 50
+
+WAVE_TOUR = 'wave_tour'
+
+# Event kinds
+EV_WAVE_DUE = 'wave_due'
+EV_STOP = 'stop'
+EV_STOP_LIFTED = 'stop_lifted'
+EV_WAVE_HOME = 'wave_home'
+EV_WAVE_DONE = 'wave_done'
+
+
+# ----------------------------
+# Routing heuristics (node arrays of a WarehouseLayout)
+# ----------------------------
+def _corridor_sequence(layout, home, stops):
+    """Corridors holding stops, swept away from the home corridor's side."""
+    corridors = np.unique(layout.corridor[stops])
+    if abs(corridors[-1] - layout.corridor[home]) < abs(corridors[0] - layout.corridor[home]):
+        corridors = corridors[::-1]
+    return corridors
+
+
+def _by_depth(layout, stops, descending=False):
+    """Stops ordered along the aisle (bay), level breaking ties."""
+    order = np.lexsort((layout.level[stops], layout.z[stops]))
+    return stops[order[::-1] if descending else order]
+
+
+def fifo_route(layout, home, stops):
+    """Stops in the order the orders were created (the unsequenced baseline)."""
+    return np.asarray(stops)
+
+
+def sshape_route(layout, home, stops):
+    """Serpentine: every aisle with stops is traversed, alternately away from and towards the front."""
+    stops = np.asarray(stops)
+    route = [_by_depth(layout, stops[layout.corridor[stops] == c], descending=k % 2 == 1)
+             for k, c in enumerate(_corridor_sequence(layout, home, stops))]
+    return np.concatenate(route)
+
+
+def largest_gap_route(layout, home, stops):
+    """
+    Largest gap: the first and last aisles are traversed completely; every
+    aisle in between is entered from the rear on the way out and from the
+    front on the way back, each time up to its largest gap between stops
+    (front and rear of the aisle included), so that gap is never driven.
+    """
+    stops = np.asarray(stops)
+    corridors = _corridor_sequence(layout, home, stops)
+    if len(corridors) < 2:
+        return _by_depth(layout, stops)
+    front = float(layout.z[home])
+    rear = float(layout.z[:layout.n_locations].max())
+    out_rear, back_front = [], []
+    for c in corridors[1:-1]:
+        aisle = _by_depth(layout, stops[layout.corridor[stops] == c])
+        depth = np.r_[front, layout.z[aisle], rear]
+        split = int(np.argmax(np.diff(depth)))          # stops before the largest gap are front stops
+        out_rear.append(aisle[split:][::-1])
+        back_front.append(aisle[:split])
+    first = _by_depth(layout, stops[layout.corridor[stops] == corridors[0]])
+    last = _by_depth(layout, stops[layout.corridor[stops] == corridors[-1]], descending=True)
+    return np.concatenate([first, *out_rear, last, *back_front[::-1]])
+
+
+def two_opt(layout, home, route, max_rounds=MAX_2OPT_ROUNDS):
+    """
+    2-opt improvement of home -> route -> home: reverse the segment between
+    two edges whenever that shortens the tour (travel times are symmetric).
+    """
+    path = np.r_[home, route, home]
+    n = len(path)
+    if n < 5:
+        return np.asarray(route)
+    cost = layout.travel(path[:, None], path[None, :])
+    position = np.arange(n)                 # path as indices into ``cost``
+    for _ in range(max_rounds):
+        improved = False
+        for i in range(1, n - 2):
+            a, b = position[i - 1], position[i]
+            c, d = position[i + 1:n - 1], position[i + 2:n]
+            delta = cost[a, c] + cost[b, d] - cost[a, b] - cost[c, d]
+            j = int(np.argmin(delta))
+            if delta[j] < -1e-9:
+                position[i:i + j + 2] = position[i:i + j + 2][::-1].copy()
+                improved = True
+        if not improved:
+            break
+    return path[position[1:-1]]
+
+
+def two_opt_route(layout, home, stops):
+    """2-opt starting from the S-shape sequence."""
+    return two_opt(layout, home, sshape_route(layout, home, stops))
+
+
+ROUTINGS = {
+    'fifo': fifo_route,
+    'sshape': sshape_route,
+    'largest_gap': largest_gap_route,
+    '2opt': two_opt_route,
+}
+
+
+# ----------------------------
+# Wave simulator
+# ----------------------------
+@dataclass
+class Wave:
+    vna: object
+    orders: list
+    route: np.ndarray
+    start_time: float
+    seconds: float
+
+
+class WaveSimulator(WarehouseSimulator):
+    """
+    WarehouseSimulator whose VNAs run batched multi-stop waves.
+
+    ``grouping`` -- 'fifo': the oldest unassigned orders; 'corridor': the
+    oldest order plus orders in its corridor, then in the nearest corridors.
+    ``wave_window`` -- seconds an idle VNA waits for a full wave after the
+    oldest unassigned order was released; it leaves at once when no further
+    order can be released. Up to ``MAX_ORDERS_PER_VNA * batch_size`` orders
+    per VNA are active, so a VNA can fill its next wave during a tour.
+    """
+
+    def __init__(self, layout, inventory, demand, vna_count=1,
+                 speed_kmh=DEFAULT_SPEED_KMH, lift_rate=LIFT_RATE,
+                 order_interval=ORDER_INTERVAL_S, batch_size=4, wave_window=30.0,
+                 grouping='corridor', routing='2opt', clock=None, log=None):
+        super().__init__(layout, inventory, demand, vna_count, speed_kmh, lift_rate, order_interval, clock, log)
+        if grouping not in GROUPINGS:
+            raise ValueError(f'Unknown grouping {grouping!r}; expected one of {GROUPINGS}')
+        self.layout = WarehouseLayout(layout, speed_kmh, lift_rate)
+        self.route = ROUTINGS[routing]
+        self.batch_size = batch_size
+        self.wave_window = wave_window
+        self.grouping = grouping
+        self.max_active = MAX_ORDERS_PER_VNA * batch_size * len(self.vnas)
+        self.waves = []             # (vna id, order count, tour seconds) per completed wave
+        self._wave_due = None
+
+    def _handlers(self):
+        handlers = super()._handlers()
+        handlers.update({
+            EV_WAVE_DUE: self._on_wave_due,
+            EV_STOP: self._on_stop,
+            EV_STOP_LIFTED: self._on_stop_lifted,
+            EV_WAVE_HOME: self._on_wave_home,
+            EV_WAVE_DONE: self._on_wave_done,
+        })
+        return handlers
+
+    # --- wave building ---
+    def _can_release_more(self):
+        return bool(self.pending) and len(self.active) < self.max_active
+
+    def _select(self, waiting):
+        if self.grouping == 'fifo' or len(waiting) <= self.batch_size:
+            return waiting[:self.batch_size]
+        seed = waiting[0].shelf.corridor
+        # Stable sort: same corridor first, then by corridor distance, oldest first
+        ranked = sorted(waiting, key=lambda o: abs(o.shelf.corridor - seed))
+        return ranked[:self.batch_size]
+
+    def _dispatch(self):
+        for vna in self.vnas:
+            if vna.state != IDLE:
+                continue
+            waiting = [o for o in self.active if not o.picked_up]
+            if not waiting:
+                return
+            due = waiting[0].created_at + self.wave_window
+            if len(waiting) < self.batch_size and self.now < due and self._can_release_more():
+                if self._wave_due is None or self._wave_due > due:
+                    self._wave_due = due
+                    self._schedule(due, EV_WAVE_DUE)
+                return
+            self._start_wave(vna, self._select(waiting))
+
+    def _start_wave(self, vna, orders):
+        home = self.layout.home(vna.corridor)
+        stops = np.array([self.layout.node(o.shelf.key) for o in orders])
+        route = self.route(self.layout, home, stops)
+        path = np.r_[home, route, home]
+        layout = self.layout
+        # Each leg is a drive then the fork travel to the next level
+        drive = drive_seconds(layout.x[path[:-1]], layout.z[path[:-1]], layout.x[path[1:]], layout.z[path[1:]],
+                              layout.speed)
+        done = np.cumsum(layout.travel(path[:-1], path[1:]))
+        arrived = np.r_[0.0, done[:-1]] + drive
+        by_node = {}
+        for order, node in zip(orders, stops):
+            order.picked_up = True
+            self._log(ASSIGNED, vna, order)
+            by_node.setdefault(int(node), []).append(order)
+        wave = Wave(vna=vna, orders=orders, route=route, start_time=self.now, seconds=float(done[-1]))
+        vna.state = WAVE_TOUR
+        vna.start_time = self.now
+        for node, arrival, lifted in zip(route, arrived[:-1], done[:-1]):
+            stop = (vna, by_node[int(node)].pop(0))
+            self._schedule(self.now + float(arrival), EV_STOP, stop)
+            self._schedule(self.now + float(lifted), EV_STOP_LIFTED, stop)
+        self._schedule(self.now + float(arrived[-1]), EV_WAVE_HOME, wave)
+        self._schedule(self.now + wave.seconds, EV_WAVE_DONE, wave)
+
+    # --- event handlers ---
+    def _on_wave_due(self, _):
+        if self._wave_due is not None and self.now >= self._wave_due:
+            self._wave_due = None
+            self._dispatch()
+
+    def _on_stop(self, stop):
+        self._log(ARRIVED, *stop)
+
+    def _on_stop_lifted(self, stop):
+        vna, order = stop
+        order.shelf.has_pallet = False
+        self._log(LIFTED, vna, order)
+
+    def _on_wave_home(self, wave):
+        for order in wave.orders:
+            self._log(RETURNED, wave.vna, order)
+
+    def _on_wave_done(self, wave):
+        vna = wave.vna
+        vna.busy_time += wave.seconds
+        for order in wave.orders:
+            order.delivered = True
+            order.lot.stock_qty = 0
+            self._log(LOWERED, vna, order)
+            # The tour's time is shared by its orders, so totalTime stays VNA busy time
+            self.pick_times.append(wave.seconds / len(wave.orders))
+            self.active.remove(order)
+            self.pending.release(order.material_id)
+        self.waves.append((vna.id, len(wave.orders), wave.seconds))
+        vna.state = IDLE
+        self._dispatch()
+        self._schedule_release()
+
+    def metrics(self):
+        metrics = super().metrics()
+        hours = self.now / 3600
+        metrics['picksPerHour'] = metrics['ordersProcessed'] / hours if hours else 0.0
+        metrics['waves'] = len(self.waves)
+        metrics['avgWaveSize'] = metrics['ordersProcessed'] / len(self.waves) if self.waves else 0.0
+        metrics['avgTourTime'] = (sum(w[2] for w in self.waves) / len(self.waves)) if self.waves else 0.0
+        return metrics
+
+
+# ----------------------------
+# Policy comparison
+# ----------------------------
+def policy_grid(batch_sizes=DEFAULT_BATCH_SIZES, windows=DEFAULT_WINDOWS, groupings=GROUPINGS,
+                routings=tuple(ROUTINGS)):
+    """Every batching policy; batch size 1 needs neither grouping nor routing, so it appears once."""
+    grid = []
+    for batch_size, window, grouping, routing in itertools.product(batch_sizes, windows, groupings, routings):
+        if batch_size == 1 and (grouping, routing, window) != (groupings[0], routings[0], windows[0]):
+            continue
+        grid.append({'batch_size': batch_size, 'wave_window': window, 'grouping': grouping, 'routing': routing})
+    return grid
+
+
+def compare_policies(layout, inventory, demand, policies=None, **config):
+    """One row per policy, best picks per hour first."""
+    rows = []
+    for policy in policies or policy_grid():
+        metrics = WaveSimulator(layout, inventory, demand, **config, **policy).run()
+        rows.append({
+            **policy,
+            'orders_processed': metrics['ordersProcessed'],
+            'orders_skipped': metrics['ordersSkipped'],
+            'sim_hours': metrics['simTime'] / 3600,
+            'picks_per_hour': metrics['picksPerHour'],
+            'waves': metrics['waves'],
+            'avg_wave_size': metrics['avgWaveSize'],
+            'avg_tour_seconds': metrics['avgTourTime'],
+            'seconds_per_pick': metrics['avgPickTime'],
+            'utilization_pct': metrics['utilization'],
+        })
+    return pd.DataFrame(rows).sort_values('picks_per_hour', ascending=False, ignore_index=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare pick-wave batching / routing policies')
+    parser.add_argument('layout', help='Layout file (Corridor, Side, X, Y)')
+    parser.add_argument('inventory', help='Inventory file (Material_ID, Location, Stock_Qty, Goods_Receipt_Date)')
+    parser.add_argument('demand', help='Demand file (Material_ID, Demand_Qty, Shipping_Date)')
+    parser.add_argument('--vna', type=int, default=1, help='Number of VNA forklifts')
+    parser.add_argument('--speed', type=float, default=DEFAULT_SPEED_KMH, help='Travel speed (km/h)')
+    parser.add_argument('--order-interval', type=float, default=ORDER_INTERVAL_S,
+                        help='Seconds between order releases')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=list(DEFAULT_BATCH_SIZES))
+    parser.add_argument('--windows', type=float, nargs='+', default=list(DEFAULT_WINDOWS),
+                        help='Seconds to wait for a wave to fill')
+    parser.add_argument('--groupings', nargs='+', choices=GROUPINGS, default=list(GROUPINGS))
+    parser.add_argument('--routings', nargs='+', choices=list(ROUTINGS), default=list(ROUTINGS))
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    policies = policy_grid(args.batch_sizes, args.windows, args.groupings, args.routings)
+    results = compare_policies(read_table(args.layout), read_table(args.inventory), read_table(args.demand),
+                               policies, vna_count=args.vna, speed_kmh=args.speed,
+                               order_interval=args.order_interval)
+    results.to_csv(args.output, index=False)
+
+    baseline = results.loc[results['batch_size'] == 1, 'picks_per_hour']
+    best = results.iloc[0]
+    print("=" * 70)
+    print("🚚 PICK-WAVE POLICIES")
+    print("=" * 70)
+    print(results.head(10).to_string(index=False, float_format=lambda v: f'{v:,.1f}'))
+    print("-" * 70)
+    print(f"Best: batch {best['batch_size']}, {best['grouping']} grouping, {best['routing']} routing, "
+          f"window {best['wave_window']:.0f} s -> {best['picks_per_hour']:,.1f} picks/h")
+    if len(baseline):
+        print(f"Single-order baseline: {baseline.iloc[0]:,.1f} picks/h "
+              f"({best['picks_per_hour'] / baseline.iloc[0] - 1:+.1%})")
+    print(f"All {len(results)} policies saved to '{args.output}'.")
+    print("=" * 70)
@@ -0,0 +1,211 @@
+import functools
+import json
+import os
+import time
+from datetime import datetime
+
+# ----------------------------
+# Profiling spans and per-run timing report
+# ----------------------------
+# Spans nest into a timing tree (seconds, row count, memory delta per phase).
+# Everything is switched on by the GUN_PROFILE environment variable, read
+# once at import:
+#
+#   GUN_PROFILE=1                       timing tree only
+#   GUN_PROFILE=cprofile                + cProfile (.prof file, top functions)
+#   GUN_PROFILE=tracemalloc             + tracemalloc (python allocations, top lines)
+#   GUN_PROFILE=cprofile,tracemalloc    both
+#
+# Each profiled run writes <GUN_PROFILE_DIR or 'profiles'>/<run>-<time>.json.
+# When disabled, span() returns a shared no-op object and profiled functions
+# call straight through after one list check.
+
+PROFILE_ENV = 'GUN_PROFILE'
+PROFILE_DIR_ENV = 'GUN_PROFILE_DIR'
+PROFILE_DIR = 'profiles'
+TOP_ENTRIES = 15
+
+
+def profile_modes(value=None):
+    """Set of enabled modes from a GUN_PROFILE value ('' / '0' / 'off' = disabled)."""
+    value = os.environ.get(PROFILE_ENV, '') if value is None else value
+    modes = {part.strip().lower() for part in value.split(',')} - {'', '0', 'off', 'false'}
+    if not modes:
+        return set()
+    return {'spans'} | (modes & {'cprofile', 'tracemalloc'})
+
+
+MODES = profile_modes()
+
+_stack = []   # open spans of the current run (empty = not profiling)
+
+
+def _memory_mb():
+    """Traced python memory under tracemalloc, otherwise the process RSS."""
+    if 'tracemalloc' in MODES:
+        import tracemalloc
+        if tracemalloc.is_tracing():
+            return tracemalloc.get_traced_memory()[0] / 1024 ** 2
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        try:
+            import resource
+        except ImportError:
+            return None
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024   # peak, KB on Linux
+
+
+class Span:
+    """One timed phase; ``rows`` may be set inside the ``with`` block."""
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+        self.seconds = None
+        self.memory_delta_mb = None
+        self.children = []
+        self._start = self._memory = None
+
+    def __enter__(self):
+        if _stack:
+            _stack[-1].children.append(self)
+        _stack.append(self)
+        self._memory = _memory_mb()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self._start
+        memory = _memory_mb()
+        if memory is not None and self._memory is not None:
+            self.memory_delta_mb = memory - self._memory
+        _stack.pop()
+        return False
+
+    def to_dict(self):
+        node = {'name': self.name, 'seconds': round(self.seconds or 0.0, 6)}
+        if self.rows is not None:
+            node['rows'] = int(self.rows)
+        if self.memory_delta_mb is not None:
+            node['memory_delta_mb'] = round(self.memory_delta_mb, 3)
+        if self.children:
+            node['children'] = [child.to_dict() for child in self.children]
+        return node
+
+
+class _NullSpan:
+    """Stand-in when not profiling: a context manager that ignores everything."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name, rows=None):
+    """Context manager timing one phase of the current run (no-op outside a profiled run)."""
+    return Span(name, rows) if _stack else _NULL_SPAN
+
+
+def profiled(name=None):
+    """Decorator: run the function inside a span (its qualified name by default)."""
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _stack:
+                return fn(*args, **kwargs)
+            with Span(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _top_functions(profiler):
+    import pstats
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, function), (_, calls, own, cumulative, _) in stats.stats.items():
+        rows.append({'function': f'{os.path.basename(filename)}:{line}({function})', 'calls': calls,
+                     'own_seconds': round(own, 6), 'cumulative_seconds': round(cumulative, 6)})
+    return sorted(rows, key=lambda r: r['cumulative_seconds'], reverse=True)[:TOP_ENTRIES]
+
+
+def _top_allocations(snapshot):
+    return [{'line': f'{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}',
+             'size_mb': round(stat.size / 1024 ** 2, 3), 'blocks': stat.count}
+            for stat in snapshot.statistics('lineno')[:TOP_ENTRIES]]
+
+
+def _write_report(root, started, profiler, allocations):
+    folder = os.environ.get(PROFILE_DIR_ENV, PROFILE_DIR)
+    os.makedirs(folder, exist_ok=True)
+    stem = os.path.join(folder, f"{root.name}-{started.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+    report = {
+        'run': root.name,
+        'started_at': started.isoformat(timespec='seconds'),
+        'pid': os.getpid(),
+        'modes': sorted(MODES),
+        'tree': root.to_dict(),
+    }
+    if profiler is not None:
+        profiler.dump_stats(stem + '.prof')
+        report['cprofile_file'] = stem + '.prof'
+        report['top_functions'] = _top_functions(profiler)
+    if allocations is not None:
+        report['top_allocations'] = allocations
+    with open(stem + '.json', 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return stem + '.json'
+
+
+def profiled_run(name):
+    """
+    Decorator for a script's main(): the root span of a run. Writes the JSON
+    report when the run ends; inside another run it is an ordinary span.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not MODES:
+                return fn(*args, **kwargs)
+            if _stack:
+                with Span(name):
+                    return fn(*args, **kwargs)
+            return _run(name, fn, args, kwargs)
+        return wrapper
+    return decorate
+
+
+def _run(name, fn, args, kwargs):
+    started = datetime.now()
+    profiler = allocations = None
+    if 'tracemalloc' in MODES:
+        import tracemalloc
+        tracemalloc.start()
+    if 'cprofile' in MODES:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    root = Span(name)
+    try:
+        with root:
+            return fn(*args, **kwargs)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        if 'tracemalloc' in MODES:
+            allocations = _top_allocations(tracemalloc.take_snapshot())
+            tracemalloc.stop()
+        path = _write_report(root, started, profiler, allocations)
+        print(f"⏱️ Profile written to '{path}' ({root.seconds:.3f} s)")
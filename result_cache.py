@@ -0,0 +1,344 @@
+import argparse
+import functools
+import glob
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sys
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from demand_cube import DemandCube
+from inventory_loader import file_digest
+from profiling import span
+
+# ----------------------------
+# On-disk result cache
+# ----------------------------
+# Memoizes analysis stages (each day script's compute() and the expensive
+# intermediate tables) across runs. The key of a call is built from:
+#   - the input data: a frame's ``attrs['snapshot']`` content digest (set by
+#     inventory_loader / tag_snapshot) plus its columns and row index, or a
+#     demand cube's per-file digests
+#   - every argument value after defaults are applied (63% concentration,
+#     80/95 ABC cutoffs, 180-day slow movers, 3-sigma rule, ...)
+#   - the digests of the function's source file and of every project module
+#     it reaches through module globals (abc_engine, location_index, ...), so
+#     an edit anywhere in its code path invalidates
+#   - the fingerprints of data files the function declares it reads
+#     (cached_result(files=...), e.g. gun5's location_rules.json)
+# Inputs without a fingerprint (a frame built in memory) are not cached.
+# Entries are pickles in GUN_RESULT_CACHE_DIR (default '.result_cache').
+# A hit touches the file's mtime, and after each write the least recently
+# used entries are evicted until the folder is under GUN_RESULT_CACHE_MB.
+# GUN_RESULT_CACHE=0 switches the cache off.
+#
+# File fingerprints (size, mtime, content digest) are kept in an index so an
+# unchanged file is not hashed again.
+
+CACHE_ENV = 'GUN_RESULT_CACHE'
+CACHE_DIR_ENV = 'GUN_RESULT_CACHE_DIR'
+CACHE_MB_ENV = 'GUN_RESULT_CACHE_MB'
+CACHE_DIR = '.result_cache'
+CACHE_MB = 512
+ENTRY_SUFFIX = '.pkl'
+FINGERPRINT_FILE = 'fingerprints.json'
+
+# Bump when the key layout or the pickled result format changes
+CACHE_VERSION = 2
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Arguments where None means "today": keyed by the date, so results roll over daily
+TODAY_ARGUMENTS = ('current_date',)
+
+
+class Uncacheable(Exception):
+    """An argument has no stable fingerprint; the call runs uncached."""
+
+
+def enabled():
+    return os.environ.get(CACHE_ENV, '1').strip().lower() not in {'0', 'off', 'false'}
+
+
+def cache_dir():
+    return os.environ.get(CACHE_DIR_ENV, CACHE_DIR)
+
+
+def cache_limit_bytes():
+    return float(os.environ.get(CACHE_MB_ENV, CACHE_MB)) * 1024 ** 2
+
+
+# ----------------------------
+# Fingerprints
+# ----------------------------
+_fingerprints = {}
+
+
+def _fingerprint_index_path(folder=None):
+    return os.path.join(folder or cache_dir(), FINGERPRINT_FILE)
+
+
+def file_fingerprint(path, folder=None):
+    """
+    {'size', 'mtime_ns', 'digest'} of a file. The content digest (the same
+    digest inventory_loader uses for snapshots) is only recomputed when the
+    size or mtime changed since it was last recorded.
+    """
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    index_path = _fingerprint_index_path(folder)
+    if not _fingerprints.get(index_path):
+        try:
+            with open(index_path, encoding='utf-8') as f:
+                _fingerprints[index_path] = json.load(f)
+        except (FileNotFoundError, ValueError):
+            _fingerprints[index_path] = {}
+    index = _fingerprints[index_path]
+    entry = index.get(key)
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry
+
+    entry = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'digest': file_digest(path)}
+    index[key] = entry
+    os.makedirs(os.path.dirname(index_path) or '.', exist_ok=True)
+    tmp = f'{index_path}.{os.getpid()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp, index_path)
+    return entry
+
+
+def tag_snapshot(df, path):
+    """Mark a frame read from ``path`` with the file's content digest (like load_inventory)."""
+    df.attrs['snapshot'] = file_fingerprint(path)['digest']
+    return df
+
+
+def _index_digest(index):
+    if isinstance(index, pd.RangeIndex):
+        return [index.start, index.stop, index.step]
+    hashed = pd.util.hash_pandas_object(index, index=False).to_numpy()
+    return hashlib.blake2b(hashed.tobytes(), digest_size=16).hexdigest()
+
+
+def fingerprint(value):
+    """JSON-ready identity of an argument value; raises Uncacheable."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime, date, pd.Timestamp)):
+        return pd.Timestamp(value).isoformat()
+    if isinstance(value, (list, tuple)):
+        return [fingerprint(v) for v in value]
+    if isinstance(value, pd.DataFrame):
+        snapshot = value.attrs.get('snapshot')
+        if snapshot is None:
+            raise Uncacheable('frame without a snapshot digest')
+        return {'snapshot': snapshot, 'columns': [f'{c}:{t}' for c, t in value.dtypes.items()],
+                'rows': len(value), 'index': _index_digest(value.index)}
+    if isinstance(value, DemandCube):
+        sources = sorted((source, info.get('digest'), info.get('rows')) for source, info in value.sources.items())
+        if not sources or any(digest is None for _, digest, _ in sources):
+            raise Uncacheable('demand cube built in memory')
+        return {'cube': sources}
+    raise Uncacheable(f'no fingerprint for {type(value).__name__}')
+
+
+@functools.lru_cache(maxsize=None)
+def _source_digest(path):
+    return file_digest(path)
+
+
+def _project_module(value):
+    """The project module (a file in PROJECT_DIR) a global value is or comes from, else None."""
+    module = value if inspect.ismodule(value) else sys.modules.get(getattr(value, '__module__', None) or '')
+    path = getattr(module, '__file__', None)
+    if path and os.path.dirname(os.path.abspath(path)) == PROJECT_DIR:
+        return module
+    return None
+
+
+_code_digests = {}
+
+
+def code_digests(fn):
+    """
+    [(file name, digest)] of ``fn``'s source file and of every project module
+    reachable from its module globals, transitively.
+    """
+    if fn not in _code_digests:
+        files = {os.path.abspath(inspect.getsourcefile(fn))}
+        pending = [fn.__globals__]
+        while pending:
+            for value in list(pending.pop().values()):
+                module = _project_module(value)
+                path = os.path.abspath(module.__file__) if module is not None else None
+                if path is not None and path not in files:
+                    files.add(path)
+                    pending.append(vars(module))
+        _code_digests[fn] = sorted((os.path.basename(path), _source_digest(path)) for path in files)
+    return _code_digests[fn]
+
+
+def _data_fingerprint(path):
+    try:
+        return file_fingerprint(path)['digest']
+    except FileNotFoundError:
+        return None
+
+
+def result_key(label, fn, args, kwargs, files=()):
+    """Cache key of a call (hex digest)."""
+    bound = inspect.signature(fn).bind(*args, **kwargs)
+    bound.apply_defaults()
+    params = {}
+    for name, value in bound.arguments.items():
+        if name in TODAY_ARGUMENTS and value is None:
+            value = date.today()
+        params[name] = fingerprint(value)
+    data = {path: _data_fingerprint(path) for path in files}
+    payload = json.dumps([CACHE_VERSION, label, code_digests(fn), data, params], sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+# ----------------------------
+# Entries
+# ----------------------------
+_MISS = object()
+
+
+def entry_path(label, key, folder=None):
+    return os.path.join(folder or cache_dir(), f'{label}-{key}{ENTRY_SUFFIX}')
+
+
+def read_entry(path):
+    """Cached value or _MISS; a hit marks the entry as recently used."""
+    try:
+        with open(path, 'rb') as f:
+            value = pickle.load(f)
+    except FileNotFoundError:
+        return _MISS
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError):
+        # Broken or outdated entry: drop it and recompute
+        os.remove(path)
+        return _MISS
+    os.utime(path)
+    return value
+
+
+def write_entry(path, value, limit_bytes=None):
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except (pickle.PicklingError, TypeError, AttributeError, OSError):
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return
+    evict(folder, cache_limit_bytes() if limit_bytes is None else limit_bytes)
+
+
+def _entries(folder=None):
+    """[(last used, size, path)] of the cache entries, least recently used first."""
+    entries = []
+    for path in glob.glob(os.path.join(glob.escape(folder or cache_dir()), '*' + ENTRY_SUFFIX)):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:  # evicted by another process
+            continue
+        entries.append((stat.st_mtime_ns, stat.st_size, path))
+    return sorted(entries)
+
+
+def evict(folder=None, limit_bytes=None):
+    """Remove least recently used entries until the folder fits ``limit_bytes``; returns the count."""
+    limit_bytes = cache_limit_bytes() if limit_bytes is None else limit_bytes
+    entries = _entries(folder)
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in entries:
+        if total <= limit_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def clear(folder=None):
+    entries = _entries(folder)
+    for _, _, path in entries:
+        os.remove(path)
+    return len(entries)
+
+
+def cached_result(label, files=()):
+    """
+    Decorator: memoize the function's return value on disk under ``label``
+    (e.g. 'gun1'). ``files`` are data files the function reads besides its
+    arguments. Calls whose inputs have no fingerprint run uncached.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not enabled():
+                return fn(*args, **kwargs)
+            try:
+                key = result_key(label, fn, args, kwargs, files)
+            except Uncacheable:
+                return fn(*args, **kwargs)
+            path = entry_path(label, key)
+            with span(f'cache_read {label}'):
+                value = read_entry(path)
+            if value is not _MISS:
+                return value
+            value = fn(*args, **kwargs)
+            with span(f'cache_write {label}'):
+                write_entry(path, value)
+            return value
+        wrapper.uncached = fn
+        return wrapper
+    return decorate
+
+
+def cache_stats(folder=None):
+    """Entries and megabytes per label."""
+    rows = [{'label': os.path.basename(path).rsplit('-', 1)[0], 'bytes': size}
+            for _, size, path in _entries(folder)]
+    if not rows:
+        return pd.DataFrame(columns=['entries', 'mb'])
+    frame = pd.DataFrame(rows).groupby('label').agg(entries=('bytes', 'size'), mb=('bytes', 'sum'))
+    frame['mb'] = frame['mb'] / 1024 ** 2
+    return frame
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Inspect or trim the analysis result cache')
+    parser.add_argument('--dir', default=None, help=f'Cache folder (default: ${CACHE_DIR_ENV} or {CACHE_DIR})')
+    parser.add_argument('--clear', action='store_true', help='Remove every entry')
+    parser.add_argument('--limit-mb', type=float, default=None, help='Evict down to this size')
+    args = parser.parse_args()
+
+    folder = args.dir or cache_dir()
+    if args.clear:
+        print(f"🗑️ Removed {clear(folder)} entries.")
+    elif args.limit_mb is not None:
+        print(f"🗑️ Evicted {evict(folder, args.limit_mb * 1024 ** 2)} entries.")
+    stats = cache_stats(folder)
+    print("=" * 50)
+    print(f"📦 RESULT CACHE '{folder}': {int(stats['entries'].sum())} entries, {stats['mb'].sum():.1f} MB")
+    print("=" * 50)
+    if len(stats):
+        print(stats.round(2).to_string())
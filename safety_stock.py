@@ -0,0 +1,102 @@
+from functools import lru_cache
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+# ----------------------------
+# Vectorized safety stock engine
+# ----------------------------
+# SS = z(SL) * sigma_daily * sqrt(LT) and capital = SS * Unit_Cost for every
+# SKU and every service level at once (SKU x SL broadcast, no Python loops).
+
+MOVEMENTS_FILE = 'outbound_movements.csv'
+LEAD_TIME_DAYS = 7  # assumed replenishment lead time
+SERVICE_LEVELS = np.round(np.linspace(0.50, 0.995, 50), 4)
+
+
+def daily_demand_sigma(movements, key='Material_ID', qty='Quantity', date='Document_Date'):
+    """
+    Standard deviation (ddof=1) of daily demand per SKU.
+
+    Days without movements inside the observed window count as zero demand,
+    so sigma comes from per-SKU sums of daily totals and of their squares.
+    """
+    days = pd.to_datetime(movements[date]).dt.normalize()
+    n_days = (days.max() - days.min()).days + 1 if len(days) else 0
+    quantity = pd.to_numeric(movements[qty], errors='coerce').fillna(0)
+    daily = quantity.groupby([movements[key], days]).sum()
+    per_sku = pd.DataFrame({
+        'sum': daily.groupby(level=0).sum(),
+        'sum_sq': (daily ** 2).groupby(level=0).sum(),
+    })
+    if n_days < 2:
+        return pd.Series(np.nan, index=per_sku.index, name='sigma_daily')
+    var = (per_sku['sum_sq'] - per_sku['sum'] ** 2 / n_days) / (n_days - 1)
+    return np.sqrt(var.clip(lower=0)).rename('sigma_daily')
+
+
+@lru_cache(maxsize=1024)
+def z_value(service_level):
+    """
+    Standard normal quantile of one service level, memoized.
+
+    The stdlib inverse CDF replaces scipy's norm.ppf (scipy alone costs about
+    a second to import); the handful of service levels in use are computed once.
+    """
+    if 0.0 < service_level < 1.0:
+        return NormalDist().inv_cdf(service_level)
+    return {0.0: -np.inf, 1.0: np.inf}.get(service_level, np.nan)
+
+
+def service_level_z(service_levels):
+    levels = np.asarray(service_levels, dtype=np.float64)
+    z = [z_value(level) for level in levels.ravel().tolist()]
+    return np.array(z, dtype=np.float64).reshape(levels.shape)
+
+
+def safety_stock_matrix(sigma_daily, unit_cost, service_levels=SERVICE_LEVELS,
+                        lead_time_days=LEAD_TIME_DAYS, dtype=np.float32):
+    """
+    (safety stock units, locked capital) as SKU x service-level matrices.
+
+    ``lead_time_days`` may be a scalar or one value per SKU.
+    """
+    demand_dev = np.asarray(sigma_daily, dtype=np.float64) * np.sqrt(lead_time_days)
+    z = service_level_z(service_levels).astype(dtype)
+    ss = demand_dev.astype(dtype)[:, None] * z[None, :]
+    capital = ss * np.asarray(unit_cost, dtype=dtype)[:, None]
+    return ss, capital
+
+
+def portfolio_cost_curve(sigma_daily, unit_cost, service_levels=SERVICE_LEVELS,
+                         lead_time_days=LEAD_TIME_DAYS):
+    """
+    Total safety stock and locked capital of the whole portfolio per service level.
+
+    SS is linear in z, so the SKU x SL sums collapse to z * sum(sigma * sqrt(LT) * cost)
+    and the full matrix never has to be materialized.
+    """
+    demand_dev = np.nan_to_num(np.asarray(sigma_daily, dtype=np.float64)) * np.sqrt(lead_time_days)
+    unit_cost = np.nan_to_num(np.asarray(unit_cost, dtype=np.float64))
+    z = service_level_z(service_levels)
+    return pd.DataFrame({
+        'Service_Level': np.asarray(service_levels, dtype=np.float64),
+        'Z': z,
+        'Safety_Stock_Units': z * demand_dev.sum(),
+        'Capital_Locked': z * (demand_dev * unit_cost).sum(),
+    })
+
+
+def sku_demand_table(inventory, movements=None, key='Material_ID', sigma_daily=None):
+    """
+    Unit_Cost and daily demand sigma per SKU (SKUs without movements get sigma 0).
+
+    ``sigma_daily`` -- precomputed sigma per SKU (e.g. DemandCube.daily_sigma());
+    otherwise it is computed from the ``movements`` rows.
+    """
+    if sigma_daily is None:
+        sigma_daily = daily_demand_sigma(movements, key=key)
+    skus = inventory.groupby(key, sort=False)['Unit_Cost'].mean().to_frame()
+    skus['sigma_daily'] = sigma_daily.reindex(skus.index).fillna(0.0)
+    return skus
@@ -0,0 +1,119 @@
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from vna_sim import DEFAULT_SPEED_KMH, LIFT_RATE, WarehouseSimulator, read_table
+
+# ----------------------------
+# Monte Carlo scenario runner for the headless VNA simulator
+# ----------------------------
+# Sweeps fleet size x speed x fork lift rate x demand resampling seed across a
+# process pool and writes one tidy row per replication.
+
+OUTPUT_FILE = 'scenario_results.csv'
+
+# Worker-side inputs, set once per process by _init_worker
+_INPUTS = {}
+
+
+def _init_worker(layout, inventory, demand):
+    _INPUTS.update(layout=layout, inventory=inventory, demand=demand)
+
+
+def resample_demand(demand, seed):
+    """Bootstrap the demand lines (same size, with replacement); seed 0 = original file."""
+    if seed == 0:
+        return demand
+    return demand.sample(n=len(demand), replace=True, random_state=seed).reset_index(drop=True)
+
+
+def run_scenario(scenario):
+    """Run one replication in a worker and return a flat result row."""
+    vna_count, speed_kmh, lift_rate, seed = scenario
+    sim = WarehouseSimulator(
+        _INPUTS['layout'], _INPUTS['inventory'], resample_demand(_INPUTS['demand'], seed),
+        vna_count=vna_count, speed_kmh=speed_kmh, lift_rate=lift_rate,
+    )
+    metrics = sim.run()
+    picks = np.asarray(sim.pick_times)
+    hours = metrics['simTime'] / 3600
+    row = {
+        'vna_count': vna_count,
+        'speed_kmh': speed_kmh,
+        'lift_rate': lift_rate,
+        'seed': seed,
+        'orders_processed': metrics['ordersProcessed'],
+        'orders_skipped': metrics['ordersSkipped'],
+        'pallets_moved': metrics['palletsMoved'],
+        'sim_hours': hours,
+        'throughput_per_hour': metrics['ordersProcessed'] / hours if hours else 0.0,
+        'utilization_pct': metrics['utilization'],
+        'pick_time_mean': metrics['avgPickTime'],
+    }
+    for q in (50, 90, 95):
+        row[f'pick_time_p{q}'] = float(np.percentile(picks, q)) if picks.size else np.nan
+    row['pick_time_max'] = float(picks.max()) if picks.size else np.nan
+    return row
+
+
+def build_grid(vna_counts, speeds, lift_rates, replications):
+    return list(itertools.product(vna_counts, speeds, lift_rates, range(replications)))
+
+
+def run_sweep(layout, inventory, demand, vna_counts=(1,), speeds=(DEFAULT_SPEED_KMH,),
+              lift_rates=(LIFT_RATE,), replications=1, workers=None):
+    """Run every scenario of the grid and return the tidy results table."""
+    grid = build_grid(vna_counts, speeds, lift_rates, replications)
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(grid) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(layout, inventory, demand)) as pool:
+        rows = list(pool.map(run_scenario, grid, chunksize=chunksize))
+    return pd.DataFrame(rows)
+
+
+def summarize(results):
+    """Mean and spread per scenario (over replications)."""
+    keys = ['vna_count', 'speed_kmh', 'lift_rate']
+    return results.groupby(keys).agg(
+        replications=('seed', 'size'),
+        throughput_mean=('throughput_per_hour', 'mean'),
+        throughput_std=('throughput_per_hour', 'std'),
+        utilization_mean=('utilization_pct', 'mean'),
+        pick_time_p50=('pick_time_p50', 'median'),
+        pick_time_p95=('pick_time_p95', 'median'),
+    ).reset_index()
+
+
+def _floats(text):
+    return [float(v) for v in text.split(',')]
+
+
+def _ints(text):
+    return [int(v) for v in text.split(',')]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='VNA fleet sizing sweep')
+    parser.add_argument('layout')
+    parser.add_argument('inventory')
+    parser.add_argument('demand')
+    parser.add_argument('--vna', type=_ints, default=[1, 2, 3, 4, 5, 6], help='Fleet sizes, e.g. 1,2,4')
+    parser.add_argument('--speed', type=_floats, default=[DEFAULT_SPEED_KMH], help='Speeds in km/h, e.g. 3.6,5')
+    parser.add_argument('--lift-rate', type=_floats, default=[LIFT_RATE], help='Fork lift rates in levels/s')
+    parser.add_argument('--replications', type=int, default=10, help='Demand resamples per scenario')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    results = run_sweep(read_table(args.layout), read_table(args.inventory), read_table(args.demand),
+                        vna_counts=args.vna, speeds=args.speed, lift_rates=args.lift_rate,
+                        replications=args.replications, workers=args.workers)
+    results.to_csv(args.output, index=False)
+
+    print(summarize(results).to_string(index=False, float_format=lambda v: f'{v:,.2f}'))
+    print(f"\n{len(results)} runs written to '{args.output}'.")
@@ -0,0 +1,186 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from abc_engine import ABC_A, abc_labels, classify
+from demand_cube import update_cube
+from gun5 import EXTRA_TIME_PER_PICK_SECONDS, GROSS_ANNUAL_LABOR_COST, TOTAL_ANNUAL_WORK_SECONDS
+from inventory_loader import INVENTORY_FILE, load_inventory
+from location_index import load_rules, location_index
+from movement_stream import MOVEMENTS_FILE
+from vna_sim import DEFAULT_SPEED_KMH, LIFT_RATE
+from warehouse_layout import drive_seconds, home_position, shelf_position
+
+# ----------------------------
+# Slotting optimizer: A-class SKUs to fast-access locations
+# ----------------------------
+# Every inventory row (a pallet at a location) gets an annual pick frequency
+# from the demand cube and every location an expected round-trip time per
+# pick: VNA travel / lift time from the corridor home (warehouse_layout) plus
+# gun5's slow-zone penalty for locations outside the fast-access rules.
+# Expected travel is sum(picks * seconds); that cost is separable, so the
+# optimal assignment pairs the most-picked rows with the cheapest locations
+# (a sort, no cost matrix). The plan applies improving pairwise swaps between
+# misplaced rows, bounded by max_swaps, largest saving first.
+
+DAYS_PER_YEAR = 365
+DEFAULT_MAX_SWAPS = 500
+
+
+def pick_seconds(fields, fast_access, speed_kmh=DEFAULT_SPEED_KMH, lift_rate=LIFT_RATE):
+    """
+    Expected seconds per pick for each distinct location.
+
+    Parsed locations: home -> shelf -> home travel plus lifting and lowering
+    the forks (warehouse_layout). Slow-access locations add gun5's extra time per pick.
+    Unparseable locations only carry the slow-access penalty.
+    """
+    parsed = fields['bay'].to_numpy() >= 0
+    shelf_x, shelf_z = shelf_position(fields['corridor'], fields['side'], fields['bay'])
+    home_x, home_z = home_position(fields['corridor'])
+    drive = drive_seconds(home_x, home_z, shelf_x, shelf_z, speed_kmh / 3.6)
+    lift = fields['level'].to_numpy() / lift_rate
+    seconds = np.where(parsed, 2 * drive + 2 * lift, 0.0)
+    return seconds + np.where(fast_access, 0.0, EXTRA_TIME_PER_PICK_SECONDS)
+
+
+def annual_picks(inventory, cube):
+    """Annual picks per inventory row (a SKU's movements split over its rows)."""
+    first, last = cube.day_range()
+    n_days = max((last - first).days + 1, 1) if len(cube.table) else 1
+    per_sku = cube.movement_stats()['count'] * DAYS_PER_YEAR / n_days
+    rows_per_sku = inventory.groupby('Material_ID', observed=True)['Material_ID'].transform('size')
+    picks = inventory['Material_ID'].map(per_sku).fillna(0.0) / rows_per_sku
+    return picks.to_numpy(dtype=np.float64)
+
+
+def optimal_cost(picks, seconds):
+    """Lower bound: most-picked rows on the cheapest locations."""
+    return float(np.sum(np.sort(picks)[::-1] * np.sort(seconds)))
+
+
+def plan_swaps(picks, seconds, movable, max_swaps=DEFAULT_MAX_SWAPS):
+    """
+    Greedy bounded swaps. Returns (slot, swaps): row ``r`` ends up in the
+    original location of row ``slot[r]``; ``swaps`` is the number of swaps used.
+
+    A row is misplaced upwards when its location is costlier than its slot in
+    the optimal sort, downwards when cheaper. Each round pairs upward rows
+    (most picks first, only ``movable`` ones) with downward rows (cheapest
+    location first); a pair is swapped when it saves time
+    ((p_up - p_down) * (s_up - s_down) > 0). Rounds repeat until no pair
+    improves or max_swaps is reached.
+    """
+    slot = np.arange(len(picks))
+    swaps = 0
+    while swaps < max_swaps:
+        current = seconds[slot]
+        order = np.lexsort((current, -picks))           # optimal rank per row
+        target = np.empty_like(current)
+        target[order] = np.sort(current)
+        up = np.flatnonzero((current > target) & movable)
+        down = np.flatnonzero(current < target)
+        up = up[np.argsort(-picks[up], kind='stable')]
+        down = down[np.argsort(current[down], kind='stable')]
+        n = min(len(up), len(down))
+        saving = (picks[up[:n]] - picks[down[:n]]) * (current[up[:n]] - current[down[:n]])
+        good = np.flatnonzero(saving > 0)
+        if not len(good):
+            break
+        good = good[np.argsort(-saving[good], kind='stable')][:max_swaps - swaps]
+        i, j = up[good], down[good]
+        slot[i], slot[j] = slot[j], slot[i].copy()
+        swaps += len(good)
+    return slot, swaps
+
+
+def labor_cost(seconds_per_year):
+    """gun5's conversion: share of one worker's annual time x gross annual cost."""
+    return seconds_per_year / TOTAL_ANNUAL_WORK_SECONDS * GROSS_ANNUAL_LABOR_COST
+
+
+def plan_slotting(inventory, cube, rules=None, max_swaps=DEFAULT_MAX_SWAPS, classes=(ABC_A,)):
+    """
+    Relocation plan. Returns (moves DataFrame, summary dict).
+
+    Only rows of ``classes`` are promoted to cheaper locations; any row may
+    be demoted to make room. Swaps stay inside a warehouse; warehouses with
+    the largest possible saving get the swap budget first.
+    """
+    rules = rules or load_rules()
+    index = location_index(inventory)
+    fast_locations = np.r_[index.evaluate(rules['fast_access']), False]   # code -1 -> slow
+    location_seconds = np.r_[pick_seconds(index.fields, fast_locations[:-1]), EXTRA_TIME_PER_PICK_SECONDS]
+    seconds = location_seconds[index.codes]
+    fast = fast_locations[index.codes]
+    picks = annual_picks(inventory, cube)
+    abc = classify(inventory)
+    movable = np.isin(abc, classes)
+
+    warehouses = inventory['Warehouse'].to_numpy()
+    groups = [np.flatnonzero(warehouses == w) for w in pd.unique(warehouses)]
+    # Unconstrained optimum (any row may move); also ranks warehouses for the budget
+    optimal = [optimal_cost(picks[rows], seconds[rows]) for rows in groups]
+    potential = [np.sum(picks[rows] * seconds[rows]) - best for rows, best in zip(groups, optimal)]
+
+    new_location = np.arange(len(inventory))
+    swaps = 0
+    for g in np.argsort(potential)[::-1]:
+        rows = groups[g]
+        slot, used = plan_swaps(picks[rows], seconds[rows], movable[rows], max_swaps - swaps)
+        new_location[rows] = rows[slot]
+        swaps += used
+
+    new_seconds = seconds[new_location]
+    moved = np.flatnonzero(new_location != np.arange(len(inventory)))
+    locations = inventory['Location'].to_numpy()
+    moves = pd.DataFrame({
+        'Warehouse': warehouses[moved],
+        'Material_ID': inventory['Material_ID'].to_numpy()[moved],
+        'ABC_Class': np.asarray(abc_labels(abc[moved])),
+        'From_Location': locations[moved],
+        'To_Location': locations[new_location[moved]],
+        'Annual_Picks': picks[moved],
+        'Seconds_Saved_Per_Year': picks[moved] * (seconds[moved] - new_seconds[moved]),
+    }).sort_values('Seconds_Saved_Per_Year', ascending=False, ignore_index=True)
+
+    before = float(np.sum(picks * seconds))
+    after = float(np.sum(picks * new_seconds))
+    summary = {
+        'swaps': swaps,
+        'rows_moved': len(moved),
+        'travel_seconds_before': before,
+        'travel_seconds_after': after,
+        'travel_seconds_lower_bound': float(sum(optimal)),
+        'seconds_saved': before - after,
+        'labor_cost_before_usd': labor_cost(before),
+        'labor_cost_after_usd': labor_cost(after),
+        'labor_cost_delta_usd': labor_cost(after - before),
+        'a_in_slow_before': int((movable & ~fast).sum()),
+        'a_in_slow_after': int((movable & ~fast[new_location]).sum()),
+    }
+    return moves, summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Propose slot swaps moving A-class SKUs to fast locations')
+    parser.add_argument('--inventory', default=INVENTORY_FILE)
+    parser.add_argument('--movements', default=MOVEMENTS_FILE)
+    parser.add_argument('--max-swaps', type=int, default=DEFAULT_MAX_SWAPS)
+    parser.add_argument('--output', default='slotting_moves.csv')
+    args = parser.parse_args()
+
+    moves, summary = plan_slotting(load_inventory(args.inventory), update_cube(args.movements),
+                                   max_swaps=args.max_swaps)
+    moves.to_csv(args.output, index=False)
+
+    print("=" * 70)
+    print("📦 SLOTTING PLAN")
+    print("=" * 70)
+    print(f"Swaps proposed: {summary['swaps']:,}, rows moved: {summary['rows_moved']:,} (saved to '{args.output}')")
+    print(f"Expected travel: {summary['travel_seconds_before']:,.0f} s/yr -> "
+          f"{summary['travel_seconds_after']:,.0f} s/yr (lower bound {summary['travel_seconds_lower_bound']:,.0f})")
+    print(f"A-Class rows in slow access: {summary['a_in_slow_before']:,} -> {summary['a_in_slow_after']:,}")
+    print(f"Annual labor cost delta: ${summary['labor_cost_delta_usd']:,.2f} USD")
+    print("=" * 70)
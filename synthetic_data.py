@@ -0,0 +1,213 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from abc_engine import ABC_LABELS, abc_codes
+
+# ----------------------------
+# Synthetic benchmark data
+# ----------------------------
+# Schema-correct inventory.csv, outbound_movements.csv, layout.csv and
+# demand.csv at any size, with realistic skew: lognormal stock and unit cost
+# (so the cost Pareto / ABC split looks like real data), Zipf-like SKU
+# popularity for movements and demand, uneven warehouse sizes, weekday and
+# hour-of-day peaks in the movement timestamps, and fast-access (ZONEA- / PZ-)
+# front bays. Inventory locations are the layout's own keys, so vna_sim finds
+# every lot, and (Material_ID, Warehouse, Location) is unique per row.
+# Large files are written in CHUNK_ROWS pieces.
+
+SIZES = {'10k': 10_000, '1m': 1_000_000, '10m': 10_000_000}
+CHUNK_ROWS = 1_000_000
+
+REFERENCE_DATE = pd.Timestamp('2025-11-19')   # gun1's CURRENT_DATE
+MOVEMENT_DAYS = 90
+DEMAND_DAYS = 30
+MAX_DEMAND_LINES = 20_000                     # vna_sim is a per-order event loop
+
+ROWS_PER_SKU = 4
+SKU_POPULARITY_EXPONENT = 1.0
+WAREHOUSES = np.array(['WH01', 'WH02', 'WH03', 'WH04', 'WH05'])
+WAREHOUSE_WEIGHTS = np.array([0.35, 0.25, 0.20, 0.12, 0.08])
+CORRIDORS, BAYS, LEVELS = 20, 60, 6
+# Front bays of every corridor (nearest the dock) are fast-access zones: bays
+# 1-3 ZONEA (5% of slots), 4-12 PZ (15%), the rest has no zone
+ZONE_BAYS = (('ZONEA', 3), ('PZ', 12))
+WEEKDAY_WEIGHTS = np.array([1.0, 1.0, 1.0, 1.0, 0.9, 0.35, 0.1])     # Monday first
+HOUR_WEIGHTS = np.array([1, 1, 1, 1, 1, 2, 4, 8, 12, 14, 16, 13,
+                         9, 12, 15, 14, 11, 8, 5, 3, 2, 2, 1, 1], dtype=np.float64)
+
+
+def _chunks(n_rows):
+    return [(start, min(start + CHUNK_ROWS, n_rows)) for start in range(0, n_rows, CHUNK_ROWS)]
+
+
+def material_ids(codes, n_skus):
+    width = max(6, len(str(n_skus - 1)))
+    return np.char.add('MAT', np.char.zfill(codes.astype(str), width))
+
+
+def sku_popularity(n_skus, seed=0):
+    """Zipf-like pick probability per SKU (rank 1 most popular), in shuffled SKU order."""
+    weights = 1.0 / np.arange(1, n_skus + 1) ** SKU_POPULARITY_EXPONENT
+    return np.random.default_rng(seed).permutation(weights / weights.sum())
+
+
+def location_table(layout=None):
+    """[ZONE-]CC-S-BBB-LL location string of every layout slot (vna_sim.location_key)."""
+    layout = layout_frame() if layout is None else layout
+    keys = (layout['Corridor'].map('{:02d}'.format) + '-' + layout['Side'] + '-'
+            + layout['X'].map('{:03d}'.format) + '-' + layout['Y'].map('{:02d}'.format))
+    zoned = layout['Zone'] != ''
+    keys[zoned] = layout['Zone'][zoned] + '-' + keys[zoned]
+    return keys.to_numpy().astype(str)
+
+
+def layout_frame(corridors=CORRIDORS, bays=BAYS, levels=LEVELS):
+    """vna_sim layout: one row per (Corridor, Side, X, Y) shelf slot, with its Zone."""
+    grid = pd.MultiIndex.from_product(
+        [range(1, corridors + 1), ['A', 'B'], range(1, bays + 1), range(1, levels + 1)],
+        names=['Corridor', 'Side', 'X', 'Y'])
+    layout = grid.to_frame(index=False)
+    layout['Zone'] = ''
+    for zone, last_bay in reversed(ZONE_BAYS):
+        layout.loc[layout['X'] <= last_bay, 'Zone'] = zone
+    return layout
+
+
+def unique_keys(n_rows, sizes, rng, draw):
+    """
+    ``n_rows`` distinct combinations of codes, one column per entry of
+    ``sizes``: ``draw(n)`` returns n candidate rows, duplicates are redrawn.
+    """
+    capacity = np.prod(np.asarray(sizes, dtype=np.float64))
+    if capacity < n_rows:
+        raise ValueError(f'only {capacity:,.0f} distinct keys for {n_rows:,} rows')
+    codes = draw(n_rows)
+    while True:
+        flat = np.ravel_multi_index(tuple(codes.T), sizes)
+        duplicated = pd.Index(flat).duplicated()
+        if not duplicated.any():
+            return codes
+        codes[duplicated] = draw(int(duplicated.sum()))
+
+
+# ----------------------------
+# Generators
+# ----------------------------
+def generate_inventory(n_rows, seed=0):
+    """Inventory rows (gun1-gun8 schema); each SKU sits on about ROWS_PER_SKU locations."""
+    rng = np.random.default_rng(seed)
+    n_skus = max(n_rows // ROWS_PER_SKU, 1)
+    locations = location_table()
+    # (Material_ID, Warehouse, Location) is the row key (KpiStore): sampled without repeats
+    keys = unique_keys(n_rows, (n_skus, len(WAREHOUSES), len(locations)), rng, lambda n: np.column_stack([
+        rng.integers(0, n_skus, n),
+        rng.choice(len(WAREHOUSES), n, p=WAREHOUSE_WEIGHTS),
+        rng.integers(0, len(locations), n),
+    ]))
+    stock = np.floor(rng.lognormal(3.5, 1.0, n_rows))
+    stock[rng.random(n_rows) < 0.05] = 0
+    unit_cost = np.round(rng.lognormal(2.5, 1.2, n_rows), 2)
+    total_cost = np.round(stock * unit_cost, 2)
+    age = np.minimum(rng.exponential(120, n_rows), 730).astype(np.int64)
+    receipt = REFERENCE_DATE - pd.to_timedelta(age, unit='D')
+    since_movement = (rng.random(n_rows) * (age + 1)).astype(np.int64)
+    return pd.DataFrame({
+        'Material_ID': material_ids(keys[:, 0], n_skus),
+        'Warehouse': WAREHOUSES[keys[:, 1]],
+        'Location': locations[keys[:, 2]],
+        'Stock_Qty': stock.astype(np.int64),
+        'Safety_Stock': np.floor(rng.lognormal(3.0, 0.8, n_rows)).astype(np.int64),
+        'Unit_Cost': unit_cost,
+        'Total_Cost': total_cost,
+        'ABC_Class': ABC_LABELS[abc_codes(total_cost)],
+        'Goods_Receipt_Date': receipt.strftime('%Y-%m-%d'),
+        'Last_Movement_Date': (REFERENCE_DATE - pd.to_timedelta(since_movement, unit='D')).strftime('%Y-%m-%d'),
+    })
+
+
+def _timestamps(n_rows, first_day, n_days, rng):
+    """Sorted timestamps over ``n_days`` from ``first_day`` with weekday / hour peaks."""
+    days = pd.date_range(first_day, periods=n_days, freq='D')
+    day_weights = WEEKDAY_WEIGHTS[days.weekday]
+    day = rng.choice(n_days, n_rows, p=day_weights / day_weights.sum())
+    hour = rng.choice(24, n_rows, p=HOUR_WEIGHTS / HOUR_WEIGHTS.sum())
+    seconds = day * 86_400 + hour * 3_600 + rng.integers(0, 3_600, n_rows)
+    return pd.Timestamp(first_day) + pd.to_timedelta(np.sort(seconds), unit='s')
+
+
+def generate_movements(n_rows, n_skus, seed=0, popularity=None, first_id=1, first_day=None,
+                       n_days=MOVEMENT_DAYS):
+    """Outbound movements over ``n_days`` (Zipf SKU popularity, uneven warehouses)."""
+    rng = np.random.default_rng(seed)
+    first_day = first_day if first_day is not None else REFERENCE_DATE - pd.Timedelta(days=n_days)
+    popularity = sku_popularity(n_skus, seed) if popularity is None else popularity
+    return pd.DataFrame({
+        'Movement_ID': np.arange(first_id, first_id + n_rows),
+        'Material_ID': material_ids(rng.choice(n_skus, n_rows, p=popularity), n_skus),
+        'Warehouse': WAREHOUSES[rng.choice(len(WAREHOUSES), n_rows, p=WAREHOUSE_WEIGHTS)],
+        'Quantity': np.maximum(np.floor(rng.lognormal(3.0, 0.9, n_rows)), 1).astype(np.int64),
+        'Document_Date': _timestamps(n_rows, first_day, n_days, rng).strftime('%Y-%m-%d %H:%M:%S'),
+    })
+
+
+def generate_demand(n_lines, n_skus, seed=0, popularity=None, n_days=DEMAND_DAYS):
+    """vna_sim demand lines shipping over the ``n_days`` after the reference date."""
+    rng = np.random.default_rng(seed)
+    popularity = sku_popularity(n_skus, seed) if popularity is None else popularity
+    ship = REFERENCE_DATE + pd.to_timedelta(rng.integers(1, n_days + 1, n_lines), unit='D')
+    return pd.DataFrame({
+        'Material_ID': material_ids(rng.choice(n_skus, n_lines, p=popularity), n_skus),
+        'Demand_Qty': np.maximum(np.floor(rng.lognormal(2.0, 0.8, n_lines)), 1).astype(np.int64),
+        'Shipping_Date': ship.strftime('%Y-%m-%d'),
+    })
+
+
+def write_dataset(folder, n_rows, seed=0):
+    """
+    inventory.csv and outbound_movements.csv with ``n_rows`` rows each, plus
+    layout.csv and demand.csv, in ``folder``. Returns {name: path}.
+    """
+    os.makedirs(folder, exist_ok=True)
+    n_skus = max(n_rows // ROWS_PER_SKU, 1)
+    popularity = sku_popularity(n_skus, seed)     # the same hot SKUs in movements and demand
+    paths = {name: os.path.join(folder, f'{name}.csv')
+             for name in ('inventory', 'outbound_movements', 'layout', 'demand')}
+
+    # ABC needs the whole cost vector, so the inventory is built in one piece
+    generate_inventory(n_rows, seed).to_csv(paths['inventory'], index=False, chunksize=CHUNK_ROWS)
+
+    # Movements: each chunk covers its own slice of days, so the file stays sorted
+    chunks = _chunks(n_rows)
+    first_day = REFERENCE_DATE - pd.Timedelta(days=MOVEMENT_DAYS)
+    day_edges = np.linspace(0, MOVEMENT_DAYS, len(chunks) + 1).round().astype(int)
+    for i, (start, end) in enumerate(chunks):
+        n_days = max(day_edges[i + 1] - day_edges[i], 1)
+        part = generate_movements(end - start, n_skus, seed + 10 + i, popularity, first_id=start + 1,
+                                  first_day=first_day + pd.Timedelta(days=int(day_edges[i])), n_days=n_days)
+        part.to_csv(paths['outbound_movements'], index=False, mode='w' if i == 0 else 'a', header=i == 0)
+
+    layout_frame().to_csv(paths['layout'], index=False)
+    n_lines = min(max(n_rows // 10, 1), MAX_DEMAND_LINES)
+    generate_demand(n_lines, n_skus, seed + 2, popularity).to_csv(paths['demand'], index=False)
+    return paths
+
+
+def parse_size(text):
+    """'10k' / '1m' / '10m' presets or a plain row count."""
+    return SIZES.get(text.lower()) or int(text.replace('_', ''))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate synthetic inventory / movement / layout / demand files')
+    parser.add_argument('size', help=f"Rows per table: {', '.join(SIZES)} or a number")
+    parser.add_argument('--output', default=None, help='Folder (default: bench_data/<size>)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    folder = args.output or os.path.join('bench_data', args.size.lower())
+    paths = write_dataset(folder, parse_size(args.size), args.seed)
+    for name, path in paths.items():
+        print(f"✅ {name:<20} {os.path.getsize(path) / 1e6:,.1f} MB  '{path}'")
@@ -0,0 +1,194 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# ----------------------------
+# Integer time bucketing for peak-hour analysis
+# ----------------------------
+# Document_Date is converted to int64 epoch nanoseconds once. Slot counts
+# (any width in minutes) and the Hour x Weekday matrix are then np.bincount
+# calls over integer codes; no per-row strings, floors or group-bys. When the
+# slot width divides an hour, the Hour x Weekday matrix is folded from the
+# slot counts instead of being counted per row. Counts accumulate over chunks
+# and can be split by an optional group column (e.g. Warehouse).
+
+NS_PER_MINUTE = 60 * 10**9
+NS_PER_HOUR = 60 * NS_PER_MINUTE
+HOURS = 24
+WEEKDAYS = 7
+WEEKDAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+EPOCH_WEEKDAY = 3  # 1970-01-01 was a Thursday (Monday = 0)
+
+NAT = np.iinfo(np.int64).min
+
+
+def epoch_ns(dates):
+    """Datetime-like values -> int64 nanoseconds since the epoch (NaT stays NAT)."""
+    return pd.DatetimeIndex(pd.to_datetime(dates)).as_unit('ns').asi8
+
+
+def hour_weekday_codes(ns):
+    """hour * 7 + weekday (Monday = 0) for epoch nanoseconds."""
+    hours = ns // NS_PER_HOUR
+    return (hours % HOURS) * WEEKDAYS + (hours // HOURS + EPOCH_WEEKDAY) % WEEKDAYS
+
+
+class TimeBuckets:
+    """
+    Movement counts per time slot and per Hour x Weekday, optionally per group.
+
+    width_minutes -- slot width; slots are aligned like ``dt.floor(f'{width}min')``
+
+    ``add`` can be called once per chunk; the slot range grows as needed.
+    """
+
+    def __init__(self, width_minutes=15):
+        self.width_ns = int(width_minutes) * NS_PER_MINUTE
+        self.labels = []               # group label per group code
+        self._codes = {}
+        self.start = None              # first slot number (epoch ns // width_ns)
+        self.slots = np.zeros((0, 0), dtype=np.int64)                 # group x slot
+        self.hour_day = np.zeros((0, HOURS * WEEKDAYS), dtype=np.int64)  # group x (hour*7+weekday)
+
+    # ----------------------------
+    # Accumulation
+    # ----------------------------
+    def _group_codes(self, groups, n):
+        if groups is None:
+            if not self.labels:
+                self._codes[None] = 0
+                self.labels.append(None)
+            return np.zeros(n, dtype=np.int64)
+        uniques_codes, uniques = pd.factorize(np.asarray(groups), use_na_sentinel=False)
+        mapping = np.empty(len(uniques), dtype=np.int64)
+        for i, label in enumerate(uniques):
+            if label not in self._codes:
+                self._codes[label] = len(self.labels)
+                self.labels.append(label)
+            mapping[i] = self._codes[label]
+        return mapping[uniques_codes]
+
+    def _grow_groups(self, n_groups):
+        for name in ('slots', 'hour_day'):
+            counts = getattr(self, name)
+            if counts.shape[0] < n_groups:
+                grown = np.zeros((n_groups, counts.shape[1]), dtype=np.int64)
+                grown[:counts.shape[0]] = counts
+                setattr(self, name, grown)
+
+    def _grow_slots(self, first, last):
+        old_start = first if self.start is None else self.start
+        old_end = old_start + self.slots.shape[1]
+        start, end = min(old_start, first), max(old_end, last + 1)
+        if (start, end) != (old_start, old_end):
+            grown = np.zeros((self.slots.shape[0], end - start), dtype=np.int64)
+            grown[:, old_start - start:old_end - start] = self.slots
+            self.slots = grown
+        self.start = start
+
+    def add(self, dates, groups=None, counted=None):
+        """
+        Count one batch of movements.
+
+        dates   -- Document_Date values (NaT rows are ignored)
+        groups  -- optional group label per row
+        counted -- optional boolean mask of rows entering the Hour x Weekday
+                   matrix (gun7's pivot_table counts non-null Movement_IDs only)
+        """
+        ns = epoch_ns(dates)
+        codes = self._group_codes(groups, len(ns))
+        n_groups = len(self.labels)
+        self._grow_groups(n_groups)
+
+        valid = ns != NAT
+        counted = valid if counted is None else np.asarray(counted, dtype=bool) & valid
+        if not valid.any():
+            return self
+
+        slot = ns[valid] // self.width_ns
+        first, last = int(slot.min()), int(slot.max())
+        n_local = last - first + 1
+        flat = codes[valid] * n_local + (slot - first)
+        local = np.bincount(flat, minlength=n_groups * n_local).reshape(n_groups, n_local)
+        self._grow_slots(first, last)
+        self.slots[:, first - self.start:first - self.start + n_local] += local
+
+        hw_size = HOURS * WEEKDAYS
+        if NS_PER_HOUR % self.width_ns == 0 and np.array_equal(counted, valid):
+            # Every slot lies inside one hour: fold the slot counts, O(slots) not O(rows)
+            slot_codes = hour_weekday_codes((first + np.arange(n_local)) * self.width_ns)
+            flat = (np.arange(n_groups)[:, None] * hw_size + slot_codes).ravel()
+            self.hour_day += np.bincount(flat, weights=local.ravel(),
+                                         minlength=n_groups * hw_size).astype(np.int64).reshape(n_groups, -1)
+        else:
+            flat = codes[counted] * hw_size + hour_weekday_codes(ns[counted])
+            self.hour_day += np.bincount(flat, minlength=n_groups * hw_size).reshape(n_groups, -1)
+        return self
+
+    # ----------------------------
+    # Results
+    # ----------------------------
+    def _rows(self, group):
+        if group is None:
+            return slice(None)
+        return self._codes[group]
+
+    def slot_counts(self, group=None):
+        """(slot start timestamps, counts) over the whole slot range, empty slots included."""
+        if self.start is None:
+            return pd.DatetimeIndex([]), np.zeros(0, dtype=np.int64)
+        counts = self.slots[self._rows(group)]
+        counts = counts.sum(axis=0) if counts.ndim == 2 else counts
+        starts = (self.start + np.arange(len(counts))) * self.width_ns
+        return pd.to_datetime(starts), counts
+
+    def time_series(self, group=None):
+        """Movements per slot, non-empty slots only (gun7's ``groupby('TimeSlot').size()``)."""
+        starts, counts = self.slot_counts(group)
+        keep = counts > 0
+        return pd.Series(counts[keep], index=pd.DatetimeIndex(starts[keep], name='TimeSlot'))
+
+    def hour_weekday(self, group=None):
+        """24 x 7 count matrix, rows = hour, columns = weekday (Monday = 0)."""
+        counts = self.hour_day[self._rows(group)]
+        counts = counts.sum(axis=0) if counts.ndim == 2 else counts
+        return counts.reshape(HOURS, WEEKDAYS)
+
+    def heatmap(self, group=None):
+        """
+        Hour x Day frame laid out like gun7's pivot_table: observed hours and
+        days only, day columns in alphabetical order.
+        """
+        matrix = pd.DataFrame(self.hour_weekday(group),
+                              index=pd.RangeIndex(HOURS, name='Hour'),
+                              columns=pd.Index(WEEKDAY_NAMES, name='Day'))
+        matrix = matrix.loc[matrix.sum(axis=1) > 0, matrix.sum(axis=0) > 0]
+        return matrix.sort_index(axis=1)
+
+    def groups(self):
+        return [label for label in self.labels if label is not None]
+
+
+def bucket_movements(df, width_minutes=15, by=None, date_col='Document_Date'):
+    """TimeBuckets for an in-memory movements frame (``by`` = optional group column)."""
+    counted = df['Movement_ID'].notna() if 'Movement_ID' in df.columns else None
+    groups = df[by] if by else None
+    return TimeBuckets(width_minutes).add(df[date_col], groups, counted)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Peak time slots of the outbound movements')
+    parser.add_argument('movements', nargs='?', default='outbound_movements.csv')
+    parser.add_argument('--width', type=int, default=15, help='Slot width in minutes (e.g. 5, 15, 60)')
+    parser.add_argument('--by', default=None, help='Split by this column (e.g. Warehouse)')
+    parser.add_argument('--top', type=int, default=5)
+    args = parser.parse_args()
+
+    columns = ['Movement_ID', 'Document_Date'] + ([args.by] if args.by else [])
+    buckets = bucket_movements(pd.read_csv(args.movements, usecols=columns), args.width, args.by)
+    for group in (buckets.groups() or [None]):
+        top = buckets.time_series(group).nlargest(args.top)
+        print(f"{group or 'ALL'}: busiest {args.width}-min slots")
+        for slot, count in top.items():
+            print(f'   {slot:%Y-%m-%d %H:%M}  {count}')
@@ -0,0 +1,500 @@
+import argparse
+import heapq
+import math
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import pandas as pd
+
+from event_log import ARRIVED, ASSIGNED, CREATED, LIFTED, LOWERED, RETURNED, SKIPPED, EventLog
+
+# ----------------------------
+# Headless VNA warehouse simulator (Python port of gun6.py)
+# ----------------------------
+# Same entities as the browser version -- shelf map keyed CC-S-XXX-YY, one VNA
+# per corridor, FIFO picking by Goods_Receipt_Date -- but driven by an event
+# heap with analytic travel/lift times instead of requestAnimationFrame, so
+# simulated time is decoupled from wall-clock time. A clock object decides how
+# simulated time advances: EventClock jumps to the next state change,
+# FixedStepClock reproduces gun6.py's fixed frame steps and can pace the run
+# against the wall clock at an acceleration factor.
+
+# Layout geometry (gun6.py)
+CORRIDOR_SPACING = 10    # m between corridors
+ROW_SPACING = 1.5        # m between bays along a corridor
+LEVEL_HEIGHT = 1.4       # m between shelf levels
+SIDE_OFFSET = 2          # side A at -2 m, side B at +2 m from corridor centre
+HOME_OFFSET_Z = -2       # VNA home is just in front of bay 1
+ARRIVAL_TOLERANCE = 0.5  # m, "distance > 0.5" stop condition
+
+# Motion (gun6.py advances 0.05 s of motion per frame, forks 0.08 level per frame)
+FRAME_SECONDS = 0.05
+DEFAULT_SPEED_KMH = 3.6
+LIFT_RATE = 1.6  # levels per second (0.08 level per frame)
+
+# Order release (gun6.py: one order every 3 s, at most 2 active orders per VNA)
+ORDER_INTERVAL_S = 3.0
+MAX_ORDERS_PER_VNA = 2
+
+# VNA states
+IDLE = 'idle'
+MOVING_TO_SHELF = 'moving_to_shelf'
+LIFTING = 'lifting'
+RETURNING_HOME = 'returning_home'
+LOWERING = 'lowering'
+
+# Event kinds
+EV_RELEASE = 'release'
+EV_ARRIVED = 'arrived'
+EV_LIFTED = 'lifted'
+EV_HOME = 'home'
+EV_LOWERED = 'lowered'
+
+
+@dataclass
+class Shelf:
+    key: str
+    corridor: int
+    side: str
+    x: int
+    y: int
+    pos_x: float
+    pos_z: float
+    has_pallet: bool = True
+
+
+@dataclass
+class Lot:
+    material_id: str
+    location: str
+    stock_qty: float
+    receipt_date: pd.Timestamp
+    reserved: bool = False
+
+
+@dataclass
+class Order:
+    order_id: int
+    material_id: str
+    target_location: str
+    shelf: Shelf
+    lot: Lot
+    quantity: float
+    created_at: float
+    picked_up: bool = False
+    delivered: bool = False
+
+
+@dataclass
+class Vna:
+    id: int
+    corridor: int
+    home_x: float
+    home_z: float
+    state: str = IDLE
+    order: Order = None
+    start_time: float = 0.0
+    busy_time: float = 0.0
+
+
+class EventClock:
+    """Event-driven: simulated time jumps straight to the next state change."""
+
+    def start(self):
+        pass
+
+    def advance(self, t):
+        return t
+
+
+class FixedStepClock:
+    """
+    Fixed timestep: simulated time advances ``step`` seconds at a time, and a
+    state change takes effect at the first step boundary at or after it (as
+    gun6.py notices an arrival on the next frame). ``acceleration`` paces the
+    run at that many simulated seconds per wall-clock second (e.g. 1000);
+    None runs as fast as possible. Reported times stay in simulated seconds.
+    """
+
+    def __init__(self, step=FRAME_SECONDS, acceleration=None):
+        if step <= 0:
+            raise ValueError('step must be positive')
+        self.step = step
+        self.acceleration = acceleration
+        self.steps = 0
+        self._wall_start = 0.0
+
+    def start(self):
+        self.steps = 0
+        self._wall_start = time.perf_counter()
+
+    def advance(self, t):
+        self.steps = max(self.steps, math.ceil(round(t / self.step, 9)))
+        now = self.steps * self.step
+        if self.acceleration:
+            delay = self._wall_start + now / self.acceleration - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return now
+
+
+CLOCKS = {'event': EventClock, 'fixed': FixedStepClock}
+
+
+def location_key(corridor, side, x, y, zone=None):
+    """CC-S-XXX-YY, e.g. 01-A-003-02; with a zone ZONE-CC-S-XXX-YY (PZ-01-A-003-02)."""
+    key = f'{int(corridor):02d}-{side}-{int(x):03d}-{int(y):02d}'
+    return f'{zone}-{key}' if zone else key
+
+
+def layout_zones(layout):
+    """Zone prefix per layout row from the optional Zone column (None = no zone)."""
+    if 'Zone' not in layout.columns:
+        return [None] * len(layout)
+    return [zone if isinstance(zone, str) and zone else None for zone in layout['Zone']]
+
+
+def read_table(path):
+    """Read a .csv or Excel (.xlsx/.xls) input file."""
+    if os.path.splitext(path)[1].lower() in ('.xlsx', '.xls'):
+        return pd.read_excel(path)
+    return pd.read_csv(path)
+
+
+def build_shelf_map(layout):
+    """Layout rows (Corridor, Side, X, Y[, Zone]) -> {location key: Shelf}."""
+    shelves = {}
+    rows = layout[['Corridor', 'Side', 'X', 'Y']].itertuples(index=False)
+    for (corridor, side, x, y), zone in zip(rows, layout_zones(layout)):
+        corridor, x, y = int(corridor), int(x), int(y)
+        key = location_key(corridor, side, x, y, zone)
+        shelves[key] = Shelf(
+            key=key, corridor=corridor, side=side, x=x, y=y,
+            pos_x=(-SIDE_OFFSET if side == 'A' else SIDE_OFFSET) + (corridor - 1) * CORRIDOR_SPACING,
+            pos_z=(x - 1) * ROW_SPACING,
+        )
+    return shelves
+
+
+def build_vnas(layout, vna_count):
+    """One VNA per corridor (first ``vna_count`` corridors in layout order)."""
+    corridors = list(dict.fromkeys(int(c) for c in layout['Corridor']))
+    return [
+        Vna(id=idx, corridor=c, home_x=(c - 1) * CORRIDOR_SPACING, home_z=HOME_OFFSET_Z)
+        for idx, c in enumerate(corridors[:vna_count])
+    ]
+
+
+class StockIndex:
+    """
+    Per-Material_ID min-heaps of stock lots keyed by Goods_Receipt_Date.
+
+    ``take_oldest`` pops lots whose shelf is missing or already emptied
+    (lazy deletion) and reserves the oldest pickable one, so each lookup is
+    O(log lots) instead of a filter + sort over the whole inventory.
+    """
+
+    def __init__(self, inventory):
+        inv = inventory[pd.to_numeric(inventory['Stock_Qty'], errors='coerce') > 0]
+        dates = pd.to_datetime(inv['Goods_Receipt_Date'])
+        self._heaps = {}
+        # Row position breaks receipt-date ties, like a stable sort
+        for seq, (material, location, qty, date) in enumerate(
+                zip(inv['Material_ID'], inv['Location'], inv['Stock_Qty'], dates)):
+            lot = Lot(material, location, float(qty), date)
+            self._heaps.setdefault(material, []).append((date.value, seq, lot))
+        for heap in self._heaps.values():
+            heapq.heapify(heap)
+
+    def __len__(self):
+        return sum(len(heap) for heap in self._heaps.values())
+
+    def take_oldest(self, material, shelves):
+        """Reserve and return (lot, shelf) for the oldest pickable lot, or (None, None)."""
+        heap = self._heaps.get(material)
+        while heap:
+            lot = heapq.heappop(heap)[2]
+            shelf = shelves.get(lot.location)
+            if shelf is not None and shelf.has_pallet:
+                lot.reserved = True
+                return lot, shelf
+        return None, None
+
+
+class PendingDemand:
+    """
+    Unreleased demand lines in Shipping_Date order.
+
+    Only one order per Material_ID may be active (gun6.py). Lines are queued
+    per material and a heap holds the head line of every material that is
+    not active, so the next releasable line is found in O(log n).
+    """
+
+    def __init__(self, demand):
+        demand = demand.assign(_ship=pd.to_datetime(demand['Shipping_Date']))
+        demand = demand.sort_values('_ship', kind='stable')
+        self._queues = {}
+        for line_no, (material, qty) in enumerate(zip(demand['Material_ID'], demand['Demand_Qty'])):
+            self._queues.setdefault(material, deque()).append((line_no, qty))
+        self._ready = [(queue[0][0], material) for material, queue in self._queues.items()]
+        heapq.heapify(self._ready)
+        self._remaining = len(demand)
+
+    def __len__(self):
+        return self._remaining
+
+    def __bool__(self):
+        return self._remaining > 0
+
+    def pop_next(self):
+        """(material, qty) of the oldest line whose material is not active; marks it active."""
+        if not self._ready:
+            return None
+        _, material = heapq.heappop(self._ready)
+        _, qty = self._queues[material].popleft()
+        self._remaining -= 1
+        return material, qty
+
+    def release(self, material):
+        """Material is no longer active: its next line becomes releasable."""
+        queue = self._queues.get(material)
+        if queue:
+            heapq.heappush(self._ready, (queue[0][0], material))
+
+
+class WarehouseSimulator:
+    """
+    Discrete-event VNA simulator.
+
+    Demand lines are released in Shipping_Date order, one every
+    ``order_interval`` simulated seconds while fewer than
+    ``MAX_ORDERS_PER_VNA * vna_count`` orders are active. Each order targets
+    the oldest (FIFO) lot of its material whose shelf still holds a pallet;
+    lines without such a lot are skipped. Idle VNAs take orders in creation
+    order and run moving_to_shelf -> lifting -> returning_home -> lowering.
+    ``clock`` (EventClock by default) advances simulated time between events;
+    ``log`` (an event_log.EventLog) records every state transition.
+    """
+
+    def __init__(self, layout, inventory, demand, vna_count=1,
+                 speed_kmh=DEFAULT_SPEED_KMH, lift_rate=LIFT_RATE,
+                 order_interval=ORDER_INTERVAL_S, clock=None, log=None):
+        self.clock = clock or EventClock()
+        self.log = log
+        self.shelves = build_shelf_map(layout)
+        self.vnas = build_vnas(layout, vna_count)
+        self.stock = StockIndex(inventory)
+        self.speed = speed_kmh / 3.6  # km/h -> m/s
+        self.lift_rate = lift_rate
+        self.order_interval = order_interval
+        self.max_active = MAX_ORDERS_PER_VNA * len(self.vnas)
+        self.pending = PendingDemand(demand)
+
+        self.now = 0.0
+        self.active = []           # orders created and not yet delivered
+        self.pick_times = []
+        self.orders_skipped = 0
+        self.wall_time = 0.0
+        self._events = []
+        self._seq = 0
+        self._order_seq = 0
+        self._last_release = 0.0
+        self._release_scheduled = False
+
+    # --- event heap ---
+    def _schedule(self, t, kind, payload=None):
+        heapq.heappush(self._events, (t, self._seq, kind, payload))
+        self._seq += 1
+
+    def _schedule_release(self):
+        if self._release_scheduled or not self.pending:
+            return
+        self._release_scheduled = True
+        self._schedule(max(self.now, self._last_release + self.order_interval), EV_RELEASE)
+
+    # --- analytic motion ---
+    def travel_time(self, x0, z0, x1, z1):
+        """Seconds for an X-then-Z (or Z-then-X) move, stopping within tolerance."""
+        return (abs(x1 - x0) + max(abs(z1 - z0) - ARRIVAL_TOLERANCE, 0.0)) / self.speed
+
+    def lift_time(self, shelf):
+        return shelf.y / self.lift_rate
+
+    def _log(self, kind, vna=None, order=None):
+        if self.log is not None:
+            self.log.record(self.now, kind, -1 if vna is None else vna.id,
+                            -1 if order is None else order.order_id,
+                            None if order is None else order.target_location)
+
+    # --- orders ---
+    def _create_next_order(self):
+        while True:
+            line = self.pending.pop_next()
+            if line is None:
+                return None
+            material, qty = line
+            lot, shelf = self.stock.take_oldest(material, self.shelves)
+            if lot is None:
+                self.orders_skipped += 1
+                self._log(SKIPPED)
+                self.pending.release(material)
+                continue
+            order = Order(
+                order_id=self._order_seq, material_id=material,
+                target_location=lot.location, shelf=shelf, lot=lot,
+                quantity=min(qty, lot.stock_qty), created_at=self.now,
+            )
+            self._order_seq += 1
+            self.active.append(order)
+            self._log(CREATED, order=order)
+            return order
+        return None
+
+    def _dispatch(self):
+        for vna in self.vnas:
+            if vna.state != IDLE:
+                continue
+            order = next((o for o in self.active if not o.picked_up), None)
+            if order is None:
+                return
+            order.picked_up = True
+            vna.order = order
+            vna.state = MOVING_TO_SHELF
+            vna.start_time = self.now
+            self._log(ASSIGNED, vna, order)
+            shelf = order.shelf
+            self._schedule(self.now + self.travel_time(vna.home_x, vna.home_z, shelf.pos_x, shelf.pos_z),
+                           EV_ARRIVED, vna)
+
+    # --- event handlers ---
+    def _on_release(self, _):
+        self._release_scheduled = False
+        if len(self.active) >= self.max_active:
+            return  # retried when an order completes
+        if self._create_next_order() is None:
+            return  # remaining lines wait for an active material to complete
+        self._last_release = self.now
+        self._dispatch()
+        self._schedule_release()
+
+    def _on_arrived(self, vna):
+        vna.state = LIFTING
+        self._log(ARRIVED, vna, vna.order)
+        self._schedule(self.now + self.lift_time(vna.order.shelf), EV_LIFTED, vna)
+
+    def _on_lifted(self, vna):
+        shelf = vna.order.shelf
+        shelf.has_pallet = False
+        vna.state = RETURNING_HOME
+        self._log(LIFTED, vna, vna.order)
+        self._schedule(self.now + self.travel_time(shelf.pos_x, shelf.pos_z, vna.home_x, vna.home_z),
+                       EV_HOME, vna)
+
+    def _on_home(self, vna):
+        vna.state = LOWERING
+        self._log(RETURNED, vna, vna.order)
+        self._schedule(self.now + self.lift_time(vna.order.shelf), EV_LOWERED, vna)
+
+    def _on_lowered(self, vna):
+        order = vna.order
+        order.delivered = True
+        order.lot.stock_qty = 0
+        self._log(LOWERED, vna, order)
+        pick_time = self.now - vna.start_time
+        self.pick_times.append(pick_time)
+        vna.busy_time += pick_time
+        self.active.remove(order)
+        self.pending.release(order.material_id)
+        vna.order = None
+        vna.state = IDLE
+        self._dispatch()
+        self._schedule_release()
+
+    def _handlers(self):
+        return {
+            EV_RELEASE: self._on_release,
+            EV_ARRIVED: self._on_arrived,
+            EV_LIFTED: self._on_lifted,
+            EV_HOME: self._on_home,
+            EV_LOWERED: self._on_lowered,
+        }
+
+    def run(self, until=None):
+        """Process events until the demand is exhausted (or ``until`` seconds)."""
+        handlers = self._handlers()
+        wall_start = time.perf_counter()
+        self.clock.start()
+        if self.vnas:
+            self._schedule_release()
+        while self._events:
+            t, _, kind, payload = self._events[0]
+            if until is not None and t > until:
+                self.now = until
+                break
+            heapq.heappop(self._events)
+            self.now = self.clock.advance(t)
+            handlers[kind](payload)
+        self.wall_time = time.perf_counter() - wall_start
+        if self.log is not None:
+            self.log.finish(self.now, len(self.vnas))
+        return self.metrics()
+
+    def metrics(self):
+        """gun6.py metric panel, in simulated seconds."""
+        processed = len(self.pick_times)
+        total_time = sum(self.pick_times)
+        capacity = self.now * len(self.vnas)
+        return {
+            'ordersProcessed': processed,
+            'avgPickTime': total_time / processed if processed else 0.0,
+            'totalTime': total_time,
+            'palletsMoved': processed,  # one HU = one pallet per order
+            # Share of VNA time spent on orders (gun6.py only shows a counter here)
+            'utilization': 100 * sum(v.busy_time for v in self.vnas) / capacity if capacity else 0.0,
+            'ordersSkipped': self.orders_skipped,
+            'simTime': self.now,
+            'wallTime': self.wall_time,
+        }
+
+
+def run_simulation(layout, inventory, demand, **config):
+    """Convenience wrapper: build a simulator, run it, return the metrics."""
+    return WarehouseSimulator(layout, inventory, demand, **config).run()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Headless VNA warehouse simulation')
+    parser.add_argument('layout', help='Layout file (Corridor, Side, X, Y, optional Zone)')
+    parser.add_argument('inventory', help='Inventory file (Material_ID, Location, Stock_Qty, Goods_Receipt_Date)')
+    parser.add_argument('demand', help='Demand file (Material_ID, Demand_Qty, Shipping_Date)')
+    parser.add_argument('--vna', type=int, default=1, help='Number of VNA forklifts')
+    parser.add_argument('--speed', type=float, default=DEFAULT_SPEED_KMH, help='Travel speed (km/h)')
+    parser.add_argument('--clock', choices=CLOCKS, default='event',
+                        help='event: jump to the next state change; fixed: fixed timestep')
+    parser.add_argument('--step', type=float, default=FRAME_SECONDS, help='Fixed timestep (s)')
+    parser.add_argument('--acceleration', type=float, default=None,
+                        help='Fixed clock: simulated seconds per wall-clock second (default: unpaced)')
+    parser.add_argument('--event-log', default=None, help='Save the state transitions to this .npz file')
+    args = parser.parse_args()
+
+    clock = FixedStepClock(args.step, args.acceleration) if args.clock == 'fixed' else EventClock()
+    log = EventLog() if args.event_log else None
+    metrics = run_simulation(read_table(args.layout), read_table(args.inventory), read_table(args.demand),
+                             vna_count=args.vna, speed_kmh=args.speed, clock=clock, log=log)
+    if log is not None:
+        log.save(args.event_log)
+
+    print("=" * 50)
+    print("🏭 VNA SIMULATION SUMMARY")
+    print("=" * 50)
+    print(f"Orders processed : {metrics['ordersProcessed']}")
+    print(f"Avg pick time    : {metrics['avgPickTime']:.1f} s")
+    print(f"Total pick time  : {metrics['totalTime'] / 60:.1f} min")
+    print(f"Pallets moved    : {metrics['palletsMoved']}")
+    print(f"Utilization      : {metrics['utilization']:.1f}%")
+    print(f"Skipped (no stock): {metrics['ordersSkipped']}")
+    print(f"Simulated time   : {metrics['simTime'] / 3600:.2f} h "
+          f"(wall {metrics['wallTime']:.2f} s, {args.clock} clock)")
+    print("=" * 50)
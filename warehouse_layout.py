@@ -0,0 +1,173 @@
+import argparse
+import hashlib
+import os
+
+import numpy as np
+
+from vna_sim import (ARRIVAL_TOLERANCE, CORRIDOR_SPACING, DEFAULT_SPEED_KMH, HOME_OFFSET_Z, LIFT_RATE,
+                     ROW_SPACING, SIDE_OFFSET, layout_zones, location_key, read_table)
+
+# ----------------------------
+# Warehouse layout and travel times
+# ----------------------------
+# Nodes are the layout's locations (Corridor, Side, X, Y) plus one VNA home
+# per corridor. Travel time follows the simulator: X-then-Z driving at the VNA
+# speed, stopping within ARRIVAL_TOLERANCE, plus fork lift / lower time for
+# the level difference. Lookups are analytic O(1) on float32 coordinate
+# arrays; the dense node x node float32 matrix can be precomputed block by
+# block into a memory-mapped .npy cache next to the layout file.
+
+HOME_LEVEL = 0
+MAX_DENSE_NODES = 20_000   # 1.6 GB of float32; beyond this use the analytic lookups
+BLOCK_ROWS = 1024
+
+
+def shelf_position(corridor, side, bay):
+    """Floor position (x, z) in metres of a shelf, as in vna_sim.build_shelf_map."""
+    corridor = np.asarray(corridor)
+    pos_x = np.where(np.asarray(side) == 'A', -SIDE_OFFSET, SIDE_OFFSET) + (corridor - 1) * CORRIDOR_SPACING
+    pos_z = (np.asarray(bay) - 1) * ROW_SPACING
+    return pos_x.astype(np.float32), pos_z.astype(np.float32)
+
+
+def home_position(corridor):
+    """Floor position of a corridor's VNA home (vna_sim.build_vnas)."""
+    corridor = np.asarray(corridor)
+    return ((corridor - 1) * CORRIDOR_SPACING).astype(np.float32), np.full(corridor.shape, HOME_OFFSET_Z, np.float32)
+
+
+def drive_seconds(x0, z0, x1, z1, speed_mps):
+    """X-then-Z drive time, vectorized (vna_sim.WarehouseSimulator.travel_time)."""
+    return (np.abs(x1 - x0) + np.maximum(np.abs(z1 - z0) - ARRIVAL_TOLERANCE, 0.0)) / speed_mps
+
+
+class WarehouseLayout:
+    """Location / home nodes with O(1) travel-time lookups."""
+
+    def __init__(self, layout, speed_kmh=DEFAULT_SPEED_KMH, lift_rate=LIFT_RATE, source=None):
+        self.speed = speed_kmh / 3.6
+        self.lift_rate = lift_rate
+        self.source = source
+
+        corridor = layout['Corridor'].to_numpy(dtype=np.int32)
+        side = layout['Side'].astype(str).to_numpy()
+        bay = layout['X'].to_numpy(dtype=np.int32)
+        level = layout['Y'].to_numpy(dtype=np.int32)
+        homes = np.unique(corridor)
+
+        shelf_x, shelf_z = shelf_position(corridor, side, bay)
+        home_x, home_z = home_position(homes)
+        self.keys = [location_key(c, s, x, y, zone)
+                     for c, s, x, y, zone in zip(corridor, side, bay, level, layout_zones(layout))]
+        self.keys += [f'HOME-{c:02d}' for c in homes]
+        self.corridor = np.r_[corridor, homes].astype(np.int32)
+        self.level = np.r_[level, np.full(len(homes), HOME_LEVEL)].astype(np.int32)
+        self.x = np.r_[shelf_x, home_x]
+        self.z = np.r_[shelf_z, home_z]
+        self.n_locations = len(corridor)
+        self.index = {key: i for i, key in enumerate(self.keys)}
+        self._home = {int(c): self.n_locations + i for i, c in enumerate(homes)}
+        self._matrix = None
+
+    @classmethod
+    def from_file(cls, path, speed_kmh=DEFAULT_SPEED_KMH, lift_rate=LIFT_RATE):
+        return cls(read_table(path), speed_kmh, lift_rate, source=path)
+
+    def __len__(self):
+        return len(self.keys)
+
+    # ----------------------------
+    # Nodes
+    # ----------------------------
+    def node(self, key):
+        return self.index[key]
+
+    def home(self, corridor):
+        return self._home[int(corridor)]
+
+    def home_of(self, node):
+        """Home node of the corridor ``node`` is in."""
+        return self._home[int(self.corridor[node])]
+
+    # ----------------------------
+    # Travel times (seconds)
+    # ----------------------------
+    def lift_time(self, level):
+        """Fork travel from the floor to ``level``."""
+        return np.asarray(level) / self.lift_rate
+
+    def travel(self, i, j):
+        """Node i -> node j: drive plus fork travel between the two levels. Vectorized."""
+        if self._matrix is not None and np.isscalar(i) and np.isscalar(j):
+            return float(self._matrix[i, j])
+        drive = drive_seconds(self.x[i], self.z[i], self.x[j], self.z[j], self.speed)
+        return drive + np.abs(self.level[i] - self.level[j]) / self.lift_rate
+
+    def round_trip(self, nodes=None):
+        """Home -> location -> home per location (forks raised and lowered once)."""
+        nodes = np.arange(self.n_locations) if nodes is None else np.asarray(nodes)
+        homes = np.array([self._home[int(c)] for c in self.corridor[nodes]])
+        return 2 * drive_seconds(self.x[homes], self.z[homes], self.x[nodes], self.z[nodes], self.speed) \
+            + 2 * self.lift_time(self.level[nodes])
+
+    def tour_time(self, nodes):
+        """Total travel along ``nodes`` in order (e.g. home, stops..., home)."""
+        nodes = np.asarray(nodes)
+        return float(np.sum(self.travel(nodes[:-1], nodes[1:]))) if len(nodes) > 1 else 0.0
+
+    # ----------------------------
+    # Dense matrix (memory-mapped cache)
+    # ----------------------------
+    def cache_path(self):
+        """.<layout stem>.<digest>.travel.npy next to the layout file."""
+        digest = hashlib.blake2b(digest_size=8)
+        for array in (self.x, self.z, self.level):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        digest.update(f'{self.speed:.6f}/{self.lift_rate:.6f}'.encode())
+        folder, name = os.path.split(os.path.abspath(self.source or 'layout'))
+        return os.path.join(folder, f'.{os.path.splitext(name)[0]}.{digest.hexdigest()}.travel.npy')
+
+    def matrix(self, use_cache=True):
+        """
+        Node x node float32 travel-time matrix.
+
+        Filled BLOCK_ROWS rows at a time straight into a memory-mapped .npy
+        file, then reopened read-only; later runs on the same layout and
+        parameters only map the file. Scalar ``travel`` lookups then index
+        the matrix.
+        """
+        n = len(self)
+        if n > MAX_DENSE_NODES:
+            raise ValueError(f'{n:,} nodes is too many for a dense matrix; use travel() lookups')
+        path = self.cache_path() if use_cache else None
+        if path is None or not os.path.exists(path):
+            target = (np.lib.format.open_memmap(path + '.tmp', mode='w+', dtype=np.float32, shape=(n, n))
+                      if path else np.empty((n, n), dtype=np.float32))
+            columns = np.arange(n)
+            for start in range(0, n, BLOCK_ROWS):
+                rows = np.arange(start, min(start + BLOCK_ROWS, n))[:, None]
+                target[start:start + len(rows)] = self.travel(rows, columns[None, :])
+            if path is None:
+                self._matrix = target
+                return target
+            target.flush()
+            del target
+            os.replace(path + '.tmp', path)
+        self._matrix = np.load(path, mmap_mode='r')
+        return self._matrix
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Precompute the travel-time matrix of a layout file')
+    parser.add_argument('layout')
+    parser.add_argument('--speed', type=float, default=DEFAULT_SPEED_KMH, help='VNA speed, km/h')
+    parser.add_argument('--lift-rate', type=float, default=LIFT_RATE, help='Levels per second')
+    args = parser.parse_args()
+
+    layout = WarehouseLayout.from_file(args.layout, args.speed, args.lift_rate)
+    matrix = layout.matrix()
+    round_trip = layout.round_trip()
+    print(f"✅ {layout.n_locations:,} locations, {len(layout) - layout.n_locations} homes; "
+          f"matrix {matrix.shape[0]:,}x{matrix.shape[1]:,} float32 cached at '{layout.cache_path()}'.")
+    print(f"Round trip from home: min {round_trip.min():.1f} s, mean {round_trip.mean():.1f} s, "
+          f"max {round_trip.max():.1f} s")
@@ -0,0 +1,290 @@
+import argparse
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from abc_engine import ABC_A, ABC_B, ABC_C, ABC_LABELS, DEFAULT_CUTOFFS
+from inventory_loader import INVENTORY_FILE, file_digest, load_inventory
+
+# ----------------------------
+# Warehouse-partitioned inventory KPIs
+# ----------------------------
+# inventory.csv is split into one Parquet file per warehouse
+# (<root>/Warehouse=<name>/part.parquet). Each worker process reads only its
+# own partition and only the columns it needs, and returns a small mergeable
+# partial: counts and sums, plus the partition's costs sorted descending with
+# their prefix sums for the rank-based metrics (cost concentration, ABC
+# cutoffs). The parent never merges or re-sorts the costs: it bisects for the
+# cost where the global cumulative share crosses the target, summing the
+# partitions' prefix sums at that cost (top_share). The results are the same
+# gun1.compute / gun8.compute return.
+
+PARTITION_ROOT = 'inventory_parts'
+PARTITION_KEY = 'Warehouse'
+PART_FILE = 'part.parquet'
+SNAPSHOT_FILE = '_snapshot'
+
+CURRENT_DATE = datetime(2025, 11, 19)
+SLOW_MOVING_DAYS = 180
+CONCENTRATION_SHARE = 0.63
+
+KPI_COLUMNS = ['Total_Cost', 'Stock_Qty', 'Safety_Stock', 'Last_Movement_Date']
+DAYS_COLUMNS = ['Total_Cost', 'Goods_Receipt_Date']
+
+
+# ----------------------------
+# Partitioned store
+# ----------------------------
+def partition_dir(root, warehouse):
+    return os.path.join(root, f'{PARTITION_KEY}={warehouse}')
+
+
+def write_partitions(df, root=PARTITION_ROOT, snapshot=None):
+    """
+    Write ``df`` as one Parquet file per warehouse under ``root``.
+
+    The store is built in a temporary folder and swapped in, so readers never
+    see a half-written store. Returns the warehouse names.
+    """
+    tmp = root.rstrip(os.sep) + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    warehouses = []
+    for warehouse, part in df.groupby(PARTITION_KEY, observed=True):
+        folder = partition_dir(tmp, warehouse)
+        os.makedirs(folder)
+        part.drop(columns=PARTITION_KEY).to_parquet(os.path.join(folder, PART_FILE), index=False)
+        warehouses.append(str(warehouse))
+    os.makedirs(tmp, exist_ok=True)
+    with open(os.path.join(tmp, SNAPSHOT_FILE), 'w') as f:
+        f.write(snapshot or df.attrs.get('snapshot', ''))
+    shutil.rmtree(root, ignore_errors=True)
+    os.rename(tmp, root)
+    return warehouses
+
+
+def store_snapshot(root=PARTITION_ROOT):
+    try:
+        with open(os.path.join(root, SNAPSHOT_FILE)) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def ensure_partitions(path=INVENTORY_FILE, root=PARTITION_ROOT):
+    """(Re)build the store when it is missing or older than the CSV."""
+    digest = file_digest(path)
+    if store_snapshot(root) != digest:
+        write_partitions(load_inventory(path), root, digest)
+    return root
+
+
+def partition_warehouses(root=PARTITION_ROOT):
+    prefix = f'{PARTITION_KEY}='
+    return sorted(name[len(prefix):] for name in os.listdir(root) if name.startswith(prefix))
+
+
+def read_partition(root, warehouse, columns=None):
+    return pd.read_parquet(os.path.join(partition_dir(root, warehouse), PART_FILE), columns=columns)
+
+
+# ----------------------------
+# Mergeable partials
+# ----------------------------
+def sorted_costs(costs):
+    """Costs sorted descending, NaN dropped (NaN rows never count towards a cost share)."""
+    costs = np.asarray(costs, dtype=np.float64)
+    return np.sort(costs[~np.isnan(costs)])[::-1]
+
+
+def cost_ladder(costs):
+    """Descending costs of a partition and their prefix sums (prefix[i] = sum of the i largest)."""
+    costs = sorted_costs(costs)
+    return {'costs': costs, 'prefix': np.r_[0.0, np.cumsum(costs)]}
+
+
+def _rank(costs, cost):
+    """Number of descending ``costs`` >= ``cost`` (bisection on the ascending view)."""
+    return len(costs) - int(np.searchsorted(costs[::-1], cost, side='left'))
+
+
+def _at_least(ladders, cost):
+    """Count and sum of the costs >= ``cost`` over all partitions."""
+    count, total = 0, 0.0
+    for ladder in ladders:
+        n = _rank(ladder['costs'], cost)
+        count += n
+        total += ladder['prefix'][n]
+    return count, total
+
+
+def top_share(ladders, target):
+    """
+    (k, k-th largest cost) for the largest k whose k largest costs sum to at
+    most ``target`` -- ``np.count_nonzero(np.cumsum(merged) <= target)`` of
+    the merged descending costs, found without merging them. Costs are
+    non-negative, so the sum above a cost only grows as the cost falls.
+    """
+    # Smallest cost whose costs at or above it all fit: bisect each partition
+    fits = None
+    for ladder in ladders:
+        costs = ladder['costs']
+        lo, hi = 0, len(costs)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _at_least(ladders, costs[mid])[1] <= target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo and (fits is None or costs[lo - 1] < fits):
+            fits = costs[lo - 1]
+    count, total = _at_least(ladders, fits) if fits is not None else (0, 0.0)
+
+    # The next lower cost is a tie block that is only partly taken
+    below = []
+    for ladder in ladders:
+        costs = ladder['costs']
+        n = 0 if fits is None else _rank(costs, fits)
+        if n < len(costs):
+            below.append(costs[n])
+    if not below:
+        return count, fits
+    step = max(below)
+    ties = _at_least(ladders, step)[0] - count
+    taken = ties if step <= 0 else min(ties, int((target - total) // step))
+    if taken:
+        return count + taken, step
+    return count, fits
+
+
+def kpi_partial(task):
+    """Worker: gun1 counts and sums for one warehouse partition."""
+    root, warehouse, current_date, slow_days = task
+    df = read_partition(root, warehouse, KPI_COLUMNS)
+    days_since_last_movement = (current_date - df['Last_Movement_Date']).dt.days
+    return {
+        'warehouse': warehouse,
+        'rows': len(df),
+        'total_cost': float(df['Total_Cost'].sum()),
+        'safety_stock_violations': int((df['Stock_Qty'] < df['Safety_Stock']).sum()),
+        'slow_moving_stock_count': int((days_since_last_movement > slow_days).sum()),
+        'ladder': cost_ladder(df['Total_Cost']),
+    }
+
+
+def cost_partial(task):
+    """Worker: cost ladder of one partition (input of the global ABC cutoffs)."""
+    root, warehouse = task
+    return cost_ladder(read_partition(root, warehouse, ['Total_Cost'])['Total_Cost'])
+
+
+def abc_thresholds(ladders, cutoffs=DEFAULT_CUTOFFS):
+    """
+    Cost thresholds (A, B) equivalent to abc_engine's cumulative-share rule.
+
+    ``ladders`` are the partitions' cost_ladder results. A row is A when its
+    cost is >= the A threshold, B when >= the B threshold. Rows tied on a
+    boundary cost all get the higher class (the in-memory engine splits ties
+    by row order, which partitions do not have).
+    """
+    total = sum(ladder['prefix'][-1] for ladder in ladders)
+    if total <= 0:
+        return np.inf, np.inf
+    thresholds = []
+    for cutoff in cutoffs[:2]:
+        n, cost = top_share(ladders, total * cutoff / 100)
+        thresholds.append(cost if n else np.inf)
+    return tuple(thresholds)
+
+
+def days_partial(task):
+    """Worker: per ABC class sum / count of days in stock for one partition."""
+    root, warehouse, thresholds, current_date = task
+    df = read_partition(root, warehouse, DAYS_COLUMNS)
+    costs = df['Total_Cost'].to_numpy(dtype=np.float64, na_value=np.nan)
+    codes = np.where(costs >= thresholds[0], ABC_A, np.where(costs >= thresholds[1], ABC_B, ABC_C))
+    days = (current_date - df['Goods_Receipt_Date']).dt.days.to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~np.isnan(days)
+    return {
+        'warehouse': warehouse,
+        'sum': np.bincount(codes[valid], weights=days[valid], minlength=3),
+        'count': np.bincount(codes[valid], minlength=3),
+    }
+
+
+# ----------------------------
+# Execution
+# ----------------------------
+def _map(fn, tasks, workers=None):
+    if workers == 1:
+        return [fn(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fn, tasks))
+
+
+def merge_kpis(partials, concentration_share=CONCENTRATION_SHARE):
+    """Combine kpi_partial results into the dict gun1.compute returns."""
+    rows = sum(p['rows'] for p in partials)
+    ladders = [p['ladder'] for p in partials]
+    target_cost = sum(ladder['prefix'][-1] for ladder in ladders) * concentration_share
+    sku_concentration = top_share(ladders, target_cost)[0]
+    violations = sum(p['safety_stock_violations'] for p in partials)
+    slow = sum(p['slow_moving_stock_count'] for p in partials)
+    return {
+        'total_stock_cost': sum(p['total_cost'] for p in partials),
+        'safety_stock_violations': violations,
+        'violation_percentage': violations / rows * 100,
+        'slow_moving_stock_count': slow,
+        'slow_moving_percentage': slow / rows * 100,
+        'sku_concentration': sku_concentration,
+        'concentration_percentage': sku_concentration / rows * 100,
+        'warehouse_stock_cost': pd.Series({p['warehouse']: p['total_cost'] for p in partials},
+                                          name='Total_Cost').rename_axis(PARTITION_KEY),
+    }
+
+
+def partitioned_kpis(root=PARTITION_ROOT, workers=None, current_date=CURRENT_DATE,
+                     slow_days=SLOW_MOVING_DAYS, concentration_share=CONCENTRATION_SHARE):
+    """gun1 metrics computed one warehouse partition per task."""
+    tasks = [(root, wh, current_date, slow_days) for wh in partition_warehouses(root)]
+    return merge_kpis(_map(kpi_partial, tasks, workers), concentration_share)
+
+
+def partitioned_days_in_stock(root=PARTITION_ROOT, workers=None, current_date=None,
+                              cutoffs=DEFAULT_CUTOFFS):
+    """
+    gun8 heatmap data (average days in stock, warehouse x ABC class).
+
+    Two passes over the partitions: cost ladders for the global ABC
+    thresholds, then per-class day sums with those thresholds.
+    """
+    current_date = current_date or datetime.now()
+    warehouses = partition_warehouses(root)
+    ladders = _map(cost_partial, [(root, wh) for wh in warehouses], workers)
+    thresholds = abc_thresholds(ladders, cutoffs)
+    partials = _map(days_partial, [(root, wh, thresholds, current_date) for wh in warehouses], workers)
+
+    sums = np.array([p['sum'] for p in partials]).reshape(-1, 3)
+    counts = np.array([p['count'] for p in partials]).reshape(-1, 3)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg = sums / counts
+    columns = pd.MultiIndex.from_product([['Avg_Days'], ABC_LABELS], names=[None, 'ABC_Class'])
+    heatmap_data = pd.DataFrame(avg, index=pd.Index(warehouses, name=PARTITION_KEY), columns=columns)
+    # Same shape as the in-memory groupby: classes with no rows anywhere are dropped
+    return {'heatmap_data': heatmap_data.loc[:, counts.sum(axis=0) > 0]}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the warehouse-partitioned store and print the KPIs')
+    parser.add_argument('--inventory', default=INVENTORY_FILE)
+    parser.add_argument('--root', default=PARTITION_ROOT)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    ensure_partitions(args.inventory, args.root)
+    kpis = partitioned_kpis(args.root, args.workers)
+    for name, value in kpis.items():
+        print(f'{name}: {value}')